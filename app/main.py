@@ -2,69 +2,237 @@
 
 from contextlib import asynccontextmanager
 import os
-from typing import Annotated
-from fastapi import APIRouter, Depends, FastAPI
-from openai import OpenAI
-from qdrant_client import AsyncQdrantClient
+from pathlib import Path
+from typing import Annotated, List, Optional
+from fastapi import APIRouter, Depends, FastAPI, File, HTTPException, UploadFile
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from langchain_core.runnables import RunnableConfig
+import orjson
 
 from config.logging_config import setup_logging
-from core.chains.search_chain import query_house, start_workflows
-from pydantic import BaseModel
+from config.settings import settings
+from core.chains.search_chain import HouseQuery, query_house, query_house_batch, run_sync_once
+from core.nodes.vectorstore_node import HOUSE_COLLECTION, house_schema_manager
+from core.nodes.preprocessing_node import HouseCleaned
+from pydantic import BaseModel, Field, field_validator
 
+from di.ai_provider import get_gpt_4o_mini_client
 from di.parser_house_info_service import get_parser_house_info_service
+from core.nodes.rerank_node import RerankNode
 from service.parser_house_info import ParserHouseInfoService
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from app.sync_scheduler import SyncScheduler
 from service.pull_house_info import PullHouseInfoService
+from infrastructure.ai.embedding_provider import create_embedding_provider
+from infrastructure.cache.embedding_cache import CachedEmbeddingProvider, EmbeddingCache
+from infrastructure.state.sync_state_store import SyncStateStore
+from infrastructure.cache.backend import MemoryCacheBackend, create_cache_backend
+from infrastructure.cache.search_result_cache import IndexGeneration, SearchResultCache
+from infrastructure.cache.query_embedding_cache import QueryEmbeddingCache
+from infrastructure.vectorstore.client import create_vectorstore_client
+from infrastructure.vectorstore.compression import VectorCompression
+from core.nodes.lexical_encoder import LexicalEncoder
+from infrastructure.suggest.suggest_index import SuggestIndex, load_suggest_index
+from di.ocr_pipeline import get_ocr_pipeline
+from di.house_title_generator import get_house_title_generator
+from service.house_title_generator import HouseTitleGenerator
+from core.models.house_info import HouseModel
+from di.marketing_plan_service import get_marketing_plan_service
+from service.marketing_plan_service import VARIANTS, MarketingPlanService
+from core.chains.ocr_pipeline import OcrPipeline
 
 QDRANT_DATABASE_URL = os.getenv("QDRANT_DATABASE_URL")
-openai_client = OpenAI(base_url='https://api.openai-proxy.org/v1')
-qdrant = AsyncQdrantClient(url=QDRANT_DATABASE_URL)
+embedding_provider = create_embedding_provider(
+    settings.EMBEDDING_PROVIDER,
+    model=settings.EMBEDDING_MODEL,
+    dimensions=settings.EMBEDDING_DIMENSIONS,
+    base_url=settings.OPENAI_BASE_URL,
+)
+# 同步流程使用带持久化缓存的 provider，内容未变的房源直接命中缓存
+embedding_cache = EmbeddingCache(
+    settings.EMBEDDING_CACHE_PATH,
+    max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+) if settings.EMBEDDING_CACHE_ENABLED else None
+ingestion_embedding_provider = CachedEmbeddingProvider(
+    embedding_provider, embedding_cache
+) if embedding_cache else embedding_provider
+# 查询向量缓存，热门查询不再重复请求 embedding
+query_embedding_cache = QueryEmbeddingCache(
+    create_cache_backend(
+        settings.QUERY_CACHE_BACKEND,
+        namespace="query_embedding",
+        max_size=settings.QUERY_EMBEDDING_CACHE_SIZE,
+        ttl=settings.QUERY_EMBEDDING_CACHE_TTL,
+        redis_host=settings.REDIS_HOST,
+        redis_port=settings.REDIS_PORT,
+        redis_db=settings.REDIS_DB,
+        redis_password=settings.REDIS_PASSWORD,
+    ),
+    model=embedding_provider.cache_key,
+)
+# 检索结果缓存：索引代数只在本进程内递增，因此只使用进程内缓存
+index_generation = IndexGeneration()
+search_result_cache = SearchResultCache(
+    MemoryCacheBackend(max_size=settings.SEARCH_RESULT_CACHE_SIZE, ttl=settings.SEARCH_RESULT_CACHE_TTL),
+    index_generation,
+)
+# LLM 重排序：每次检索最多一次调用，超过延迟预算保持向量顺序
+reranker = RerankNode(
+    get_gpt_4o_mini_client(),
+    top_n=settings.RERANK_TOP_N,
+    timeout=settings.RERANK_TIMEOUT,
+    cache=create_cache_backend(
+        settings.QUERY_CACHE_BACKEND,
+        namespace="rerank",
+        max_size=settings.RERANK_CACHE_SIZE,
+        ttl=settings.RERANK_CACHE_TTL,
+        redis_host=settings.REDIS_HOST,
+        redis_port=settings.REDIS_PORT,
+        redis_db=settings.REDIS_DB,
+        redis_password=settings.REDIS_PASSWORD,
+    ),
+) if settings.RERANK_ENABLED else None
+qdrant = create_vectorstore_client(
+    settings.VECTORSTORE_TYPE,
+    url=QDRANT_DATABASE_URL,
+    path=str(Path(settings.VECTORSTORE_PATH) / "local_vectorstore"),
+    dtype=settings.VECTORSTORE_DTYPE,
+)
+# 向量量化 / on_disk 配置，建 collection 和检索时使用
+vector_compression = VectorCompression.from_settings(settings)
+# 稀疏词法向量编码器，同步和检索共用
+lexical_encoder = LexicalEncoder() if settings.HYBRID_SEARCH_ENABLED else None
+sync_state_store = SyncStateStore(settings.SYNC_STATE_PATH)
+# 输入提示索引：启动时从向量库载入，之后随同步增量更新
+suggest_index = SuggestIndex(
+    top_k=settings.SUGGEST_TOP_K,
+    pinyin=settings.SUGGEST_PINYIN,
+) if settings.SUGGEST_ENABLED else None
 
 house_api = PullHouseInfoService()
 
-class Query(BaseModel):
-    input: str
-    
+# 检索接口可以投影的 payload 字段（embedding / 词法文本不对外返回）
+QUERY_FIELDS = set(HouseCleaned.model_fields) - {"embedding_text", "lexical_text"}
+
+class Query(HouseQuery):
+    top_k: int = Field(10, ge=1, le=100)
+    offset: int = Field(0, ge=0)
+
+    @field_validator("fields")
+    @classmethod
+    def check_fields(cls, fields: Optional[List[str]]):
+        unknown = set(fields or []) - QUERY_FIELDS
+        if unknown:
+            raise ValueError(f"未知字段: {sorted(unknown)}")
+        return fields
+
+class BatchQuery(BaseModel):
+    queries: List[Query] = Field(min_length=1, max_length=settings.QUERY_BATCH_MAX_SIZE)
+
+def render_points(res) -> list:
+    # 只输出 id / score / payload，不经过 QueryResponse 的完整序列化
+    return [{ "id": p.id, "score": p.score, "payload": p.payload } for p in res.points]
+
+
+sync_config = RunnableConfig({
+    "configurable": {
+        "embedding": ingestion_embedding_provider,
+        "qdrant": qdrant,
+        "vector_compression": vector_compression,
+        "lexical_encoder": lexical_encoder,
+        "sync_state": sync_state_store,
+        "index_generation": index_generation,
+        "suggest_index": suggest_index,
+        # 写入向量库前生成标题和标签
+        "title_generator": get_house_title_generator() if settings.TITLE_GENERATION_ENABLED else None
+    },
+    "max_concurrency": 2
+})
 
 async def job():
-    config = RunnableConfig({
-      "configurable": {
-        "openai": openai_client,
-        "qdrant": qdrant
-      },
-      "max_concurrency": 2
-    })
-    await start_workflows(api=house_api, config=config)
+    return await run_sync_once(api=house_api, config=sync_config)
 
-scheduler =  AsyncIOScheduler()
+# 单飞同步调度：同一时刻最多一次同步，结束后再按间隔 + 抖动安排下一次
+sync_scheduler = SyncScheduler(
+    job,
+    interval=settings.SYNC_INTERVAL_SECONDS,
+    jitter=settings.SYNC_JITTER_SECONDS,
+    history_size=settings.SYNC_HISTORY_SIZE,
+)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    scheduler.start()
+    # 已有 collection 时补齐缺失的 payload 索引；新 collection 在首次写入时创建索引
+    if await qdrant.collection_exists(HOUSE_COLLECTION):
+        await house_schema_manager(qdrant).ensure_indexes()
+        if suggest_index is not None:
+            await load_suggest_index(suggest_index, qdrant, HOUSE_COLLECTION)
+    sync_scheduler.start()
     yield
-    scheduler.shutdown()
+    await sync_scheduler.stop()
+    # 只有用过 /ocr 才有进程池需要关闭
+    if get_ocr_pipeline.cache_info().currsize:
+        get_ocr_pipeline().close()
     print("应用关闭")
 
-app = FastAPI(lifespan=lifespan)
-scheduler.add_job(job, "interval", seconds=5)
+# orjson 序列化响应，比默认的 jsonable_encoder + json.dumps 快
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 config = RunnableConfig({
     "configurable": {
-        "openai": openai_client,
-        "qdrant": qdrant
+        "embedding": embedding_provider,
+        "query_embedding_cache": query_embedding_cache,
+        "search_result_cache": search_result_cache,
+        "qdrant": qdrant,
+        "vector_compression": vector_compression,
+        "lexical_encoder": lexical_encoder,
+        "reranker": reranker
     }
 })
 
 @app.post("/query_house")
 async def query_house_api(query: Query):
-    res = await query_house(input=query.input, config=config)
-    return { "data": res, "status": "ok", "code": 200 }
+    res = await query_house(
+        input=query.input,
+        config=config,
+        top_k=query.top_k,
+        offset=query.offset,
+        fields=query.fields,
+    )
+    if suggest_index is not None:
+        suggest_index.record(query.input)
+    return ORJSONResponse({ "data": { "points": render_points(res) }, "status": "ok", "code": 200 })
+
+# 批量检索：一次 embedding 请求 + 一次向量库请求，结果与 queries 顺序一致
+@app.post("/query_house/batch")
+async def query_house_batch_api(batch: BatchQuery):
+    results = await query_house_batch(batch.queries, config=config)
+    data = [{ "points": render_points(res) } for res in results]
+    return ORJSONResponse({ "data": data, "status": "ok", "code": 200 })
+
+# 输入提示（灰色补全）：只查内存前缀树，不调用 LLM / 向量库
+@app.get("/suggest")
+async def suggest(q: str, limit: int = 10):
+    if suggest_index is None:
+        return ORJSONResponse({ "data": [], "status": "disabled", "code": 200 })
+    return ORJSONResponse({ "data": suggest_index.suggest(q, limit), "status": "ok", "code": 200 })
+
+@app.get("/suggest/stats")
+async def suggest_stats():
+    if suggest_index is None:
+        return { "data": None, "status": "disabled", "code": 200 }
+    return { "data": suggest_index.stats(), "status": "ok", "code": 200 }
 
+# 拍照录入：同一次上传的多张图片在多核上并行识别，返回解析结果和各阶段耗时
 @app.post("/ocr")
-async def ocr(image_path: str):
-    # TODO: 实现 OCR Pipeline
-    raise NotImplementedError("OCR Pipeline 待实现")
+async def ocr(
+    files: Annotated[List[UploadFile], File()],
+    pipeline: Annotated[OcrPipeline, Depends(get_ocr_pipeline)],
+):
+    if len(files) > settings.OCR_BATCH_MAX_SIZE:
+        raise HTTPException(status_code=413, detail=f"单次最多上传 {settings.OCR_BATCH_MAX_SIZE} 张图片")
+    images = [await f.read() for f in files]
+    results = await pipeline.run(images)
+    return { "data": results, "status": "ok", "code": 200 }
 
 # 解析房源信息文本输出结构体
 @app.post("/parse_text_to_house_info")
@@ -72,6 +240,93 @@ async def parse_api(text: str, service: Annotated[ParserHouseInfoService, Depend
    res = await service.parse_house_info(text)
    return res
 
+class ParseBatch(BaseModel):
+    texts: List[str] = Field(min_length=1, max_length=settings.PARSER_BATCH_MAX_SIZE)
+
+# 批量解析：缓存未命中的文本并发请求 LLM（PARSER_MAX_CONCURRENCY）
+@app.post("/parse_text_to_house_info/batch")
+async def parse_batch_api(batch: ParseBatch, service: Annotated[ParserHouseInfoService, Depends(get_parser_house_info_service)]):
+    res = await service.parse_house_infos(batch.texts)
+    return { "data": res, "status": "ok", "code": 200 }
+
+class TitleBatch(BaseModel):
+    houses: List[HouseModel] = Field(min_length=1, max_length=settings.PARSER_BATCH_MAX_SIZE)
+
+# 标题和标签生成：模板优先，缺少数据的房源合并成一次 LLM 请求
+@app.post("/generate_title_and_tags")
+async def generate_title_and_tags_api(batch: TitleBatch, generator: Annotated[HouseTitleGenerator, Depends(get_house_title_generator)]):
+    res = await generator.generate(batch.houses)
+    return { "data": res, "status": "ok", "code": 200 }
+
+class MarketingPlanRequest(BaseModel):
+    house: HouseModel
+    # 不传时生成全部变体：social_post / poster_headline / short_description
+    variants: Optional[List[str]] = None
+
+    @field_validator("variants")
+    @classmethod
+    def check_variants(cls, variants):
+        unknown = [v for v in variants or [] if v not in VARIANTS]
+        if unknown:
+            raise ValueError(f"不支持的文案类型: {unknown}")
+        return variants
+
+def format_sse(event: dict) -> bytes:
+    return f"event: {event['event']}\ndata: ".encode() + orjson.dumps(event) + b"\n\n"
+
+# 营销方案：各文案变体并发生成，token 通过 SSE 实时推送，每个变体结束时返回首 token 耗时和总耗时
+@app.post("/marketing_plan/stream")
+async def marketing_plan_stream(request: MarketingPlanRequest, service: Annotated[MarketingPlanService, Depends(get_marketing_plan_service)]):
+    async def events():
+        async for event in service.stream(request.house, request.variants):
+            yield format_sse(event)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # 关闭代理缓冲，token 到达即转发
+        headers={ "Cache-Control": "no-cache", "X-Accel-Buffering": "no" },
+    )
+
+# 立即触发一次同步；已有同步在执行时不会并发再起一次，返回进行中的那次运行记录
+@app.post("/sync")
+async def sync_now():
+    already_running = sync_scheduler.trigger()
+    current = sync_scheduler.history()[0] if already_running else None
+    return { "data": { "already_running": already_running, "current": current }, "status": "ok", "code": 200 }
+
+# 同步运行历史
+@app.get("/sync/history")
+async def sync_history():
+    return { "data": sync_scheduler.history(), "status": "ok", "code": 200 }
+
+@app.get("/embedding_cache/stats")
+async def embedding_cache_stats():
+    if embedding_cache is None:
+        return { "data": None, "status": "disabled", "code": 200 }
+    return { "data": embedding_cache.stats(), "status": "ok", "code": 200 }
+
+@app.get("/query_embedding_cache/stats")
+async def query_embedding_cache_stats():
+    return { "data": query_embedding_cache.stats(), "status": "ok", "code": 200 }
+
+@app.get("/search_result_cache/stats")
+async def search_result_cache_stats():
+    return { "data": search_result_cache.stats(), "status": "ok", "code": 200 }
+
+@app.get("/rerank/stats")
+async def rerank_stats():
+    if reranker is None:
+        return { "data": None, "status": "disabled", "code": 200 }
+    return { "data": reranker.stats(), "status": "ok", "code": 200 }
+
+# payload 索引状态
+@app.get("/vectorstore/indexes")
+async def vectorstore_indexes():
+    if not await qdrant.collection_exists(HOUSE_COLLECTION):
+        return { "data": None, "status": "collection_not_found", "code": 200 }
+    return { "data": await house_schema_manager(qdrant).status(), "status": "ok", "code": 200 }
+
 @app.get("/")
 async def root():
     return {"message": "这是一个AI房源智能助手服务"}
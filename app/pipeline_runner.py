@@ -2,15 +2,33 @@
 Pipeline 调度器
 管理节点执行顺序并返回结果
 """
-from typing import List, Dict, Any
-from core.chains.search_chain import SearchChain
+import asyncio
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+from langchain_core.runnables import RunnableConfig
+from core.chains.ocr_pipeline import OcrPipeline
+from core.chains.search_chain import query_house
+from core.models.house_info import HouseModel
+from service.house_title_generator import HouseTitleGenerator
+from service.marketing_plan_service import MarketingPlanService
 
 
 class PipelineRunner:
     """Pipeline 调度器，协调各个节点的执行"""
     
-    def __init__(self):
-        self.search_chain = SearchChain()
+    def __init__(
+        self,
+        config: Optional[RunnableConfig] = None,
+        ocr_pipeline: Optional[OcrPipeline] = None,
+        title_generator: Optional[HouseTitleGenerator] = None,
+        marketing_service: Optional[MarketingPlanService] = None,
+    ):
+        # 检索使用的 RunnableConfig（embedding / qdrant 等依赖）
+        self.config = config or RunnableConfig({"configurable": {}})
+        self.ocr_pipeline = ocr_pipeline
+        # 未配置时只使用模板生成
+        self.title_generator = title_generator or HouseTitleGenerator()
+        self.marketing_service = marketing_service
     
     async def run_search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """
@@ -23,8 +41,8 @@ class PipelineRunner:
         Returns:
             搜索结果列表
         """
-        results = await self.search_chain.execute(query, top_k)
-        return results
+        res = await query_house(input=query, config=self.config, top_k=top_k)
+        return [point.model_dump() for point in res.points]
     
     async def run_ocr_pipeline(self, image_path: str) -> Dict[str, Any]:
         """
@@ -36,8 +54,10 @@ class PipelineRunner:
         Returns:
             提取的房源信息
         """
-        # TODO: 实现 OCR Pipeline
-        raise NotImplementedError("OCR Pipeline 待实现")
+        assert self.ocr_pipeline is not None, "ocr_pipeline 未配置"
+        data = await asyncio.to_thread(Path(image_path).read_bytes)
+        results = await self.ocr_pipeline.run([data])
+        return results[0].model_dump()
     
     async def generate_title_and_tags(self, property_info: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -49,8 +69,9 @@ class PipelineRunner:
         Returns:
             生成的标题和标签
         """
-        # TODO: 实现标题和标签生成 Pipeline
-        raise NotImplementedError("标题和标签生成 Pipeline 待实现")
+        house = HouseModel.model_validate(property_info)
+        results = await self.title_generator.generate([house])
+        return results[0].model_dump()
     
     async def generate_marketing_plan(self, property_info: Dict[str, Any]) -> str:
         """
@@ -62,5 +83,9 @@ class PipelineRunner:
         Returns:
             营销文案
         """
-        # TODO: 实现营销方案生成 Pipeline
-        raise NotImplementedError("营销方案生成 Pipeline 待实现")
+        assert self.marketing_service is not None, "marketing_service 未配置"
+        house = HouseModel.model_validate(property_info)
+        plan = await self.marketing_service.generate(house)
+        return "\n\n".join(
+            f"【{name}】\n{variant.text}" for name, variant in plan.variants.items() if variant.text
+        )
@@ -0,0 +1,137 @@
+"""
+数据同步调度器
+保证任意时刻最多只有一次同步在执行，支持固定间隔 + 随机抖动、手动触发和运行历史
+"""
+import asyncio
+import random
+import time
+from collections import deque
+from datetime import datetime
+from typing import Awaitable, Callable, Deque, List, Optional
+
+from pydantic import BaseModel
+
+from config.logging_config import logger
+
+
+class SyncRun(BaseModel):
+    """一次同步的运行记录"""
+    # 触发方式：interval | manual
+    trigger: str
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    # 耗时（秒）
+    duration: Optional[float] = None
+    # running | ok | error | cancelled
+    status: str = "running"
+    # 拉取到的房源数
+    fetched: int = 0
+    # 写入 / 删除的向量数
+    upserted: int = 0
+    deleted: int = 0
+    error: Optional[str] = None
+
+
+class SyncScheduler:
+    """
+    单飞（single-flight）同步调度器
+    - 只有一个后台循环负责执行同步，天然不会重叠
+    - 每次同步结束后才开始计时下一次，间隔为 interval + [0, jitter) 秒
+    - trigger() 立即唤醒循环；同步进行中触发的请求会在本次结束后合并执行一次
+    """
+
+    def __init__(
+        self,
+        sync: Callable[[], Awaitable[dict]],
+        interval: float = 300,
+        jitter: float = 0,
+        history_size: int = 50,
+    ):
+        assert interval > 0, "interval 必须大于 0"
+        assert jitter >= 0, "jitter 不能为负数"
+        self.sync = sync
+        self.interval = interval
+        self.jitter = jitter
+        self._history: Deque[SyncRun] = deque(maxlen=history_size)
+        self._wake = asyncio.Event()
+        self._loop_task: Optional[asyncio.Task] = None
+        self._current: Optional[SyncRun] = None
+
+    @property
+    def running(self) -> bool:
+        return self._current is not None
+
+    def start(self):
+        if self._loop_task is None:
+            self._loop_task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        """
+        停止调度：取消进行中的同步并等待循环退出
+        """
+        if self._loop_task is None:
+            return
+        self._loop_task.cancel()
+        try:
+            await self._loop_task
+        except asyncio.CancelledError:
+            pass
+        self._loop_task = None
+
+    def trigger(self) -> bool:
+        """
+        手动触发一次同步
+        :return: 触发时是否已有同步在执行（是则会在其结束后再执行一次）
+        """
+        self._wake.set()
+        return self.running
+
+    def history(self) -> List[SyncRun]:
+        """
+        运行历史（最新在前），包含进行中的一次
+        """
+        runs = list(reversed(self._history))
+        if self._current is not None:
+            runs.insert(0, self._current)
+        return runs
+
+    def _next_delay(self) -> float:
+        return self.interval + (random.uniform(0, self.jitter) if self.jitter else 0)
+
+    async def _loop(self):
+        trigger = "interval"
+        while True:
+            await self._run(trigger)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self._next_delay())
+                trigger = "manual"
+            except asyncio.TimeoutError:
+                trigger = "interval"
+            self._wake.clear()
+
+    async def _run(self, trigger: str) -> SyncRun:
+        # 本次开始之前积压的手动触发已经被这一次覆盖
+        self._wake.clear()
+        run = SyncRun(trigger=trigger, started_at=datetime.now())
+        self._current = run
+        start = time.perf_counter()
+        try:
+            stats = await self.sync()
+            run.status = "ok"
+            run.fetched = stats.get("produced", 0)
+            run.upserted = stats.get("writer", {}).get("upserted", 0)
+            run.deleted = stats.get("writer", {}).get("deleted", 0)
+        except asyncio.CancelledError:
+            run.status = "cancelled"
+            raise
+        except Exception as e:
+            run.status = "error"
+            run.error = str(e)
+            logger.exception("数据同步异常")
+        finally:
+            run.finished_at = datetime.now()
+            run.duration = time.perf_counter() - start
+            self._current = None
+            self._history.append(run)
+            logger.info(f"数据同步结束: {run.status}, 耗时 {run.duration:.2f}s, 写入 {run.upserted}, 删除 {run.deleted}")
+        return run
@@ -16,12 +16,45 @@ class Settings(BaseSettings):
     
     # OpenAI 配置
     OPENAI_API_KEY: str = ""
-    EMBEDDING_MODEL: str = "text-embedding-ada-002"
+    OPENAI_BASE_URL: str = "https://api.openai-proxy.org/v1"
+    EMBEDDING_PROVIDER: str = "openai"  # openai or hashing（本地确定性向量，测试/压测用）
+    EMBEDDING_MODEL: str = "text-embedding-3-large"
+    # text-embedding-3 支持 Matryoshka 截断，可设为 256/1024 等降低存储和检索开销（修改后需重建 collection）
+    EMBEDDING_DIMENSIONS: int = 3072
+    # embedding 持久化缓存（模型名 + 文本哈希），未变化的房源不再重复 embedding
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_PATH: str = str(BASE_DIR / "data" / "processed" / "embeddings" / "embedding_cache.sqlite3")
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 200_000
     LLM_MODEL: str = "gpt-3.5-turbo"
     
     # 向量库配置
     VECTORSTORE_PATH: str = str(BASE_DIR / "data" / "processed" / "embeddings")
-    VECTORSTORE_TYPE: str = "chroma"  # chroma or faiss
+    # qdrant（远程服务，QDRANT_DATABASE_URL）或 local（进程内 NumPy memmap，数据放在 VECTORSTORE_PATH）
+    VECTORSTORE_TYPE: str = "qdrant"
+    # local 向量库的向量精度：float32 或 float16（内存减半，检索时分块转换）
+    VECTORSTORE_DTYPE: str = "float32"
+    # Qdrant 批量写入：每批条数、定时 flush 间隔（秒）、最多同时在途批次
+    QDRANT_UPSERT_BATCH_SIZE: int = 256
+    QDRANT_FLUSH_INTERVAL: float = 1.0
+    QDRANT_MAX_IN_FLIGHT: int = 4
+    # 向量压缩：none | scalar（int8）| binary；原始向量是否放磁盘、量化向量是否常驻内存
+    VECTOR_QUANTIZATION: str = "none"
+    VECTOR_ON_DISK: bool = False
+    QUANTIZATION_ALWAYS_RAM: bool = True
+    # 量化检索：候选放大倍数、是否用原始向量重新打分、HNSW ef（None 为默认）
+    SEARCH_OVERSAMPLING: float = 2.0
+    SEARCH_RESCORE: bool = True
+    SEARCH_HNSW_EF: Optional[int] = None
+    # 混合检索：dense + 本地计算的稀疏词法向量（中文二元组 BM25），一次请求内融合
+    HYBRID_SEARCH_ENABLED: bool = True
+    # 融合方式：dbsf（分数分布归一化，精确字面命中排第一）或 rrf（只看名次）
+    HYBRID_FUSION: str = "dbsf"
+    
+    # 房源数据源接口
+    HOUSE_API_URL: str = "http://114.55.227.206:3000/api/domus/query/house/list"
+    # 分页并发预取数、连接池大小
+    HOUSE_API_CONCURRENCY: int = 4
+    HOUSE_API_MAX_CONNECTIONS: int = 10
     
     # OCR 配置
     OCR_API_URL: str = ""
@@ -36,10 +69,67 @@ class Settings(BaseSettings):
     REDIS_DB: int = 0
     REDIS_PASSWORD: Optional[str] = None
     
+    # 查询向量缓存：memory（进程内 LRU + TTL）或 redis（使用上面的 REDIS_* 配置）
+    QUERY_CACHE_BACKEND: str = "memory"
+    QUERY_EMBEDDING_CACHE_SIZE: int = 10_000
+    QUERY_EMBEDDING_CACHE_TTL: float = 24 * 3600
+    # 检索结果缓存（进程内），索引代数变化即失效，TTL 作为兜底
+    SEARCH_RESULT_CACHE_SIZE: int = 5_000
+    SEARCH_RESULT_CACHE_TTL: float = 3600
+    
+    # LLM 重排序：候选数、延迟预算（秒，超时保持向量顺序）、结果缓存（与查询向量缓存使用同一后端）
+    # 每次检索最多多出 RERANK_TIMEOUT 的 LLM 调用，默认关闭，需要时显式开启
+    RERANK_ENABLED: bool = False
+    RERANK_TOP_N: int = 20
+    RERANK_TIMEOUT: float = 1.5
+    RERANK_CACHE_SIZE: int = 5_000
+    RERANK_CACHE_TTL: float = 3600
+    # 批量检索接口单次最多查询条数
+    QUERY_BATCH_MAX_SIZE: int = 50
+    # 输入提示：内存前缀树，每个节点缓存的候选数即单次最多返回条数；安装 pypinyin 时支持拼音 / 首字母
+    SUGGEST_ENABLED: bool = True
+    SUGGEST_TOP_K: int = 10
+    SUGGEST_PINYIN: bool = True
+    # 房源文本解析：批量解析的并发请求数、单次最多条数、结果缓存（与查询向量缓存使用同一后端）
+    PARSER_MAX_CONCURRENCY: int = 8
+    PARSER_BATCH_MAX_SIZE: int = 50
+    PARSER_CACHE_SIZE: int = 5_000
+    PARSER_CACHE_TTL: float = 24 * 3600
+    # 规则快速提取固定格式字段，没有剩余内容的文本跳过 LLM
+    PARSER_FAST_PATH: bool = True
+    # 拍照录入：OCR 后端（tesseract | fake）、识别语言、进程池大小（None 为 CPU 核数）、图片长边上限、单次最多图片数
+    OCR_BACKEND: str = "tesseract"
+    OCR_LANG: str = "chi_sim+eng"
+    OCR_MAX_WORKERS: Optional[int] = None
+    OCR_MAX_SIDE: int = 2000
+    OCR_BATCH_MAX_SIZE: int = 20
+    # 标题和标签生成：同步时在清洗阶段生成；模板缺少数据的房源才请求 LLM（每次请求的房源数、并发请求数）
+    TITLE_GENERATION_ENABLED: bool = True
+    TITLE_OVERWRITE: bool = False
+    TITLE_LLM_FALLBACK: bool = True
+    TITLE_LLM_BATCH_SIZE: int = 20
+    TITLE_LLM_MAX_CONCURRENCY: int = 4
+    TITLE_CACHE_SIZE: int = 50_000
+    TITLE_CACHE_TTL: float = 7 * 24 * 3600
+    
     # 数据路径
     RAW_DATA_PATH: str = str(BASE_DIR / "data" / "raw")
     PROCESSED_DATA_PATH: str = str(BASE_DIR / "data" / "processed")
     
+    # 同步流水线：阶段间队列容量、各阶段 worker 数
+    INGESTION_QUEUE_SIZE: int = 1000
+    INGESTION_CLEAN_WORKERS: int = 2
+    INGESTION_EMBED_WORKERS: int = 4
+    INGESTION_UPSERT_WORKERS: int = 1
+    
+    # 同步调度：间隔（秒）、随机抖动上限（秒）、保留的运行历史条数
+    SYNC_INTERVAL_SECONDS: float = 300
+    SYNC_JITTER_SECONDS: float = 30
+    SYNC_HISTORY_SIZE: int = 50
+    
+    # 增量同步水位线持久化
+    SYNC_STATE_PATH: str = str(BASE_DIR / "data" / "processed" / "sync_state.sqlite3")
+    
     # 日志配置
     LOG_LEVEL: str = "INFO"
     
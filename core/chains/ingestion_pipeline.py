@@ -0,0 +1,202 @@
+"""
+core.chains.ingestion_pipeline 的 Docstring
+流式分阶段数据同步流水线：拉取 → 清洗 → 向量化 → 写入（已删除房源分流为批量删除）
+各阶段之间用有界 asyncio.Queue 连接，每个阶段有独立的 worker 数，
+下游处理不过来时上游在 put 上等待（背压），内存占用与库存总量无关
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from langchain_core.runnables import RunnableConfig
+
+from config.logging_config import logger
+from core.models.house_info import HouseModel
+from core.nodes.ingestion_node import Ingestion
+from core.nodes.preprocessing_node import HouseCleaned, PreprocessingNode
+from core.nodes.vectorstore_node import QdrantBulkWriter
+from infrastructure.suggest.suggest_index import SuggestIndex
+from service.house_title_generator import HouseTitleGenerator
+
+# 队列结束标记，每个 worker 收到一个后退出
+_DONE = object()
+
+
+class Stage:
+  """
+  流水线阶段
+  :param name: 阶段名称
+  :param handler: 处理一批输入，返回交给下一阶段的输出列表
+  :param workers: 并发 worker 数
+  :param queue_size: 输入队列容量
+  :param batch_size: 每次最多从队列取出的条数
+  """
+
+  def __init__(
+    self,
+    name: str,
+    handler: Callable[[List[Any]], Awaitable[List[Any]]],
+    workers: int = 1,
+    queue_size: int = 256,
+    batch_size: int = 1,
+  ):
+    assert workers > 0, "workers 必须大于 0"
+    assert batch_size > 0, "batch_size 必须大于 0"
+    self.name = name
+    self.handler = handler
+    self.workers = workers
+    self.batch_size = batch_size
+    self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    self.processed = 0
+
+  def stats(self) -> dict:
+    return {
+      "queue_depth": self.queue.qsize(),
+      "queue_size": self.queue.maxsize,
+      "workers": self.workers,
+      "processed": self.processed,
+    }
+
+
+class StagedPipeline:
+  """
+  通用分阶段流水线：source 产出的元素依次流过 stages
+  """
+
+  def __init__(self, source: AsyncIterator[Any], stages: List[Stage]):
+    assert stages, "至少需要一个阶段"
+    self.source = source
+    self.stages = stages
+    self.produced = 0
+
+  async def _produce(self):
+    first = self.stages[0]
+    async for item in self.source:
+      await first.queue.put(item)
+      self.produced += 1
+    for _ in range(first.workers):
+      await first.queue.put(_DONE)
+
+  async def _work(self, stage: Stage, next_stage: Optional[Stage]):
+    done = False
+    while not done:
+      item = await stage.queue.get()
+      if item is _DONE:
+        return
+
+      batch = [item]
+      while len(batch) < stage.batch_size and not stage.queue.empty():
+        item = stage.queue.get_nowait()
+        if item is _DONE:
+          done = True
+          break
+        batch.append(item)
+
+      outputs = await stage.handler(batch)
+      stage.processed += len(batch)
+      if next_stage is not None:
+        for output in outputs or []:
+          await next_stage.queue.put(output)
+
+  async def _run_stage(self, index: int):
+    stage = self.stages[index]
+    next_stage = self.stages[index + 1] if index + 1 < len(self.stages) else None
+    await asyncio.gather(*[self._work(stage, next_stage) for _ in range(stage.workers)])
+    # 本阶段所有 worker 结束后，通知下游结束
+    if next_stage is not None:
+      for _ in range(next_stage.workers):
+        await next_stage.queue.put(_DONE)
+
+  async def run(self) -> dict:
+    tasks = [asyncio.create_task(self._produce())]
+    tasks += [asyncio.create_task(self._run_stage(i)) for i in range(len(self.stages))]
+    try:
+      await asyncio.gather(*tasks)
+    except BaseException:
+      for task in tasks:
+        task.cancel()
+      await asyncio.gather(*tasks, return_exceptions=True)
+      raise
+    return self.stats()
+
+  def stats(self) -> Dict[str, Any]:
+    return {
+      "produced": self.produced,
+      "stages": {stage.name: stage.stats() for stage in self.stages},
+    }
+
+
+async def _flatten_pages(pages: AsyncIterator[List[HouseModel]]) -> AsyncIterator[HouseModel]:
+  async for houses in pages:
+    for house in houses:
+      yield house
+
+
+def build_ingestion_pipeline(
+  ingestion: Ingestion,
+  preprocessing_node: PreprocessingNode,
+  writer: QdrantBulkWriter,
+  config: RunnableConfig,
+  queue_size: int = 1000,
+  clean_workers: int = 2,
+  embed_workers: int = 4,
+  upsert_workers: int = 1,
+  suggest_index: Optional[SuggestIndex] = None,
+  title_generator: Optional[HouseTitleGenerator] = None,
+) -> StagedPipeline:
+  """
+  组装房源同步流水线：fetch(source) → clean → embed → upsert
+  已删除的房源在 clean 阶段分流，批量从向量库删除
+  传入 suggest_index 时，写入 / 删除的房源同步增量更新输入提示索引
+  传入 title_generator 时，clean 阶段先整批生成标题和标签，embedding 文本和 payload 使用生成后的值
+  """
+
+  async def clean(houses: List[HouseModel]) -> List[HouseCleaned]:
+    live = []
+    for house in houses:
+      # 已删除的房源不做 embedding，直接交给写入器批量删除
+      if preprocessing_node.is_deleted(house):
+        if house.id:
+          await writer.delete(house.id)
+          if suggest_index is not None:
+            suggest_index.remove(house.id)
+        continue
+      live.append(house)
+    if title_generator is not None and live:
+      await title_generator.apply(live)
+    return [preprocessing_node.clean(house) for house in live]
+
+  async def embed(cleaned_list: List[HouseCleaned]):
+    return await preprocessing_node.embed_cleaned(cleaned_list, config)
+
+  async def upsert(points) -> List[Any]:
+    for point in points:
+      await writer.add(point)
+      if suggest_index is not None:
+        suggest_index.update(point.id, point.payload or {})
+    return []
+
+  stages = [
+    Stage("clean", clean, workers=clean_workers, queue_size=queue_size, batch_size=64),
+    # 每个 worker 一次取一整批，对应一次多输入 embedding 请求
+    Stage("embed", embed, workers=embed_workers, queue_size=queue_size, batch_size=preprocessing_node.batch_size),
+    Stage("upsert", upsert, workers=upsert_workers, queue_size=queue_size, batch_size=writer.batch_size),
+  ]
+  return StagedPipeline(_flatten_pages(ingestion.iter_pages()), stages)
+
+
+async def run_ingestion_pipeline(pipeline: StagedPipeline, report_interval: float = 10.0) -> dict:
+  """
+  运行流水线，并定期输出各阶段队列深度
+  """
+
+  async def report():
+    while True:
+      await asyncio.sleep(report_interval)
+      logger.info(f"同步流水线状态: {pipeline.stats()}")
+
+  reporter = asyncio.create_task(report())
+  try:
+    return await pipeline.run()
+  finally:
+    reporter.cancel()
@@ -0,0 +1,99 @@
+"""
+core.chains.ocr_pipeline 的 Docstring
+拍照录入流水线：图片 → 预处理 + OCR（进程池，多张图片在多核上并行）→ 房源文本解析
+- 解码 / 纠偏 / 缩放和识别都是 CPU 密集操作，放在 ProcessPoolExecutor 中执行，不阻塞事件循环
+- 识别出的文本直接批量交给 ParserHouseInfoService（规则快速提取 + LLM 补全）
+- 每张图片返回各阶段耗时（ms）：decode / deskew / resize / ocr / parse / total
+- 单张图片解码或识别失败只影响该图片，结果中带 error，其余图片照常解析
+"""
+
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+from config.logging_config import logger
+from core.interfaces.ocr import OcrBackendInterface
+from infrastructure.ocr.ocr_backend import recognize_image
+from service.parser_house_info import HouseModel, ParserHouseInfoService
+
+
+class OcrResult(BaseModel):
+  # OCR 识别出的原始文本
+  text: str = ""
+  # 解析出的房源信息，识别失败时为 None
+  house: Optional[HouseModel] = None
+  # 各阶段耗时（ms）
+  timings: Dict[str, float] = {}
+  # 识别失败原因
+  error: Optional[str] = None
+
+
+class OcrPipeline:
+  """
+  用法：
+    pipeline = OcrPipeline(create_ocr_backend("tesseract"), parser_service, max_workers=4)
+    results = await pipeline.run([image_bytes, ...])
+  """
+
+  def __init__(
+    self,
+    backend: OcrBackendInterface,
+    parser: ParserHouseInfoService,
+    max_workers: Optional[int] = None,
+    max_side: int = 2000,
+    executor: Optional[Executor] = None,
+  ):
+    assert isinstance(backend, OcrBackendInterface), "backend 不是 OcrBackendInterface 类型"
+    self.backend = backend
+    self.parser = parser
+    self.max_workers = max_workers
+    self.max_side = max_side
+    self._executor = executor
+    self._owns_executor = executor is None
+
+  @property
+  def executor(self) -> Executor:
+    # 首次使用时再启动进程池
+    if self._executor is None:
+      self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+    return self._executor
+
+  async def recognize(self, images: List[bytes]) -> List[tuple]:
+    """
+    并行识别多张图片
+    :return: 与 images 顺序一致的 (文本, 耗时)，识别失败的图片为对应的异常
+    """
+    loop = asyncio.get_running_loop()
+    return await asyncio.gather(*[
+      loop.run_in_executor(self.executor, recognize_image, self.backend, data, self.max_side)
+      for data in images
+    ], return_exceptions=True)
+
+  async def run(self, images: List[bytes]) -> List[OcrResult]:
+    started = time.perf_counter()
+    recognized = await self.recognize(images)
+    ok = [i for i, res in enumerate(recognized) if not isinstance(res, Exception)]
+
+    parse_started = time.perf_counter()
+    houses = await self.parser.parse_house_infos([recognized[i][0] for i in ok]) if ok else []
+    parse_ms = (time.perf_counter() - parse_started) * 1000
+    total_ms = (time.perf_counter() - started) * 1000
+
+    results = [OcrResult(error=str(res) or type(res).__name__, timings={"total": total_ms}) for res in recognized]
+    for i, house in zip(ok, houses):
+      text, timings = recognized[i]
+      # 批量解析的耗时由同一批图片共享
+      results[i] = OcrResult(text=text, house=house, timings={**timings, "parse": parse_ms, "total": total_ms})
+    failed = len(images) - len(ok)
+    if failed:
+      logger.warning(f"OCR 录入 {failed} 张图片识别失败")
+    logger.info(f"OCR 录入 {len(images)} 张图片，耗时 {total_ms:.0f}ms")
+    return results
+
+  def close(self):
+    if self._owns_executor and self._executor is not None:
+      self._executor.shutdown(cancel_futures=True)
+      self._executor = None
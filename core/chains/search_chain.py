@@ -1,55 +1,208 @@
 
 
 import asyncio
-from langchain_core.runnables import RunnableLambda,  RunnableConfig
-from openai import OpenAI
+from typing import List, Optional, Tuple
+from langchain_core.runnables import RunnableConfig
+from pydantic import BaseModel
 from core.interfaces.house_info import HouseInfoInterface
-from core.nodes.filter_node import house_filter_node
-from core.nodes.embedding_node import embedding_node
+from core.nodes.filter_node import HouseSearch, house_filter_batch_node, house_filter_node
+from core.nodes.embedding_node import embedding_batch_node, embedding_node
+from core.nodes.query_parser_node import ParsedQuery, query_parser_node
+from core.nodes.rerank_node import RERANK_PAYLOAD_FIELDS, RerankNode
 from core.nodes.preprocessing_node import PreprocessingNode
 from core.nodes.vectorstore_node import *
 from core.nodes.ingestion_node import Ingestion
+from core.chains.ingestion_pipeline import build_ingestion_pipeline, run_ingestion_pipeline
 from config.logging_config import logger
+from config.settings import settings
+from qdrant_client.http import models
+from qdrant_client.http.models import QueryResponse
+
+# 同步状态中房源数据源的名称
+SYNC_SOURCE = "houses"
+
+# 执行一次增量同步
+async def run_sync_once(api: HouseInfoInterface, config: RunnableConfig) -> dict:
+    # 1. 从上次提交的水位线开始增量拉取数据
+    sync_state = config.get("configurable", {}).get("sync_state")
+    watermark = sync_state.load(SYNC_SOURCE) if sync_state else None
+    ingestion = Ingestion(api, watermark)
+    index_generation = config.get("configurable", {}).get("index_generation")
+    # 2. 清洗数据 & 批量生成 embedding
+    preprocessing_node = PreprocessingNode(lexical_encoder=config.get("configurable", {}).get("lexical_encoder"))
+    # 3. 批量写入向量库，退出时确认本次同步全部落库
+    async with QdrantBulkWriter(
+        get_qdrant_client(config),
+        batch_size=settings.QDRANT_UPSERT_BATCH_SIZE,
+        flush_interval=settings.QDRANT_FLUSH_INTERVAL,
+        max_in_flight=settings.QDRANT_MAX_IN_FLIGHT,
+        # 每批写入提交后递增索引代数，检索结果缓存随之失效
+        on_commit=index_generation.bump if index_generation else None,
+        compression=config.get("configurable", {}).get("vector_compression"),
+    ) as writer:
+        pipeline = build_ingestion_pipeline(
+            ingestion,
+            preprocessing_node,
+            writer,
+            config,
+            queue_size=settings.INGESTION_QUEUE_SIZE,
+            clean_workers=settings.INGESTION_CLEAN_WORKERS,
+            embed_workers=settings.INGESTION_EMBED_WORKERS,
+            upsert_workers=settings.INGESTION_UPSERT_WORKERS,
+            suggest_index=config.get("configurable", {}).get("suggest_index"),
+            title_generator=config.get("configurable", {}).get("title_generator"),
+        )
+        stats = await run_ingestion_pipeline(pipeline)
+    stats["writer"] = writer.stats()
+
+    # 4. 数据确认落库后再提交水位线，重启后从这里继续增量同步
+    if sync_state:
+        sync_state.commit(SYNC_SOURCE, ingestion.next_watermark)
+
+    logger.info(f"同步完成: {stats}")
+    return stats
+
+class HouseQuery(BaseModel):
+    input: str
+    # 返回条数
+    top_k: int = 10
+    # 跳过前 offset 条（分页）
+    offset: int = 0
+    # 只返回这些 payload 字段，None 返回全部，[] 不返回 payload
+    fields: Optional[List[str]] = None
+
+
+def _search_options(query: HouseQuery, reranker: Optional[RerankNode]) -> dict:
+    """
+    向量检索参数：开启重排序时多取候选，并带上生成摘要需要的字段，分页和字段投影在重排序后做
+    """
+    if reranker is None:
+        with_payload = True if query.fields is None else list(query.fields) or False
+        return {"limit": query.top_k, "offset": query.offset, "with_payload": with_payload}
+    with_payload = True if query.fields is None else sorted(set(query.fields) | set(RERANK_PAYLOAD_FIELDS))
+    return {"limit": max(query.offset + query.top_k, reranker.top_n), "offset": 0, "with_payload": with_payload}
+
+
+async def _rerank_page(
+    query: HouseQuery,
+    parsed: ParsedQuery,
+    res: QueryResponse,
+    reranker: Optional[RerankNode],
+) -> Tuple[QueryResponse, bool]:
+    """
+    LLM 重排序（一次调用，超时保持向量顺序）后分页、投影字段
+    :return: (结果, 是否可以缓存)；重排序降级的结果不缓存，下次查询再尝试
+    """
+    if reranker is None:
+        return res, True
+    points, reranked = await reranker.rerank(parsed.text, res.points)
+    points = points[query.offset:query.offset + query.top_k]
+    if query.fields is not None:
+        fields = query.fields
+        points = [
+            p.model_copy(update={"payload": {k: v for k, v in (p.payload or {}).items() if k in fields} if fields else None})
+            for p in points
+        ]
+    return QueryResponse(points=points), reranked
+
+
+def _cache_key(cache, query: HouseQuery, parsed: ParsedQuery) -> str:
+    return cache.make_key(parsed.semantic_text, filters=parsed.filter, limit=query.top_k, offset=query.offset, fields=query.fields)
 
-# 异步数据拉取任务
-async def data_pull_workflow(api: HouseInfoInterface, config: RunnableConfig):
-    while True:
-        try:
-            logger.info("异步拉取房源数据中...")
-            # 1. 拉取数据
-            list = await Ingestion(api).ainvoke(None, config)
-            # 2. 清洗数据,
-            preprocessing_node = PreprocessingNode()
-            # 3. 存入数据
-            save_node = RunnableLambda(vectorstore_node)
-
-            points =  preprocessing_node | save_node
-          
-            BATCH_SIZE = 5
-            for i in range(0, len(list), BATCH_SIZE):
-                batch = list[i:i+BATCH_SIZE]
-                # 并发处理这个块内的所有元素
-                await asyncio.gather(*[points.ainvoke(item, config) for item in batch])
-            
-            await asyncio.sleep(60 * 5)  # 每隔 60 秒拉取一次
-        except Exception as e:
-            print(f"数据拉取异常: {e}")
-            await asyncio.sleep(10)
 
 # 异步用户查询任务
-async def query_house(input: str, config: RunnableConfig):
-    # 1. 接受用户输入数据，将其向量化
-    input_node = RunnableLambda(embedding_node)
-    # 2. 查询向量数据库
-    search_node = RunnableLambda(house_filter_node)
-    search_pipeline = input_node | search_node
-    return await search_pipeline.ainvoke(input, config)
-
-# 启动异步工作流
-async def start_workflows(api: HouseInfoInterface, config: RunnableConfig):
-    logger.info("启动异步工作流")
-    await asyncio.gather(
-        data_pull_workflow(api=api, config=config),
+async def query_house(
+    input: str,
+    config: RunnableConfig,
+    top_k: int = 10,
+    offset: int = 0,
+    fields: Optional[List[str]] = None,
+):
+    """
+    :param top_k: 返回条数
+    :param offset: 跳过前 offset 条（分页）
+    :param fields: 只返回这些 payload 字段，None 返回全部，[] 不返回 payload
+    """
+    query = HouseQuery(input=input, top_k=top_k, offset=offset, fields=fields)
+    # 1. 解析用户输入：结构化条件 -> Qdrant Filter，剩余部分用于语义检索
+    parsed = await query_parser_node(input, config)
+
+    # 2. 检索结果缓存（索引代数变化后自动失效）
+    cache = config.get("configurable", {}).get("search_result_cache")
+    if cache is not None:
+        key = _cache_key(cache, query, parsed)
+        cached = await cache.get(key)
+        if cached is not None:
+            return QueryResponse.model_validate(cached)
+
+    # 3. 语义部分向量化；开启混合检索时同时生成稀疏词法向量（本地计算）
+    query_vector = await embedding_node(parsed.semantic_text, config)
+    lexical_encoder = config.get("configurable", {}).get("lexical_encoder")
+    sparse_vector = lexical_encoder.encode_query(parsed.semantic_text) if lexical_encoder else None
+
+    # 4. 带过滤条件查询向量数据库（dense + sparse 融合）
+    reranker = config.get("configurable", {}).get("reranker")
+    res = await house_filter_node(
+        query_vector,
+        config,
+        query_filter=parsed.filter,
+        sparse_vector=sparse_vector,
+        fusion=models.Fusion(settings.HYBRID_FUSION),
+        **_search_options(query, reranker),
     )
 
+    # 5. 重排序、分页
+    res, cacheable = await _rerank_page(query, parsed, res, reranker)
+    if cache is not None and cacheable:
+        await cache.set(key, res.model_dump(mode="json"))
+    return res
+
+
+# 批量查询：所有查询一次 embedding 请求 + 一次 query_batch_points 请求
+async def query_house_batch(queries: List[HouseQuery], config: RunnableConfig) -> List[QueryResponse]:
+    """
+    每条查询各自解析过滤条件、条数和分页，结果与 queries 顺序一致
+    开启重排序时每条查询另有一次（可缓存的）LLM 调用，并发执行
+    """
+    parsed = [await query_parser_node(query.input, config) for query in queries]
+    results: List[Optional[QueryResponse]] = [None] * len(queries)
+
+    # 1. 命中检索结果缓存的查询不再检索
+    cache = config.get("configurable", {}).get("search_result_cache")
+    keys = [_cache_key(cache, query, p) for query, p in zip(queries, parsed)] if cache is not None else []
+    misses = []
+    for i in range(len(queries)):
+        cached = await cache.get(keys[i]) if cache is not None else None
+        if cached is not None:
+            results[i] = QueryResponse.model_validate(cached)
+        else:
+            misses.append(i)
+    if not misses:
+        return results
+
+    # 2. 未命中的查询一次请求生成全部向量
+    vectors = await embedding_batch_node([parsed[i].semantic_text for i in misses], config)
+    lexical_encoder = config.get("configurable", {}).get("lexical_encoder")
+    reranker = config.get("configurable", {}).get("reranker")
+    searches = [
+        HouseSearch(
+            query_vector=vector,
+            query_filter=parsed[i].filter,
+            sparse_vector=lexical_encoder.encode_query(parsed[i].semantic_text) if lexical_encoder else None,
+            **_search_options(queries[i], reranker),
+        )
+        for i, vector in zip(misses, vectors)
+    ]
+
+    # 3. 一次往返完成全部检索
+    responses = await house_filter_batch_node(searches, config, fusion=models.Fusion(settings.HYBRID_FUSION))
 
+    # 4. 重排序、分页
+    pages = await asyncio.gather(*[
+        _rerank_page(queries[i], parsed[i], res, reranker) for i, res in zip(misses, responses)
+    ])
+    for i, (res, cacheable) in zip(misses, pages):
+        results[i] = res
+        if cache is not None and cacheable:
+            await cache.set(keys[i], res.model_dump(mode="json"))
+    return results
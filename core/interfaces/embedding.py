@@ -0,0 +1,39 @@
+"""
+core.interfaces.embedding 的 Docstring
+Embedding 提供方接口，定义异步生成文本向量的方法
+"""
+
+from abc import ABC, abstractmethod
+from typing import List
+
+
+class EmbeddingProviderInterface(ABC):
+  # 模型名称（用于缓存 key、日志等）
+  model: str
+  # 输出向量维度
+  dimensions: int
+
+  @property
+  def cache_key(self) -> str:
+    """
+    缓存 key 前缀：同一模型截断到不同维度得到的向量不同，需要区分
+    """
+    return f"{self.model}@{self.dimensions}"
+
+  @abstractmethod
+  async def embed(self, texts: List[str]) -> List[List[float]]:
+    """
+    批量生成向量（一次请求）
+    :param texts: 文本列表
+    :return: 与 texts 顺序一致的向量列表
+    """
+    pass
+
+  async def embed_query(self, text: str) -> List[float]:
+    """
+    生成单条查询文本的向量
+    :param text: 查询文本
+    :return: 向量
+    """
+    vectors = await self.embed([text])
+    return vectors[0]
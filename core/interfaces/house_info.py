@@ -5,8 +5,8 @@ core.interfaces.house_info 的 Docstring
 
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Optional
-from core.models.house_info import HouseInfoModel
+from typing import AsyncIterator, List, Optional
+from core.models.house_info import HouseInfoModel, HouseModel
 from core.models.response_body import ResponseBody
 
 
@@ -19,4 +19,20 @@ class HouseInfoInterface(ABC):
     :param self: 说明
     :return: 房源数据
     """
-    pass
\ No newline at end of file
+    pass
+
+  async def iter_pages(self, last_updated: Optional[datetime], page_size: int) -> AsyncIterator[List[HouseModel]]:
+    """
+    按页顺序拉取房源数据，直到某页不足 page_size 为止
+    子类可覆盖为并发预取，但必须按页码顺序产出
+    :return: 每页房源列表
+    """
+    page = 1
+    while True:
+      response = await self.fetch_house_data(last_updated, page, page_size)
+      houses = response.data.list if response.data else []
+      yield houses
+
+      if len(houses) < page_size:
+        break
+      page += 1
@@ -0,0 +1,21 @@
+"""
+core.interfaces.ocr 的 Docstring
+OCR 后端接口：在进程池 worker 中同步执行，实现类必须可以 pickle
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any
+
+
+class OcrBackendInterface(ABC):
+  # 是否需要先解码 / 纠偏 / 缩放；False 时 recognize 直接收到原始字节
+  preprocess: bool = True
+
+  @abstractmethod
+  def recognize(self, image: Any) -> str:
+    """
+    识别图片中的文字
+    :param image: 预处理后的 PIL 灰度图（preprocess=False 时为原始字节）
+    :return: 识别出的文本
+    """
+    pass
@@ -1,4 +1,4 @@
-from typing import Generic, TypeVar
+from typing import Generic, Optional, TypeVar
 from anthropic import BaseModel
 
 T = TypeVar("T")  # 泛型参数
@@ -6,4 +6,5 @@ T = TypeVar("T")  # 泛型参数
 class ResponseBody(BaseModel, Generic[T]):
     code: int
     msg: str
-    data: T
+    # 上游接口没有数据时返回 data: null
+    data: Optional[T] = None
@@ -0,0 +1,51 @@
+"""
+core.models.sync_state 的 Docstring
+增量同步水位线：updated_at + 同一时间戳下的最后一个 id
+"""
+from __future__ import annotations
+
+import re
+from datetime import datetime
+from typing import Optional, Tuple
+from pydantic import BaseModel
+
+from core.models.house_info import HouseModel
+
+
+_DIGITS = re.compile(r"(\d+)")
+
+
+def id_sort_key(house_id: Optional[str]) -> Tuple[tuple, str]:
+    """
+    id 比较键：数字段按数值比较（"9" < "10"，"h9" < "h10"），其余按字符串比较
+    最后附上原始 id，前导零不同的 id（"007" / "7"）也有确定的先后，保证是全序
+    """
+    house_id = house_id or ""
+    parts = tuple((0, int(p), "") if p.isdigit() else (1, 0, p) for p in _DIGITS.split(house_id) if p)
+    return parts, house_id
+
+
+class SyncWatermark(BaseModel):
+    # 已同步数据的最大更新时间
+    updated_at: Optional[datetime] = None
+    # updated_at 相同时按 id 排序的最后一个 id（用于去重/断点续传）
+    last_id: Optional[str] = None
+
+    def is_synced(self, house: HouseModel) -> bool:
+        """
+        房源是否已在水位线之内（已同步过）
+        没有 updated_at 的房源无法比较，视为未同步
+        """
+        if self.updated_at is None or house.updated_at is None:
+            return False
+        if house.updated_at != self.updated_at:
+            return house.updated_at < self.updated_at
+        return id_sort_key(house.id) <= id_sort_key(self.last_id)
+
+    def advance(self, house: HouseModel) -> SyncWatermark:
+        """
+        用房源推进水位线，返回新的水位线（不修改自身）
+        """
+        if house.updated_at is None or self.is_synced(house):
+            return self
+        return SyncWatermark(updated_at=house.updated_at, last_id=house.id)
@@ -0,0 +1,58 @@
+"""
+core.nodes.embedding_batch 的 Docstring
+embedding 批处理工具：把多条文本按条数上限和估算 token 预算打包成多输入 embedding 请求，
+打包结果是原始下标列表，方便把返回的向量按顺序映射回房源 id
+"""
+
+from typing import List, Sequence
+
+# OpenAI embeddings 单次请求最多 2048 条输入，总 token 上限 300k，这里保守取值
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_BATCH_MAX_TOKENS = 100_000
+# 单条输入的 token 上限（text-embedding-3-* 为 8191）
+MAX_INPUT_TOKENS = 8191
+
+
+def estimate_tokens(text: str) -> int:
+  """
+  粗略估算文本 token 数
+  中日韩字符按 1 字 1 token 计，其余字符按 4 字符 1 token 计
+  """
+  cjk = sum(1 for ch in text if "⺀" <= ch <= "鿿" or "豈" <= ch <= "﫿" or "＀" <= ch <= "￯")
+  other = len(text) - cjk
+  return cjk + (other + 3) // 4
+
+
+def pack_batches(
+  texts: Sequence[str],
+  max_items: int = DEFAULT_BATCH_SIZE,
+  max_tokens: int = DEFAULT_BATCH_MAX_TOKENS,
+) -> List[List[int]]:
+  """
+  按条数和 token 预算打包文本
+  :param texts: 待向量化的文本
+  :param max_items: 每个请求最多包含的文本条数
+  :param max_tokens: 每个请求估算 token 总量上限
+  :return: 每个请求对应的文本下标列表，整体保持输入顺序
+  """
+  assert max_items > 0, "max_items 必须大于 0"
+  assert max_tokens > 0, "max_tokens 必须大于 0"
+
+  batches: List[List[int]] = []
+  current: List[int] = []
+  current_tokens = 0
+
+  for i, text in enumerate(texts):
+    # 单条超长文本也要单独发出去，由 API 负责截断/报错
+    tokens = min(estimate_tokens(text), MAX_INPUT_TOKENS)
+    if current and (len(current) >= max_items or current_tokens + tokens > max_tokens):
+      batches.append(current)
+      current = []
+      current_tokens = 0
+    current.append(i)
+    current_tokens += tokens
+
+  if current:
+    batches.append(current)
+
+  return batches
@@ -4,22 +4,73 @@ core.nodes.embedding_node 的 Docstring
 （基于预训练模型或自定义模型），以便后续相似度计算和检索
 """
 
-from openai import OpenAI
+from typing import Dict, List
+
 from langchain_core.runnables import RunnableConfig
+from core.interfaces.embedding import EmbeddingProviderInterface
+from infrastructure.cache.query_embedding_cache import QueryEmbeddingCache, normalize_query
 
 async def embedding_node(query_str: str, config: RunnableConfig):
   """
   节点入口：接收清洗和 embedding 完成后的数据
   """
 
-  client = config.get("configurable", {}).get("openai")
-  assert client is not None, "client 不存在"
-  assert isinstance(client, OpenAI), "client 不是 OpenAI 类型"
+  provider = config.get("configurable", {}).get("embedding")
+  assert provider is not None, "embedding provider 不存在"
+  assert isinstance(provider, EmbeddingProviderInterface), "embedding 不是 EmbeddingProviderInterface 类型"
+
+  # 可选的查询向量缓存：归一化后的查询只作为 key，送去 embedding 的始终是原始查询，开关缓存不改变向量
+  cache = config.get("configurable", {}).get("query_embedding_cache")
+  if cache is None:
+    return await provider.embed_query(query_str)
 
+  assert isinstance(cache, QueryEmbeddingCache), "query_embedding_cache 不是 QueryEmbeddingCache 类型"
+  key = normalize_query(query_str)
+  vector = await cache.get(key)
+  if vector is None:
     # 生成向量
-  resp = client.embeddings.create(
-      model="text-embedding-3-large",
-      input=query_str
-  )
+    vector = await provider.embed_query(query_str)
+    await cache.set(key, vector)
+
+  return vector
+
+
+async def embedding_batch_node(query_strs: List[str], config: RunnableConfig) -> List[List[float]]:
+  """
+  批量查询向量化：缓存未命中的查询去重后合并为一次 provider.embed 请求
+  与 embedding_node 一致，送去 embedding 的是原始查询，归一化结果只用作缓存 key 和去重
+  :return: 与 query_strs 顺序一致的向量列表
+  """
+
+  provider = config.get("configurable", {}).get("embedding")
+  assert provider is not None, "embedding provider 不存在"
+  assert isinstance(provider, EmbeddingProviderInterface), "embedding 不是 EmbeddingProviderInterface 类型"
+
+  cache = config.get("configurable", {}).get("query_embedding_cache")
+  if cache is None:
+    keys = list(query_strs)
+  else:
+    assert isinstance(cache, QueryEmbeddingCache), "query_embedding_cache 不是 QueryEmbeddingCache 类型"
+    keys = [normalize_query(q) for q in query_strs]
+
+  # key -> 第一次出现的原始查询
+  texts: Dict[str, str] = {}
+  for key, query_str in zip(keys, query_strs):
+    texts.setdefault(key, query_str)
+
+  vectors: Dict[str, List[float]] = {}
+  if cache is not None:
+    for key in texts:
+      vector = await cache.get(key)
+      if vector is not None:
+        vectors[key] = vector
+
+  misses = [key for key in texts if key not in vectors]
+  if misses:
+    # 一次请求生成全部未命中的向量
+    for key, vector in zip(misses, await provider.embed([texts[key] for key in misses])):
+      vectors[key] = vector
+      if cache is not None:
+        await cache.set(key, vector)
 
-  return resp.data[0].embedding
\ No newline at end of file
+  return [vectors[key] for key in keys]
@@ -2,25 +2,133 @@
 core.nodes.vector_dbwrite_node 的 Docstring
 向量库管理节点，负责将 embeddings 检索接口
 """
-from typing import List
-from qdrant_client import AsyncQdrantClient
+from typing import List, Optional, Union
+from pydantic import BaseModel
+from qdrant_client.http import models
 from langchain_core.runnables import RunnableConfig
-  
-async def house_filter_node(query_vector: List[float], config: RunnableConfig):
+
+from core.nodes.lexical_encoder import LEXICAL_VECTOR
+from core.nodes.vectorstore_node import HOUSE_COLLECTION, has_lexical_vector
+from infrastructure.vectorstore.client import VECTOR_STORE_CLIENTS
+
+# 混合检索时每一路召回的候选数
+HYBRID_PREFETCH_LIMIT = 50
+
+
+class HouseSearch(BaseModel):
   """
-  向量库管理节点，负责将 embeddings 检索接口
+  批量检索中的一条查询，参数含义同 house_filter_node
   """
-  
+  query_vector: List[float]
+  query_filter: Optional[models.Filter] = None
+  limit: int = 10
+  sparse_vector: Optional[models.SparseVector] = None
+  offset: int = 0
+  with_payload: Union[bool, List[str]] = True
+
+
+def _query_request(
+  search: HouseSearch,
+  fusion: models.Fusion,
+  search_params: Optional[models.SearchParams],
+  hybrid: bool,
+) -> models.QueryRequest:
+  if hybrid and search.sparse_vector is not None and search.sparse_vector.indices:
+    prefetch_limit = max(HYBRID_PREFETCH_LIMIT, search.offset + search.limit)
+    return models.QueryRequest(
+      prefetch=[
+        models.Prefetch(query=search.query_vector, filter=search.query_filter, params=search_params, limit=prefetch_limit),
+        models.Prefetch(query=search.sparse_vector, using=LEXICAL_VECTOR, filter=search.query_filter, limit=prefetch_limit),
+      ],
+      query=models.FusionQuery(fusion=fusion),
+      limit=search.limit,
+      offset=search.offset,
+      with_payload=search.with_payload,
+      with_vector=False,
+    )
+  return models.QueryRequest(
+    query=search.query_vector,
+    filter=search.query_filter,
+    params=search_params,
+    limit=search.limit,
+    offset=search.offset,
+    with_payload=search.with_payload,
+    with_vector=False,
+  )
+
+
+def _get_client(config: RunnableConfig):
   client = config.get("configurable", {}).get("qdrant")
   assert client is not None, "client 不存在"
-  assert isinstance(client, AsyncQdrantClient), "client 不是 AsyncQdrantClient 类型"
+  assert isinstance(client, VECTOR_STORE_CLIENTS), "client 不是 AsyncQdrantClient / LocalVectorStore 类型"
+  return client
 
-  search_result = await client.query_points(
-      collection_name="house_collection",
-      query=query_vector,
-      query_filter=None,
-      limit=10
-    )
 
-  return search_result
+def _search_params(config: RunnableConfig) -> Optional[models.SearchParams]:
+  compression = config.get("configurable", {}).get("vector_compression")
+  return compression.search_params() if compression else None
+
+
+async def house_filter_node(
+  query_vector: List[float],
+  config: RunnableConfig,
+  query_filter: Optional[models.Filter] = None,
+  limit: int = 10,
+  sparse_vector: Optional[models.SparseVector] = None,
+  fusion: models.Fusion = models.Fusion.DBSF,
+  offset: int = 0,
+  with_payload: Union[bool, List[str]] = True,
+):
+  """
+  向量库管理节点，负责将 embeddings 检索接口
+  query_filter 为结构化条件，Qdrant 在 HNSW 检索过程中直接过滤
+  开启量化时按 vector_compression 的 oversampling / rescore 检索
+  提供 sparse_vector 且 collection 带 lexical 稀疏向量时，dense 与 sparse 两路 prefetch 后融合，
+  一次请求完成；否则退化为纯 dense 检索
+  fusion：dbsf 按各路分数分布归一化后相加，精确字面命中（稀疏分数远高于其他候选）会排在第一；
+  rrf 只看名次，dense 排名靠后的精确命中可能被压到后面
+  with_payload 为字段列表时只返回这些 payload 字段，向量不返回
+  """
+
+  client = _get_client(config)
+  search = HouseSearch(
+    query_vector=query_vector,
+    query_filter=query_filter,
+    limit=limit,
+    sparse_vector=sparse_vector,
+    offset=offset,
+    with_payload=with_payload,
+  )
+  hybrid = sparse_vector is not None and bool(sparse_vector.indices) and await has_lexical_vector(client, HOUSE_COLLECTION)
+  request = _query_request(search, fusion, _search_params(config), hybrid)
+
+  return await client.query_points(
+    collection_name=HOUSE_COLLECTION,
+    prefetch=request.prefetch,
+    query=request.query,
+    query_filter=request.filter,
+    search_params=request.params,
+    limit=request.limit,
+    offset=request.offset,
+    with_payload=request.with_payload,
+    with_vectors=False,
+  )
+
+
+async def house_filter_batch_node(
+  searches: List[HouseSearch],
+  config: RunnableConfig,
+  fusion: models.Fusion = models.Fusion.DBSF,
+) -> List[models.QueryResponse]:
+  """
+  批量检索：多条查询（各自的过滤条件、条数、分页）合并为一次 query_batch_points 请求
+  :return: 与 searches 顺序一致的检索结果
+  """
+  if not searches:
+    return []
 
+  client = _get_client(config)
+  search_params = _search_params(config)
+  hybrid = any(s.sparse_vector is not None for s in searches) and await has_lexical_vector(client, HOUSE_COLLECTION)
+  requests = [_query_request(search, fusion, search_params, hybrid) for search in searches]
+  return await client.query_batch_points(collection_name=HOUSE_COLLECTION, requests=requests)
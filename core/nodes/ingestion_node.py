@@ -5,10 +5,11 @@ core.nodes.ingestion_node 的 Docstring
 """
 import asyncio
 from datetime import datetime
-from typing import Optional
+from typing import AsyncIterator, Optional
 from anthropic import BaseModel
 from core.interfaces.house_info import HouseInfoInterface
 from core.models.house_info import HouseModel
+from core.models.sync_state import SyncWatermark
 from langchain_core.runnables import Runnable
 from langchain_core.runnables import  RunnableConfig
 
@@ -29,33 +30,42 @@ class Ingestion(Runnable):
   def OutputType(self):
       return dict
 
-  def __init__(self, house_api: HouseInfoInterface):
+  def __init__(self, house_api: HouseInfoInterface, watermark: Optional[SyncWatermark] = None, page_size: int = 500):
     self.house_api = house_api
+    self.page_size = page_size
+    # 本次同步的起点（上次已提交的水位线），拉取期间保持不变，保证分页稳定
+    self.watermark = watermark or SyncWatermark()
+    self.last_updated = self.watermark.updated_at
+    # 本次拉取到的数据推进后的水位线，写入向量库成功后由调用方提交
+    self.next_watermark = self.watermark
+
+  async def iter_pages(self) -> AsyncIterator[list[HouseModel]]:
+    """
+    逐页拉取房源数据（异步生成器），内存里只保留当前页
+    :return: 每页房源（已剔除水位线之内、已经同步过的记录）
+    """
+    async for houses in self.house_api.iter_pages(self.last_updated, self.page_size):
+      fresh = []
+      for house in houses:
+        # 接口按 updated_at >= 水位线过滤，同一时间戳且 id 不大于 last_id 的记录已同步过
+        if self.watermark.is_synced(house):
+          continue
+        fresh.append(house)
+        self.next_watermark = self.next_watermark.advance(house)
+
+      if fresh:
+        yield fresh
 
   async def fetch_house_data(self) -> list[HouseModel]:
     """
     拉取房源数据
     :param self: 说明
-    :return: 房源数据
+    :return: 房源数据（已剔除水位线之内、已经同步过的记录）
     """
     
     data = []
-
-    # TODO: 递归拉取所有分页数据
-    page = 1
-    page_size = 500
-    while True:
-      response = await self.house_api.fetch_house_data(self.last_updated, page, page_size)
-      data.extend(response.data.list)
-      
-      if response.data and response.data.list:
-          self.last_updated = response.data.list[-1].updated_at
-      else:
-          self.last_updated = None
-
-      if len(response.data.list) < page_size:
-        break
-      page += 1
+    async for houses in self.iter_pages():
+      data.extend(houses)
 
     return data
 
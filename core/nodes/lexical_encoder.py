@@ -0,0 +1,87 @@
+"""
+core.nodes.lexical_encoder 的 Docstring
+稀疏词法向量：本地把文本切成 中文字符二元组 + 英文/数字词，按 BM25 的词频饱和与长度归一化计算权重，
+IDF 由 Qdrant 的 Modifier.IDF 在检索时按全库统计补上。
+小区名（回祥小区）、楼号、电话片段这类精确字面，dense embedding 匹配不准，靠这一路召回
+"""
+
+import hashlib
+import re
+import unicodedata
+from collections import Counter
+from typing import List
+
+from qdrant_client.http import models
+
+# house_collection 中稀疏向量的名字
+LEXICAL_VECTOR = "lexical"
+
+_CJK_RUN = re.compile(r"[㐀-䶿一-鿿豈-﫿]+")
+_ALNUM_RUN = re.compile(r"[a-z0-9]+")
+# 连续数字（电话、门牌）额外切出定长片段，输入号码片段也能命中
+_DIGIT_SHINGLE = 4
+
+
+def tokenize(text: str) -> List[str]:
+  """
+  切词：中文按相邻二字切分（单字成词时保留单字），英文/数字按连续串切分
+  """
+  text = unicodedata.normalize("NFKC", text).lower()
+  tokens: List[str] = []
+
+  for run in _CJK_RUN.findall(text):
+    if len(run) == 1:
+      tokens.append(run)
+    else:
+      tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+
+  for run in _ALNUM_RUN.findall(text):
+    tokens.append(run)
+    if run.isdigit() and len(run) > _DIGIT_SHINGLE:
+      tokens.extend(run[i:i + _DIGIT_SHINGLE] for i in range(len(run) - _DIGIT_SHINGLE + 1))
+
+  return tokens
+
+
+def _token_index(token: str) -> int:
+  # 与 HashingEmbeddingProvider 一样使用 blake2b，跨进程稳定（内置 hash() 有随机化）
+  digest = hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest()
+  return int.from_bytes(digest, "little") & 0x7FFFFFFF
+
+
+class LexicalEncoder:
+  """
+  BM25 风格的稀疏向量编码器
+  - 文档侧：tf * (k1 + 1) / (tf + k1 * (1 - b + b * len / avg_len))
+  - 查询侧：每个词权重 1，得分即命中词的文档权重 * IDF 之和
+  """
+
+  def __init__(self, k1: float = 1.2, b: float = 0.75, avg_len: float = 64):
+    self.k1 = k1
+    self.b = b
+    # 同步是流式的，拿不到全库平均长度，使用房源文本的经验值
+    self.avg_len = avg_len
+
+  def _sparse(self, weights: dict) -> models.SparseVector:
+    merged: dict = {}
+    for token, weight in weights.items():
+      index = _token_index(token)
+      # 哈希冲突时累加
+      merged[index] = merged.get(index, 0.0) + weight
+    indices = sorted(merged)
+    return models.SparseVector(indices=indices, values=[merged[i] for i in indices])
+
+  def encode(self, text: str) -> models.SparseVector:
+    """
+    文档编码
+    """
+    counts = Counter(tokenize(text))
+    length = sum(counts.values())
+    norm = self.k1 * (1 - self.b + self.b * length / self.avg_len)
+    return self._sparse({token: tf * (self.k1 + 1) / (tf + norm) for token, tf in counts.items()})
+
+  def encode_query(self, text: str) -> models.SparseVector:
+    """
+    查询编码
+    """
+    return self._sparse({token: 1.0 for token in set(tokenize(text))})
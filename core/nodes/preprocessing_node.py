@@ -9,15 +9,17 @@ Preprocessing Node for HouseModel data.
 
 依赖：
 - pydantic
-- openai / or your embedding client
+- EmbeddingProviderInterface（通过 config["configurable"]["embedding"] 注入）
 """
 import asyncio
 from langchain_core.runnables import Runnable
 from typing import List, Optional
 from pydantic import BaseModel
-import openai
 from langchain_core.runnables import RunnableConfig
+from core.interfaces.embedding import EmbeddingProviderInterface
 from core.models.house_info import HouseModel
+from core.nodes.embedding_batch import DEFAULT_BATCH_MAX_TOKENS, DEFAULT_BATCH_SIZE, pack_batches
+from core.nodes.lexical_encoder import LEXICAL_VECTOR, LexicalEncoder
 from qdrant_client.http.models import PointStruct, models
 
 # ==========================
@@ -26,6 +28,7 @@ from qdrant_client.http.models import PointStruct, models
 
 class HouseCleaned(BaseModel):
     id: str
+    community_id: Optional[str] = None
 
     # ==== 结构化字段（metadata 用于过滤） ====
     rooms: Optional[int] = None
@@ -46,6 +49,8 @@ class HouseCleaned(BaseModel):
 
     # ==== embedding 文本 ====
     embedding_text: str
+    # ==== 稀疏词法向量文本（标题、地址、标签、备注等精确字面） ====
+    lexical_text: str = ""
 
 # {
 #             "id": str,
@@ -67,10 +72,26 @@ class PreprocessingNode(Runnable):
     def OutputType(self):
         return PointStruct
     
-    def __init__(self, embedding_model: str = "text-embedding-3-large"):
-        self.embedding_model = embedding_model
+    def __init__(
+        self,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        batch_max_tokens: int = DEFAULT_BATCH_MAX_TOKENS,
+        lexical_encoder: Optional[LexicalEncoder] = None,
+    ):
+        # 多输入 embedding 请求的条数上限和估算 token 预算
+        self.batch_size = batch_size
+        self.batch_max_tokens = batch_max_tokens
+        # 提供时额外生成稀疏词法向量（本地计算，不请求 API），用于混合检索
+        self.lexical_encoder = lexical_encoder
 
  
+    @staticmethod
+    def is_deleted(house: HouseModel) -> bool:
+        """
+        上游已软删除的房源（deleted_at 有值），不再生成 embedding，需要从向量库移除
+        """
+        return house.deleted_at is not None
+
     # ==========================
     # Step 1: 清洗 & 结构化提取
     # ==========================
@@ -129,8 +150,16 @@ class PreprocessingNode(Runnable):
 
         embedding_text = "；".join([p for p in embedding_parts if p.strip()])
 
+        lexical_text = " ".join([
+            house.title or "",
+            house.house_address or "",
+            " ".join(house.tags) if house.tags else "",
+            house.remark or "",
+        ])
+
         return HouseCleaned(
             id=house.id or "",
+            community_id=house.community_id,
             rooms=rooms,
             halls=halls,
             bathrooms=bathrooms,
@@ -144,25 +173,57 @@ class PreprocessingNode(Runnable):
             title=house.title,
             tags=house.tags,
             embedding_text=embedding_text,
+            lexical_text=" ".join(lexical_text.split()),
         )
 
     # ==========================
     # Step 2: embedding
     # ==========================
-    def embed(self, text: str, config: RunnableConfig) -> List[float]:
+    def _provider(self, config: RunnableConfig) -> EmbeddingProviderInterface:
+        provider = config.get("configurable", {}).get("embedding")
+        assert provider is not None, "embedding provider 不存在"
+        assert isinstance(provider, EmbeddingProviderInterface), "embedding 不是 EmbeddingProviderInterface 类型"
+        return provider
+
+    async def embed(self, text: str, config: RunnableConfig) -> List[float]:
         """
-        调用 embedding API
+        调用 embedding provider
         """
-        client = config.get("configurable", {}).get("openai")
-        assert client is not None, "client 不存在"
-        assert isinstance(client, openai.OpenAI), "client 不是 OpenAI 类型"
+        return await self._provider(config).embed_query(text)
 
-        resp = client.embeddings.create(
-            model=self.embedding_model,
-            input=text
-        )
+    async def embed_batch(self, texts: List[str], config: RunnableConfig) -> List[List[float]]:
+        """
+        批量调用 embedding provider
+        按 batch_size / batch_max_tokens 打包成多输入请求，并发数受 config["max_concurrency"] 限制，
+        返回的向量与 texts 顺序一一对应
+        """
+        provider = self._provider(config)
+        semaphore = asyncio.Semaphore(config.get("max_concurrency") or 1)
+
+        async def run(indexes: List[int]) -> List[List[float]]:
+            async with semaphore:
+                return await provider.embed([texts[i] for i in indexes])
+
+        batches = pack_batches(texts, self.batch_size, self.batch_max_tokens)
+        results = await asyncio.gather(*[run(indexes) for indexes in batches])
+
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        for indexes, batch_vectors in zip(batches, results):
+            for i, vector in zip(indexes, batch_vectors):
+                vectors[i] = vector
 
-        return resp.data[0].embedding
+        return vectors  # type: ignore[return-value]
+
+    def to_point(self, cleaned: HouseCleaned, embedding: List[float]) -> PointStruct:
+        vector = embedding
+        if self.lexical_encoder is not None:
+            # 默认（未命名）dense 向量 + 命名稀疏向量
+            vector = {"": embedding, LEXICAL_VECTOR: self.lexical_encoder.encode(cleaned.lexical_text)}
+        return PointStruct(
+            id=cleaned.id,
+            vector=vector,
+            payload=cleaned.model_dump(exclude={"embedding_text", "lexical_text"})
+        )
     
        # ---- 主入口 ----
     async def ainvoke(self, input: HouseModel, config: RunnableConfig) -> PointStruct:
@@ -179,13 +240,25 @@ class PreprocessingNode(Runnable):
 
         print("开始清洗", input.title)
         cleaned = self.clean(input)
-        embedding = self.embed(cleaned.embedding_text, config)
+        embedding = await self.embed(cleaned.embedding_text, config)
 
-        return PointStruct(
-            id=cleaned.id,
-            vector=embedding,
-            payload=cleaned.model_dump(exclude={"embedding_text"})
-        )
+        return self.to_point(cleaned, embedding)
+
+    async def abatch(self, inputs: List[HouseModel], config: RunnableConfig, **kwargs) -> List[PointStruct]:
+        """
+        批量处理一页房源：统一清洗后打包成多输入 embedding 请求
+        已删除的房源会被跳过，其余输出的 PointStruct 与 inputs 顺序一致
+        """
+        cleaned_list = [self.clean(house) for house in inputs if not self.is_deleted(house)]
+        return await self.embed_cleaned(cleaned_list, config)
+
+    async def embed_cleaned(self, cleaned_list: List[HouseCleaned], config: RunnableConfig) -> List[PointStruct]:
+        """
+        对已清洗的数据批量生成 embedding，输出顺序与输入一致
+        """
+        embeddings = await self.embed_batch([c.embedding_text for c in cleaned_list], config)
+
+        return [self.to_point(c, e) for c, e in zip(cleaned_list, embeddings)]
 
     def invoke(self, input: HouseModel, config: RunnableConfig) -> PointStruct:
         return asyncio.run(self.ainvoke(input, config))
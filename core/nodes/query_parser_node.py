@@ -0,0 +1,184 @@
+"""
+core.nodes.query_parser_node 的 Docstring
+用户输入处理节点：基于正则和词表，把自然语言查询里的结构化条件
+（户型、面积、价格、电梯、地铁、朝向）解析为 Qdrant payload Filter，
+剩余的语义部分交给 embedding 做向量检索
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+from qdrant_client.http import models
+from langchain_core.runnables import RunnableConfig
+
+from core.utils.number import parse_number
+from infrastructure.cache.query_embedding_cache import normalize_query
+
+_NUM = r"(\d+(?:\.\d+)?|[一二两三四五六七八九十]+)"
+
+# 上下限修饰词
+_GTE_PREFIX = r"(?:至少|最少|不少于|不低于|大于|超过)"
+_LTE_PREFIX = r"(?:最多|不超过|不高于|少于|低于|小于)"
+_GTE_SUFFIX = r"(?:以上|及以上|起|往上|多)"
+_LTE_SUFFIX = r"(?:以下|及以下|以内|之内|内)"
+_ABOUT_SUFFIX = r"(?:左右|上下|附近)"
+
+# 朝向词表（payload 中 orientation 保存原始朝向文本）
+_ORIENTATIONS = ["南北", "东西", "东南", "西南", "东北", "西北", "南", "北", "东", "西"]
+
+# 近似值（“左右”、只写面积/价格不带上下限）的浮动比例
+_ABOUT_RATIO = 0.1
+
+
+class ParsedQuery(BaseModel):
+    # 原始查询
+    text: str
+    # 去掉结构化条件后的语义部分（用于 embedding）
+    semantic_text: str
+    # 解析出的条件，如 {"rooms": {"gte": 3}, "has_elevator": True}
+    conditions: Dict[str, object] = {}
+    # 对应的 Qdrant 过滤条件
+    filter: Optional[models.Filter] = None
+
+
+def _range_pattern(unit: str) -> re.Pattern:
+    """
+    构造带单位的数值/区间正则：
+    3室、3室以上、至少3室、2-3室、2到3室、150万到200万、200万以内、100平左右
+    """
+    return re.compile(
+        rf"(?P<prefix>{_GTE_PREFIX}|{_LTE_PREFIX})?"
+        rf"{_NUM.replace('(', '(?P<low>', 1)}"
+        rf"(?:(?:{unit})?\s*(?:-|~|到|至)\s*{_NUM.replace('(', '(?P<high>', 1)})?"
+        rf"\s*(?P<unit>{unit})"
+        rf"(?P<suffix>{_GTE_SUFFIX}|{_LTE_SUFFIX}|{_ABOUT_SUFFIX})?"
+    )
+
+
+_ROOMS = _range_pattern(r"室|个?房间|房(?!源|子|东)|居")
+_AREA = _range_pattern(r"平方米|平方|平米|平|㎡|m2")
+_PRICE = _range_pattern(r"万元|万|元/月|元|块|/月")
+# 紧跟在这些词后面的金额不是总价 / 租金，不作为价格条件
+_NOT_PRICE = re.compile(r"(?:首付|单价|税费|契税|月供|押金)\s*[:：]?\s*(?:约|大约)?\s*$")
+
+_NO_ELEVATOR = re.compile(r"(?:无|没有|没|不要|不带)电梯")
+_ELEVATOR = re.compile(r"(?:有|带)?电梯(?:房)?")
+_METRO = re.compile(r"(?:近|靠近|临近|挨着)?地铁(?:口|站|房)?|地铁沿线")
+_ORIENTATION = re.compile(rf"(?:朝向?)?(?P<dir>{'|'.join(_ORIENTATIONS)})(?:朝向|向)?(?=$|\s|[，,。；;]|户型|通透)")
+_ORIENTATION_HINT = re.compile(rf"朝(?P<dir>{'|'.join(_ORIENTATIONS)})|(?P<dir2>{'|'.join(_ORIENTATIONS)})(?:朝向|向|通透)")
+
+
+def _bounds(match: re.Match, scale: float = 1.0, about_when_bare: bool = False) -> Tuple[Optional[float], Optional[float]]:
+    low = parse_number(match.group("low")) * scale
+    high = parse_number(match.group("high")) * scale if match.group("high") else None
+    prefix = match.group("prefix") or ""
+    suffix = match.group("suffix") or ""
+
+    if high is not None:
+        return min(low, high), max(low, high)
+    if re.fullmatch(_GTE_PREFIX, prefix) or re.fullmatch(_GTE_SUFFIX, suffix):
+        return low, None
+    if re.fullmatch(_LTE_PREFIX, prefix) or re.fullmatch(_LTE_SUFFIX, suffix):
+        return None, low
+    if re.fullmatch(_ABOUT_SUFFIX, suffix) or about_when_bare:
+        return low * (1 - _ABOUT_RATIO), low * (1 + _ABOUT_RATIO)
+    return low, low
+
+
+def _range_condition(key: str, low: Optional[float], high: Optional[float], integer: bool = False) -> Tuple[dict, models.FieldCondition]:
+    if integer:
+        low = int(low) if low is not None else None
+        high = int(high) if high is not None else None
+        if low is not None and low == high:
+            return {"eq": low}, models.FieldCondition(key=key, match=models.MatchValue(value=low))
+    else:
+        low = round(low, 2) if low is not None else None
+        high = round(high, 2) if high is not None else None
+    cond = {k: v for k, v in (("gte", low), ("lte", high)) if v is not None}
+    return cond, models.FieldCondition(key=key, range=models.Range(**cond))
+
+
+def parse_query(text: str) -> ParsedQuery:
+    """
+    解析查询文本
+    :param text: 用户输入，如 "回祥 3室以上 100平 200万以内 有电梯"
+    :return: ParsedQuery
+    """
+    normalized = normalize_query(text)
+    remainder = normalized
+    conditions: Dict[str, object] = {}
+    must: List[models.FieldCondition] = []
+
+    def consume(match: re.Match):
+        nonlocal remainder
+        remainder = remainder.replace(match.group(0), " ", 1)
+
+    # --- 户型 ---
+    m = _ROOMS.search(remainder)
+    if m:
+        cond, field = _range_condition("rooms", *_bounds(m), integer=True)
+        conditions["rooms"] = cond
+        must.append(field)
+        consume(m)
+
+    # --- 面积（只写一个数时按 ±10% 处理）---
+    m = _AREA.search(remainder)
+    if m:
+        cond, field = _range_condition("area", *_bounds(m, about_when_bare=True))
+        conditions["area"] = cond
+        must.append(field)
+        consume(m)
+
+    # --- 价格（单位：元，只写一个数时按 ±10% 处理）---
+    m = next((m for m in _PRICE.finditer(remainder) if not _NOT_PRICE.search(remainder, 0, m.start())), None)
+    if m:
+        scale = 10_000 if m.group("unit").startswith("万") else 1
+        cond, field = _range_condition("price", *_bounds(m, scale=scale, about_when_bare=True))
+        conditions["price"] = cond
+        must.append(field)
+        consume(m)
+
+    # --- 电梯 ---
+    m = _NO_ELEVATOR.search(remainder)
+    if m:
+        conditions["has_elevator"] = False
+        must.append(models.FieldCondition(key="has_elevator", match=models.MatchValue(value=False)))
+        consume(m)
+    else:
+        m = _ELEVATOR.search(remainder)
+        if m:
+            conditions["has_elevator"] = True
+            must.append(models.FieldCondition(key="has_elevator", match=models.MatchValue(value=True)))
+            consume(m)
+
+    # --- 地铁 ---
+    m = _METRO.search(remainder)
+    if m:
+        conditions["near_metro"] = True
+        must.append(models.FieldCondition(key="near_metro", match=models.MatchValue(value=True)))
+        consume(m)
+
+    # --- 朝向：需要 “朝南”/“南向”/独立的 “南北” 等明确写法，避免误伤小区名里的方位字 ---
+    m = _ORIENTATION_HINT.search(remainder) or _ORIENTATION.search(remainder)
+    if m:
+        direction = m.group("dir") or m.groupdict().get("dir2")
+        values = [o for o in _ORIENTATIONS if all(ch in o for ch in direction)]
+        conditions["orientation"] = values
+        must.append(models.FieldCondition(key="orientation", match=models.MatchAny(any=values)))
+        consume(m)
+
+    semantic_text = " ".join(remainder.split())
+    return ParsedQuery(
+        text=text,
+        # 全是结构化条件时仍用原始查询做 embedding，避免空文本向量
+        semantic_text=semantic_text or normalized,
+        conditions=conditions,
+        filter=models.Filter(must=must) if must else None,
+    )
+
+
+async def query_parser_node(query_str: str, config: RunnableConfig) -> ParsedQuery:
+    """
+    节点入口：解析用户查询
+    """
+    return parse_query(query_str)
@@ -0,0 +1,158 @@
+"""
+core.nodes.rerank_node 的 Docstring
+LLM 重排序节点：把向量检索的 top-N 候选压缩成一行摘要，一次结构化输出调用给所有候选打分，
+按分数重新排序。
+- 每次检索最多一次 LLM 调用，输入长度受 top_n 和摘要长度限制
+- 超过延迟预算（timeout 秒）或调用失败时保持向量检索顺序
+- 结果按 (查询, 候选 id 列表) 缓存
+"""
+
+import asyncio
+import hashlib
+import time
+from collections import deque
+from typing import Any, List, Optional, Tuple
+
+import orjson
+from langchain_core.language_models import BaseChatModel
+from pydantic import BaseModel, Field
+from qdrant_client.http import models
+
+from config.logging_config import logger
+from infrastructure.cache.backend import CacheBackendInterface
+from infrastructure.cache.query_embedding_cache import normalize_query
+
+# 生成候选摘要用到的 payload 字段（检索时即使做了字段投影也要带上）
+RERANK_PAYLOAD_FIELDS = ("title", "rooms", "area", "price", "orientation", "has_elevator", "near_metro", "tags")
+
+_PROMPT = """你是房源检索的重排序助手。根据用户需求，给下面每个候选房源打 0-10 分的相关度（10 最相关），
+只依据候选摘要判断，不要编造信息。每个候选都要给分，index 为候选前的编号。
+
+用户需求：{query}
+
+候选房源：
+{candidates}"""
+
+
+class RerankScore(BaseModel):
+  index: int = Field(description="候选编号")
+  score: float = Field(description="相关度 0-10")
+
+
+class RerankResult(BaseModel):
+  scores: List[RerankScore] = Field(description="每个候选的相关度")
+
+
+def summarize(point: models.ScoredPoint, max_chars: int = 80) -> str:
+  """
+  候选摘要：标题 | 户型 | 面积 | 价格 | 朝向 | 电梯 / 地铁 | 标签
+  """
+  p = point.payload or {}
+  parts = [
+    p.get("title") or "",
+    f"{p['rooms']}室" if p.get("rooms") else "",
+    f"{p['area']:g}平" if p.get("area") else "",
+    f"{p['price']:g}元" if p.get("price") else "",
+    p.get("orientation") or "",
+    "电梯" if p.get("has_elevator") else "",
+    "近地铁" if p.get("near_metro") else "",
+    " ".join(p.get("tags") or []),
+  ]
+  summary = " | ".join(part for part in parts if part)
+  return summary[:max_chars]
+
+
+class RerankNode:
+  """
+  用法：
+    reranker = RerankNode(model, top_n=20, timeout=1.5, cache=MemoryCacheBackend())
+    points, reranked = await reranker.rerank("回祥小区 3室 采光好", res.points)
+  """
+
+  def __init__(
+    self,
+    model: BaseChatModel,
+    top_n: int = 20,
+    timeout: float = 1.5,
+    cache: Optional[CacheBackendInterface] = None,
+    max_summary_chars: int = 80,
+    latency_window: int = 1000,
+  ):
+    assert top_n > 0, "top_n 必须大于 0"
+    self.structured_model = model.with_structured_output(RerankResult)
+    self.top_n = top_n
+    self.timeout = timeout
+    self.cache = cache
+    self.max_summary_chars = max_summary_chars
+
+    self.calls = 0
+    self.timeouts = 0
+    self.errors = 0
+    self.cache_hits = 0
+    # 最近 latency_window 次 rerank 的耗时（秒），用于统计 p50 / p95 额外开销
+    self._latencies: deque = deque(maxlen=latency_window)
+
+  def _cache_key(self, query: str, ids: List[Any]) -> str:
+    raw = orjson.dumps({"q": normalize_query(query), "ids": [str(i) for i in ids]})
+    return hashlib.sha256(raw).hexdigest()
+
+  def _prompt(self, query: str, candidates: List[models.ScoredPoint]) -> str:
+    lines = [f"[{i}] {summarize(p, self.max_summary_chars)}" for i, p in enumerate(candidates)]
+    return _PROMPT.format(query=query, candidates="\n".join(lines))
+
+  @staticmethod
+  def _order(result: RerankResult, size: int) -> List[int]:
+    # 按分数降序，同分或未打分的保持向量检索顺序
+    scores = {s.index: s.score for s in result.scores if 0 <= s.index < size}
+    return sorted(range(size), key=lambda i: (-scores.get(i, float("-inf")), i))
+
+  async def rerank(self, query: str, points: List[models.ScoredPoint]) -> Tuple[List[models.ScoredPoint], bool]:
+    """
+    对前 top_n 个候选重排序，其余候选保持原顺序接在后面
+    :return: (排序后的候选, 是否成功重排序)
+    """
+    candidates, rest = points[:self.top_n], points[self.top_n:]
+    if len(candidates) < 2:
+      return points, True
+
+    started = time.perf_counter()
+    try:
+      ids = [p.id for p in candidates]
+      key = self._cache_key(query, ids)
+      order = await self.cache.get(key) if self.cache is not None else None
+      if order is not None:
+        self.cache_hits += 1
+      else:
+        self.calls += 1
+        result = await asyncio.wait_for(self.structured_model.ainvoke(self._prompt(query, candidates)), self.timeout)
+        assert isinstance(result, RerankResult)
+        order = self._order(result, len(candidates))
+        if self.cache is not None:
+          await self.cache.set(key, order)
+    except asyncio.TimeoutError:
+      self.timeouts += 1
+      logger.warning(f"rerank 超过延迟预算 {self.timeout}s，保持向量检索顺序")
+      return points, False
+    except Exception as e:
+      self.errors += 1
+      logger.warning(f"rerank 失败，保持向量检索顺序: {e}")
+      return points, False
+    finally:
+      self._latencies.append(time.perf_counter() - started)
+
+    return [candidates[i] for i in order] + rest, True
+
+  def stats(self) -> dict:
+    latencies = sorted(self._latencies)
+
+    def percentile(q: float) -> float:
+      return latencies[min(len(latencies) - 1, int(len(latencies) * q))] * 1000 if latencies else 0.0
+
+    return {
+      "calls": self.calls,
+      "timeouts": self.timeouts,
+      "errors": self.errors,
+      "cache_hits": self.cache_hits,
+      "p50_ms": percentile(0.5),
+      "p95_ms": percentile(0.95),
+    }
@@ -3,29 +3,369 @@ core.nodes.vector_dbwrite_node 的 Docstring
 向量库管理节点，负责将 embeddings 写入或更新向量数据库
 """
 
-from typing import List
-from qdrant_client import AsyncQdrantClient
+import asyncio
+import time
+import weakref
+from typing import Callable, List, Optional, Set
 from qdrant_client.http.models import PointStruct, models
 from langchain_core.runnables import RunnableConfig
-  
-async def vectorstore_node(input: PointStruct, config: RunnableConfig):
+from config.logging_config import logger
+from core.nodes.lexical_encoder import LEXICAL_VECTOR
+from core.nodes.preprocessing_node import HouseCleaned
+from infrastructure.vectorstore.client import VECTOR_STORE_CLIENTS, VectorStoreClient
+from infrastructure.vectorstore.compression import VectorCompression
+from infrastructure.vectorstore.payload_schema import PayloadSchemaManager, derive_payload_schema
+
+HOUSE_COLLECTION = "house_collection"
+
+# 检索时会参与过滤的字段，索引类型由 HouseCleaned 的字段类型推导
+HOUSE_INDEXED_FIELDS = (
+  "rooms", "price", "area", "floor_from", "floor_to",
+  "orientation", "has_elevator", "near_metro", "community_id",
+)
+HOUSE_PAYLOAD_SCHEMA = derive_payload_schema(HouseCleaned, HOUSE_INDEXED_FIELDS)
+
+# 每个 client 已确认存在的 collection，避免每次写入都查询 collection_exists
+_ready_collections: "weakref.WeakKeyDictionary[VectorStoreClient, Set[str]]" = weakref.WeakKeyDictionary()
+# 其中带 lexical 稀疏向量的 collection（旧 collection 没有，混合检索退化为纯 dense）
+_lexical_collections: "weakref.WeakKeyDictionary[VectorStoreClient, Set[str]]" = weakref.WeakKeyDictionary()
+
+
+def house_schema_manager(client: VectorStoreClient, collection_name: str = HOUSE_COLLECTION) -> PayloadSchemaManager:
+  return PayloadSchemaManager(client, collection_name, HOUSE_PAYLOAD_SCHEMA)
+
+
+def dense_vector(point: PointStruct) -> List[float]:
   """
-  向量库管理节点，负责将 embeddings 写入或更新向量数据库
+  取 point 的默认 dense 向量（带稀疏向量时 vector 是 {"": dense, "lexical": sparse}）
   """
+  return point.vector[""] if isinstance(point.vector, dict) else point.vector
+
+
+def get_qdrant_client(config: RunnableConfig) -> VectorStoreClient:
   client = config.get("configurable", {}).get("qdrant")
   assert client is not None, "client 不存在"
-  assert isinstance(client, AsyncQdrantClient), "client 不是 AsyncQdrantClient 类型"
+  assert isinstance(client, VECTOR_STORE_CLIENTS), "client 不是 AsyncQdrantClient / LocalVectorStore 类型"
+  return client
+
 
-  if not await client.collection_exists("house_collection"):
+async def ensure_house_collection(
+  client: VectorStoreClient,
+  vector_size: int,
+  collection_name: str = HOUSE_COLLECTION,
+  compression: Optional[VectorCompression] = None,
+):
+  """
+  确保 collection 及其 payload 索引存在，结果按 client 缓存，整个进程只检查一次
+  新建的 collection 带 lexical 稀疏向量（IDF 由 Qdrant 计算）
+  已有 collection 的量化配置与 compression 不一致时在线更新；维度不一致则需要重建
+  """
+  ready = _ready_collections.setdefault(client, set())
+  if collection_name in ready:
+    return
+
+  compression = compression or VectorCompression()
+  quantization_config = compression.quantization_config()
+  if not await client.collection_exists(collection_name):
     await client.create_collection(
-      collection_name="house_collection",
-      vectors_config=models.VectorParams(size=3072, distance=models.Distance.COSINE),
+      collection_name=collection_name,
+      # 维度跟随 embedding provider 输出（text-embedding-3-large 为 3072，可截断为 256/1024）
+      vectors_config=compression.vectors_config(vector_size),
+      sparse_vectors_config={LEXICAL_VECTOR: models.SparseVectorParams(modifier=models.Modifier.IDF)},
+      quantization_config=quantization_config,
     )
+    info = await client.get_collection(collection_name)
+  else:
+    info = await client.get_collection(collection_name)
+    params = info.config.params.vectors
+    if isinstance(params, models.VectorParams) and params.size != vector_size:
+      raise ValueError(
+        f"{collection_name} 向量维度为 {params.size}，当前 embedding 维度为 {vector_size}，"
+        f"需要删除 collection 并重置同步水位线后全量同步"
+      )
+    if info.config.quantization_config != quantization_config:
+      # 量化索引在后台重建，期间检索仍可用
+      await client.update_collection(
+        collection_name=collection_name,
+        quantization_config=quantization_config or models.Disabled.DISABLED,
+      )
+      logger.info(f"{collection_name} 量化配置更新为 {compression.quantization}")
+
+  # 旧 collection 或不支持稀疏向量的后端（LocalVectorStore）只写 dense
+  if LEXICAL_VECTOR in (info.config.params.sparse_vectors or {}):
+    _lexical_collections.setdefault(client, set()).add(collection_name)
+  else:
+    logger.warning(f"{collection_name} 没有 {LEXICAL_VECTOR} 稀疏向量，只使用 dense 向量")
 
-  result = await client.upsert(collection_name="house_collection", wait=True, points=[input])
+  if collection_name == HOUSE_COLLECTION:
+    await house_schema_manager(client, collection_name).ensure_indexes()
+
+  ready.add(collection_name)
+
+
+async def has_lexical_vector(client: VectorStoreClient, collection_name: str = HOUSE_COLLECTION) -> bool:
+  """
+  collection 是否带 lexical 稀疏向量，结果按 client 缓存
+  """
+  if collection_name in _ready_collections.get(client, set()):
+    return collection_name in _lexical_collections.get(client, set())
+  if not await client.collection_exists(collection_name):
+    return False
+  info = await client.get_collection(collection_name)
+  if LEXICAL_VECTOR in (info.config.params.sparse_vectors or {}):
+    _lexical_collections.setdefault(client, set()).add(collection_name)
+    return True
+  return False
+
+
+def _fit_vectors(client: VectorStoreClient, collection_name: str, batch: List[PointStruct]) -> List[PointStruct]:
+  # 旧 collection 不认识 lexical 向量，只写 dense
+  if collection_name in _lexical_collections.get(client, set()):
+    return batch
+  return [
+    point.model_copy(update={"vector": dense_vector(point)}) if isinstance(point.vector, dict) else point
+    for point in batch
+  ]
+
+
+async def vectorstore_node(input: PointStruct, config: RunnableConfig):
+  """
+  向量库管理节点，负责将 embeddings 写入或更新向量数据库
+  """
+  client = get_qdrant_client(config)
+  compression = config.get("configurable", {}).get("vector_compression")
+
+  await ensure_house_collection(client, len(dense_vector(input)), compression=compression)
+
+  points = _fit_vectors(client, HOUSE_COLLECTION, [input])
+  result = await client.upsert(collection_name=HOUSE_COLLECTION, wait=True, points=points)
   assert result.status == models.UpdateStatus.COMPLETED
 
   print("向量库写入成功")
 
   return {"status": "ok", "count": len([input]), "raw": result}
 
+
+class QdrantBulkWriter:
+  """
+  批量流水线写入器
+  - 缓冲 PointStruct，按条数（batch_size）或时间（flush_interval 秒）触发批量 upsert
+  - 已删除房源的 id 单独缓冲，批量 delete
+  - 批量写入使用 wait=False，最多 max_in_flight 个批次同时在途
+  - close() 时先等待所有在途批次返回，剩余数据以 wait=True 写入；没有剩余数据时发一次空的 wait=True 删除作为屏障，
+    Qdrant 按顺序应用更新，屏障完成即代表之前的批次都已落库
+  - 每个批次提交后以及最终确认后调用 on_commit（用于让检索结果缓存失效）
+  - collection 不存在时按 compression（维度截断之外的量化 / on_disk 配置）创建
+
+  用法：
+    async with QdrantBulkWriter(client) as writer:
+      await writer.add(point)
+      await writer.delete(house_id)
+  """
+
+  def __init__(
+    self,
+    client: VectorStoreClient,
+    collection_name: str = HOUSE_COLLECTION,
+    batch_size: int = 256,
+    flush_interval: float = 1.0,
+    max_in_flight: int = 4,
+    on_commit: Optional[Callable[[], None]] = None,
+    compression: Optional[VectorCompression] = None,
+  ):
+    assert isinstance(client, VECTOR_STORE_CLIENTS), "client 不是 AsyncQdrantClient / LocalVectorStore 类型"
+    assert batch_size > 0, "batch_size 必须大于 0"
+    assert max_in_flight > 0, "max_in_flight 必须大于 0"
+
+    self.client = client
+    self.collection_name = collection_name
+    self.batch_size = batch_size
+    self.flush_interval = flush_interval
+    self.on_commit = on_commit
+    # 首次写入创建 collection 时使用的向量压缩配置
+    self.compression = compression
+
+    self._buffer: List[PointStruct] = []
+    self._delete_buffer: List[models.ExtendedPointId] = []
+    self._buffer_since: Optional[float] = None
+    self._in_flight = asyncio.Semaphore(max_in_flight)
+    self._tasks: Set[asyncio.Task] = set()
+    self._errors: List[BaseException] = []
+    # 是否有以 wait=False 发出、尚未经 wait=True 写入确认的批次
+    self._unconfirmed = False
+    self._ticker: Optional[asyncio.Task] = None
+    self._closing = asyncio.Event()
+
+    self.upserted = 0
+    self.deleted = 0
+    self.batches = 0
+
+  async def __aenter__(self):
+    self.start()
+    return self
+
+  async def __aexit__(self, exc_type, exc, tb):
+    if exc_type is None:
+      await self.close()
+    else:
+      await self.abort()
+
+  def start(self):
+    if self._ticker is None and self.flush_interval > 0:
+      self._ticker = asyncio.create_task(self._tick())
+
+  async def _tick(self):
+    while not self._closing.is_set():
+      try:
+        await asyncio.wait_for(self._closing.wait(), timeout=self.flush_interval)
+      except asyncio.TimeoutError:
+        pass
+      if self._buffer_since is not None and time.monotonic() - self._buffer_since >= self.flush_interval:
+        try:
+          await self.flush()
+        except Exception as e:
+          self._errors.append(e)
+
+  def _raise_if_failed(self):
+    if self._errors:
+      raise self._errors[0]
+
+  def _mark_buffered(self):
+    if self._buffer_since is None:
+      self._buffer_since = time.monotonic()
+
+  async def add(self, point: PointStruct):
+    self._raise_if_failed()
+    self._mark_buffered()
+    self._buffer.append(point)
+    if len(self._buffer) >= self.batch_size:
+      await self.flush()
+
+  async def delete(self, point_id: models.ExtendedPointId):
+    """
+    删除（下架/软删除）的房源，按批次从向量库移除
+    """
+    self._raise_if_failed()
+    self._mark_buffered()
+    self._delete_buffer.append(point_id)
+    if len(self._delete_buffer) >= self.batch_size:
+      await self.flush()
+
+  async def flush(self, wait: bool = False):
+    """
+    发出当前缓冲的批次；在途批次已满时在这里等待（背压）
+    """
+    batch, self._buffer = self._buffer, []
+    ids, self._delete_buffer = self._delete_buffer, []
+    self._buffer_since = None
+
+    if batch:
+      await ensure_house_collection(self.client, len(dense_vector(batch[0])), self.collection_name, self.compression)
+      batch = _fit_vectors(self.client, self.collection_name, batch)
+      # wait=True 时依次写入，确保删除在 upsert 之后到达
+      await self._submit("upsert", batch, wait)
+    if ids:
+      await self._submit("delete", ids, wait)
+
+  async def _submit(self, op: str, batch: list, wait: bool):
+    await self._in_flight.acquire()
+    if wait:
+      try:
+        await self._write(op, batch, wait=True)
+      finally:
+        self._in_flight.release()
+      return
+
+    task = asyncio.create_task(self._write(op, batch, wait=False))
+    self._tasks.add(task)
+    task.add_done_callback(self._on_done)
+
+  def _on_done(self, task: asyncio.Task):
+    self._tasks.discard(task)
+    self._in_flight.release()
+    if not task.cancelled() and task.exception() is not None:
+      self._errors.append(task.exception())
+
+  async def _write(self, op: str, batch: list, wait: bool):
+    if op == "upsert":
+      result = await self.client.upsert(collection_name=self.collection_name, wait=wait, points=batch)
+    else:
+      if not await self._collection_exists():
+        # collection 还不存在，没有可删除的数据
+        return
+      result = await self.client.delete(
+        collection_name=self.collection_name,
+        wait=wait,
+        points_selector=models.PointIdsList(points=batch),
+      )
+    assert result.status in (models.UpdateStatus.ACKNOWLEDGED, models.UpdateStatus.COMPLETED), f"向量库写入失败: {result.status}"
+
+    if op == "upsert":
+      self.upserted += len(batch)
+    else:
+      self.deleted += len(batch)
+    self.batches += 1
+    self._unconfirmed = not wait
+    self._committed()
+
+  async def _barrier(self):
+    """
+    空的 wait=True 删除：不重发数据、不计入统计，只用来确认之前 wait=False 的批次都已应用
+    """
+    if await self._collection_exists():
+      result = await self.client.delete(
+        collection_name=self.collection_name,
+        wait=True,
+        points_selector=models.PointIdsList(points=[]),
+      )
+      assert result.status == models.UpdateStatus.COMPLETED, f"向量库写入确认失败: {result.status}"
+    self._unconfirmed = False
+    self._committed()
+
+  def _committed(self):
+    if self.on_commit is not None:
+      self.on_commit()
+
+  async def _collection_exists(self) -> bool:
+    if self.collection_name in _ready_collections.get(self.client, set()):
+      return True
+    return await self.client.collection_exists(self.collection_name)
+
+  async def close(self) -> dict:
+    """
+    结束本次同步：写出剩余数据，等待在途批次，并确认全部写入已完成
+    """
+    await self._stop_ticker()
+
+    # 先等所有在途批次返回，之后的 wait=True 写入一定排在它们后面
+    if self._tasks:
+      await asyncio.gather(*list(self._tasks), return_exceptions=True)
+    self._raise_if_failed()
+
+    if self._buffer or self._delete_buffer:
+      # 剩余数据以 wait=True 写入，完成即代表之前的批次都已完成
+      await self.flush(wait=True)
+    elif self._unconfirmed:
+      await self._barrier()
+
+    logger.info(f"向量库批量写入完成: 写入 {self.upserted} 条, 删除 {self.deleted} 条, {self.batches} 批")
+    return self.stats()
+
+  def stats(self) -> dict:
+    return {"upserted": self.upserted, "deleted": self.deleted, "batches": self.batches}
+
+  async def abort(self):
+    await self._stop_ticker()
+    for task in list(self._tasks):
+      task.cancel()
+    if self._tasks:
+      await asyncio.gather(*list(self._tasks), return_exceptions=True)
+    self._buffer = []
+    self._delete_buffer = []
+
+  async def _stop_ticker(self):
+    # 通知定时器退出并等它结束，避免打断进行中的 flush 导致批次丢失
+    self._closing.set()
+    if self._ticker is not None:
+      await self._ticker
+      self._ticker = None
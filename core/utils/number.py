@@ -0,0 +1,22 @@
+"""
+core.utils.number 的 Docstring
+数字解析：阿拉伯数字和简单中文数字（三、十、十二、二十五），供查询解析和房源文本提取共用
+"""
+import re
+
+# 中文数字
+CN_DIGITS = {"零": 0, "一": 1, "二": 2, "两": 2, "三": 3, "四": 4, "五": 5, "六": 6, "七": 7, "八": 8, "九": 9, "十": 10}
+
+
+def parse_number(raw: str) -> float:
+  """
+  :param raw: "3"、"89.5"、"三"、"十二"、"二十五"
+  :return: 数值，无法识别的中文数字按 0 处理
+  """
+  if re.fullmatch(r"\d+(?:\.\d+)?", raw):
+    return float(raw)
+  # 简单中文数字：三、十、十二、二十、二十五
+  if "十" in raw:
+    tens, _, ones = raw.partition("十")
+    return float((CN_DIGITS.get(tens, 1) if tens else 1) * 10 + (CN_DIGITS.get(ones, 0) if ones else 0))
+  return float(CN_DIGITS.get(raw, 0))
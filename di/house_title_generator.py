@@ -0,0 +1,27 @@
+from functools import lru_cache
+
+from config.settings import settings
+from di.ai_provider import get_gpt_4o_mini_client
+from infrastructure.cache.backend import create_cache_backend
+from service.house_title_generator import HouseTitleGenerator
+
+# 全局单例：同步流水线和接口共用 LLM 结果缓存
+@lru_cache(maxsize=1)
+def get_house_title_generator() -> HouseTitleGenerator:
+  cache = create_cache_backend(
+    settings.QUERY_CACHE_BACKEND,
+    namespace="house_title",
+    max_size=settings.TITLE_CACHE_SIZE,
+    ttl=settings.TITLE_CACHE_TTL,
+    redis_host=settings.REDIS_HOST,
+    redis_port=settings.REDIS_PORT,
+    redis_db=settings.REDIS_DB,
+    redis_password=settings.REDIS_PASSWORD,
+  )
+  return HouseTitleGenerator(
+    get_gpt_4o_mini_client() if settings.TITLE_LLM_FALLBACK else None,
+    cache=cache,
+    batch_size=settings.TITLE_LLM_BATCH_SIZE,
+    max_concurrency=settings.TITLE_LLM_MAX_CONCURRENCY,
+    overwrite=settings.TITLE_OVERWRITE,
+  )
@@ -0,0 +1,8 @@
+from functools import lru_cache
+
+from di.ai_provider import get_gpt_4o_mini_client
+from service.marketing_plan_service import MarketingPlanService
+
+@lru_cache(maxsize=1)
+def get_marketing_plan_service() -> MarketingPlanService:
+  return MarketingPlanService(get_gpt_4o_mini_client())
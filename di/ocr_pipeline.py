@@ -0,0 +1,16 @@
+from functools import lru_cache
+
+from config.settings import settings
+from core.chains.ocr_pipeline import OcrPipeline
+from di.parser_house_info_service import get_parser_house_info_service
+from infrastructure.ocr.ocr_backend import create_ocr_backend
+
+# 全局单例：首次请求 /ocr 时才创建后端和进程池，未安装 OCR 依赖时不影响其他接口
+@lru_cache(maxsize=1)
+def get_ocr_pipeline() -> OcrPipeline:
+  return OcrPipeline(
+    create_ocr_backend(settings.OCR_BACKEND, lang=settings.OCR_LANG),
+    get_parser_house_info_service(),
+    max_workers=settings.OCR_MAX_WORKERS,
+    max_side=settings.OCR_MAX_SIDE,
+  )
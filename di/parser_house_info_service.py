@@ -1,12 +1,26 @@
+from functools import lru_cache
 
-
-from typing import Annotated
-from fastapi import Depends
-from langchain_openai import ChatOpenAI
-
+from config.settings import settings
 from di.ai_provider import get_gpt_4o_mini_client
+from infrastructure.cache.backend import create_cache_backend
 from service.parser_house_info import ParserHouseInfoService
 
-def get_parser_house_info_service(model: Annotated[ChatOpenAI, Depends(get_gpt_4o_mini_client)]):
-  return ParserHouseInfoService(model)
-  
\ No newline at end of file
+# 全局单例：结构化输出 runnable 和解析结果缓存在请求之间复用
+@lru_cache(maxsize=1)
+def get_parser_house_info_service() -> ParserHouseInfoService:
+  cache = create_cache_backend(
+    settings.QUERY_CACHE_BACKEND,
+    namespace="parser_house_info",
+    max_size=settings.PARSER_CACHE_SIZE,
+    ttl=settings.PARSER_CACHE_TTL,
+    redis_host=settings.REDIS_HOST,
+    redis_port=settings.REDIS_PORT,
+    redis_db=settings.REDIS_DB,
+    redis_password=settings.REDIS_PASSWORD,
+  )
+  return ParserHouseInfoService(
+    get_gpt_4o_mini_client(),
+    cache=cache,
+    max_concurrency=settings.PARSER_MAX_CONCURRENCY,
+    fast_path=settings.PARSER_FAST_PATH,
+  )
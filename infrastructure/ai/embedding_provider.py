@@ -0,0 +1,103 @@
+"""
+infrastructure.ai.embedding_provider 的 Docstring
+Embedding 提供方实现：
+- OpenAIEmbeddingProvider：基于 AsyncOpenAI，不阻塞事件循环
+- HashingEmbeddingProvider：本地确定性字符 n-gram 哈希向量，用于测试和压测
+"""
+
+import hashlib
+import math
+from typing import List, Optional, Tuple
+
+from openai import AsyncOpenAI
+
+from core.interfaces.embedding import EmbeddingProviderInterface
+
+
+class OpenAIEmbeddingProvider(EmbeddingProviderInterface):
+  def __init__(self, client: AsyncOpenAI, model: str = "text-embedding-3-large", dimensions: int = 3072):
+    assert isinstance(client, AsyncOpenAI), "client 不是 AsyncOpenAI 类型"
+    self.client = client
+    self.model = model
+    self.dimensions = dimensions
+
+  async def embed(self, texts: List[str]) -> List[List[float]]:
+    kwargs = {}
+    # text-embedding-3 系列由服务端做 Matryoshka 截断并归一化，旧模型不支持 dimensions 参数
+    if self.model.startswith("text-embedding-3"):
+      kwargs["dimensions"] = self.dimensions
+    resp = await self.client.embeddings.create(
+      model=self.model,
+      input=texts,
+      **kwargs
+    )
+    assert len(resp.data) == len(texts), "embedding 返回数量与输入不一致"
+
+    # resp.data[].index 是该条在 input 中的下标
+    vectors: List[Optional[List[float]]] = [None] * len(texts)
+    for item in resp.data:
+      vectors[item.index] = item.embedding
+    return vectors  # type: ignore[return-value]
+
+
+def truncate_embedding(vector: List[float], dimensions: int) -> List[float]:
+  """
+  Matryoshka 截断：保留前 dimensions 维并重新做 L2 归一化
+  与 text-embedding-3 的 dimensions 参数结果一致，可用来离线评估不同维度而不必重新请求
+  """
+  head = vector[:dimensions]
+  norm = math.sqrt(sum(v * v for v in head))
+  if norm == 0:
+    return head
+  return [v / norm for v in head]
+
+
+class HashingEmbeddingProvider(EmbeddingProviderInterface):
+  """
+  字符 n-gram 哈希向量（feature hashing），纯本地计算、结果确定
+  相同文本在任何进程里都得到相同向量，相似文本共享较多 n-gram，余弦相似度也更高
+  """
+
+  def __init__(self, dimensions: int = 256, ngram_range: Tuple[int, int] = (1, 3), model: str = "hashing-ngram"):
+    assert dimensions > 0, "dimensions 必须大于 0"
+    self.dimensions = dimensions
+    self.ngram_range = ngram_range
+    self.model = f"{model}-{dimensions}"
+
+  def _embed_one(self, text: str) -> List[float]:
+    vector = [0.0] * self.dimensions
+    text = " ".join(text.split())
+    lo, hi = self.ngram_range
+    for n in range(lo, hi + 1):
+      for i in range(len(text) - n + 1):
+        gram = text[i:i + n]
+        # 不能用内置 hash()，它在不同进程间是随机化的
+        digest = hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest()
+        bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+        sign = 1.0 if digest[4] & 1 else -1.0
+        vector[bucket] += sign
+
+    norm = math.sqrt(sum(v * v for v in vector))
+    if norm == 0:
+      return vector
+    return [v / norm for v in vector]
+
+  async def embed(self, texts: List[str]) -> List[List[float]]:
+    return [self._embed_one(text) for text in texts]
+
+
+def create_embedding_provider(
+  provider: str,
+  model: str = "text-embedding-3-large",
+  dimensions: int = 3072,
+  base_url: Optional[str] = None,
+) -> EmbeddingProviderInterface:
+  """
+  根据配置创建 embedding 提供方
+  :param provider: openai | hashing
+  """
+  if provider == "openai":
+    return OpenAIEmbeddingProvider(AsyncOpenAI(base_url=base_url), model=model, dimensions=dimensions)
+  if provider == "hashing":
+    return HashingEmbeddingProvider(dimensions=dimensions)
+  raise ValueError(f"不支持的 embedding provider: {provider}")
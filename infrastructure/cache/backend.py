@@ -0,0 +1,124 @@
+"""
+infrastructure.cache.backend 的 Docstring
+通用缓存后端：
+- MemoryCacheBackend：进程内 LRU + TTL
+- RedisCacheBackend：基于 REDIS_* 配置的共享缓存（需要安装 redis 包）
+"""
+
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+import orjson
+
+
+class CacheBackendInterface(ABC):
+
+  @abstractmethod
+  async def get(self, key: str) -> Optional[Any]:
+    """
+    读取缓存，不存在或已过期返回 None
+    """
+    pass
+
+  @abstractmethod
+  async def set(self, key: str, value: Any):
+    """
+    写入缓存
+    """
+    pass
+
+  @abstractmethod
+  async def clear(self):
+    """
+    清空缓存
+    """
+    pass
+
+
+class MemoryCacheBackend(CacheBackendInterface):
+  """
+  有界 LRU + TTL 缓存，过期条目在读取时惰性淘汰
+  """
+
+  def __init__(self, max_size: int = 10_000, ttl: Optional[float] = None):
+    assert max_size > 0, "max_size 必须大于 0"
+    self.max_size = max_size
+    self.ttl = ttl
+    self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+  async def get(self, key: str) -> Optional[Any]:
+    item = self._data.get(key)
+    if item is None:
+      return None
+    expires_at, value = item
+    if expires_at and expires_at < time.monotonic():
+      del self._data[key]
+      return None
+    self._data.move_to_end(key)
+    return value
+
+  async def set(self, key: str, value: Any):
+    expires_at = time.monotonic() + self.ttl if self.ttl else 0
+    self._data[key] = (expires_at, value)
+    self._data.move_to_end(key)
+    while len(self._data) > self.max_size:
+      self._data.popitem(last=False)
+
+  async def clear(self):
+    self._data.clear()
+
+  def __len__(self) -> int:
+    return len(self._data)
+
+
+class RedisCacheBackend(CacheBackendInterface):
+  """
+  Redis 共享缓存，值以 JSON 存储，多实例之间共享命中
+  """
+
+  def __init__(self, client, namespace: str, ttl: Optional[float] = None):
+    self.client = client
+    self.namespace = namespace
+    self.ttl = ttl
+
+  def _key(self, key: str) -> str:
+    return f"domus:{self.namespace}:{key}"
+
+  async def get(self, key: str) -> Optional[Any]:
+    raw = await self.client.get(self._key(key))
+    return orjson.loads(raw) if raw is not None else None
+
+  async def set(self, key: str, value: Any):
+    await self.client.set(self._key(key), orjson.dumps(value), ex=int(self.ttl) if self.ttl else None)
+
+  async def clear(self):
+    async for key in self.client.scan_iter(match=self._key("*")):
+      await self.client.delete(key)
+
+
+def create_cache_backend(
+  backend: str,
+  namespace: str,
+  max_size: int = 10_000,
+  ttl: Optional[float] = None,
+  redis_host: str = "localhost",
+  redis_port: int = 6379,
+  redis_db: int = 0,
+  redis_password: Optional[str] = None,
+) -> CacheBackendInterface:
+  """
+  根据配置创建缓存后端
+  :param backend: memory | redis
+  """
+  if backend == "memory":
+    return MemoryCacheBackend(max_size=max_size, ttl=ttl)
+  if backend == "redis":
+    try:
+      import redis.asyncio as redis
+    except ImportError as e:
+      raise ImportError("使用 redis 缓存后端需要先安装 redis 包: poetry install --extras redis") from e
+    client = redis.Redis(host=redis_host, port=redis_port, db=redis_db, password=redis_password)
+    return RedisCacheBackend(client, namespace=namespace, ttl=ttl)
+  raise ValueError(f"不支持的缓存后端: {backend}")
@@ -0,0 +1,155 @@
+"""
+infrastructure.cache.embedding_cache 的 Docstring
+Embedding 持久化缓存：以 模型名@维度 + embedding 文本哈希 为 key，把向量存到本地 SQLite，
+内容没变的房源在下一次同步时直接命中缓存，不再调用 embedding API
+"""
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from core.interfaces.embedding import EmbeddingProviderInterface
+
+
+class EmbeddingCache:
+  """
+  基于 SQLite 的 embedding 缓存
+  - 向量以 float32 二进制存储
+  - 超过 max_entries 时按最近访问时间淘汰最旧的条目
+  """
+
+  def __init__(self, path: str, max_entries: int = 200_000):
+    assert max_entries > 0, "max_entries 必须大于 0"
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+    self.path = path
+    self.max_entries = max_entries
+    self.hits = 0
+    self.misses = 0
+    self._lock = threading.Lock()
+    self._conn = sqlite3.connect(path, check_same_thread=False)
+    self._conn.execute("PRAGMA journal_mode=WAL")
+    self._conn.execute("PRAGMA synchronous=NORMAL")
+    self._conn.execute(
+      "CREATE TABLE IF NOT EXISTS embeddings ("
+      " key TEXT PRIMARY KEY,"
+      " vector BLOB NOT NULL,"
+      " accessed_at REAL NOT NULL)"
+    )
+    self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_accessed_at ON embeddings (accessed_at)")
+    self._conn.commit()
+
+  @staticmethod
+  def make_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+  def get_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+    """
+    批量查询缓存
+    :return: 与 texts 顺序一致，未命中的位置为 None
+    """
+    keys = [self.make_key(model, text) for text in texts]
+    found: Dict[str, List[float]] = {}
+
+    with self._lock:
+      unique_keys = list(dict.fromkeys(keys))
+      # SQLite 默认最多 999 个绑定参数
+      for i in range(0, len(unique_keys), 500):
+        chunk = unique_keys[i:i + 500]
+        placeholders = ",".join("?" * len(chunk))
+        rows = self._conn.execute(
+          f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+        ).fetchall()
+        for key, blob in rows:
+          found[key] = array("f", blob).tolist()
+
+      if found:
+        now = time.time()
+        self._conn.executemany(
+          "UPDATE embeddings SET accessed_at = ? WHERE key = ?",
+          [(now, key) for key in found]
+        )
+        self._conn.commit()
+
+      results = [found.get(key) for key in keys]
+      hit_count = sum(1 for r in results if r is not None)
+      self.hits += hit_count
+      self.misses += len(results) - hit_count
+
+    return results
+
+  def put_many(self, model: str, texts: List[str], vectors: List[List[float]]):
+    """
+    批量写入缓存，并按容量淘汰
+    """
+    now = time.time()
+    rows = [
+      (self.make_key(model, text), array("f", vector).tobytes(), now)
+      for text, vector in zip(texts, vectors)
+    ]
+
+    with self._lock:
+      self._conn.executemany(
+        "INSERT OR REPLACE INTO embeddings (key, vector, accessed_at) VALUES (?, ?, ?)", rows
+      )
+      self._evict()
+      self._conn.commit()
+
+  def _evict(self):
+    (size,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+    overflow = size - self.max_entries
+    if overflow > 0:
+      self._conn.execute(
+        "DELETE FROM embeddings WHERE key IN "
+        "(SELECT key FROM embeddings ORDER BY accessed_at ASC LIMIT ?)",
+        (overflow,)
+      )
+
+  def size(self) -> int:
+    with self._lock:
+      (size,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+    return size
+
+  def stats(self) -> dict:
+    total = self.hits + self.misses
+    return {
+      "hits": self.hits,
+      "misses": self.misses,
+      "hit_rate": self.hits / total if total else 0.0,
+      "size": self.size(),
+      "max_entries": self.max_entries,
+    }
+
+  def close(self):
+    with self._lock:
+      self._conn.close()
+
+
+class CachedEmbeddingProvider(EmbeddingProviderInterface):
+  """
+  带持久化缓存的 embedding provider，只把未命中的文本交给底层 provider
+  """
+
+  def __init__(self, provider: EmbeddingProviderInterface, cache: EmbeddingCache):
+    self.provider = provider
+    self.cache = cache
+    self.model = provider.model
+    self.dimensions = provider.dimensions
+
+  async def embed(self, texts: List[str]) -> List[List[float]]:
+    vectors = await asyncio.to_thread(self.cache.get_many, self.provider.cache_key, texts)
+
+    # 同一批里重复的文本只请求一次
+    missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+    if missing:
+      fresh = await self.provider.embed(missing)
+      await asyncio.to_thread(self.cache.put_many, self.provider.cache_key, missing, fresh)
+      fresh_map = dict(zip(missing, fresh))
+      vectors = [vector if vector is not None else fresh_map[text] for text, vector in zip(texts, vectors)]
+
+    return vectors  # type: ignore[return-value]
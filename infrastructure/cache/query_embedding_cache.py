@@ -0,0 +1,48 @@
+"""
+infrastructure.cache.query_embedding_cache 的 Docstring
+查询向量缓存：热门查询（"回祥 2室"、"学区房"）归一化后命中缓存，不再重复请求 embedding
+"""
+
+import hashlib
+import unicodedata
+from typing import List, Optional
+
+from infrastructure.cache.backend import CacheBackendInterface
+
+
+def normalize_query(text: str) -> str:
+  """
+  查询归一化：全角转半角（NFKC）、英文小写、合并空白
+  """
+  text = unicodedata.normalize("NFKC", text)
+  return " ".join(text.lower().split())
+
+
+class QueryEmbeddingCache:
+  def __init__(self, backend: CacheBackendInterface, model: str):
+    self.backend = backend
+    self.model = model
+    self.hits = 0
+    self.misses = 0
+
+  def _key(self, normalized: str) -> str:
+    return hashlib.sha256(f"{self.model}\0{normalized}".encode("utf-8")).hexdigest()
+
+  async def get(self, normalized: str) -> Optional[List[float]]:
+    vector = await self.backend.get(self._key(normalized))
+    if vector is None:
+      self.misses += 1
+    else:
+      self.hits += 1
+    return vector
+
+  async def set(self, normalized: str, vector: List[float]):
+    await self.backend.set(self._key(normalized), vector)
+
+  def stats(self) -> dict:
+    total = self.hits + self.misses
+    return {
+      "hits": self.hits,
+      "misses": self.misses,
+      "hit_rate": self.hits / total if total else 0.0,
+    }
@@ -0,0 +1,74 @@
+"""
+infrastructure.cache.search_result_cache 的 Docstring
+检索结果缓存：key 由 归一化查询 + 过滤条件 + limit + 索引代数 组成，
+同步流程每提交一批写入就把索引代数 +1，旧代数的缓存自然失效，同步后不会读到过期结果
+"""
+
+import hashlib
+from typing import Any, Optional
+
+import orjson
+
+from infrastructure.cache.backend import CacheBackendInterface
+from infrastructure.cache.query_embedding_cache import normalize_query
+
+
+class IndexGeneration:
+  """
+  向量索引代数，每次写入提交后递增
+  """
+
+  def __init__(self):
+    self.value = 0
+
+  def bump(self):
+    self.value += 1
+
+
+class SearchResultCache:
+  def __init__(self, backend: CacheBackendInterface, generation: IndexGeneration):
+    self.backend = backend
+    self.generation = generation
+    self.hits = 0
+    self.misses = 0
+
+  def make_key(self, query: str, filters: Any = None, limit: int = 10, **params: Any) -> str:
+    raw = orjson.dumps(
+      {
+        "q": normalize_query(query),
+        "f": filters,
+        "l": limit,
+        "p": params,
+        "g": self.generation.value,
+      },
+      option=orjson.OPT_SORT_KEYS,
+      default=_default,
+    )
+    return hashlib.sha256(raw).hexdigest()
+
+  async def get(self, key: str) -> Optional[Any]:
+    value = await self.backend.get(key)
+    if value is None:
+      self.misses += 1
+    else:
+      self.hits += 1
+    return value
+
+  async def set(self, key: str, value: Any):
+    await self.backend.set(key, value)
+
+  def stats(self) -> dict:
+    total = self.hits + self.misses
+    return {
+      "hits": self.hits,
+      "misses": self.misses,
+      "hit_rate": self.hits / total if total else 0.0,
+      "generation": self.generation.value,
+    }
+
+
+def _default(value: Any):
+  # pydantic 模型（如 qdrant Filter）按字段序列化
+  if hasattr(value, "model_dump"):
+    return value.model_dump(mode="json", exclude_none=True)
+  raise TypeError(f"无法序列化: {type(value)}")
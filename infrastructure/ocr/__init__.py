@@ -0,0 +1 @@
+# OCR package
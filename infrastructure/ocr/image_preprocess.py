@@ -0,0 +1,67 @@
+"""
+infrastructure.ocr.image_preprocess 的 Docstring
+OCR 前的图片预处理（CPU 密集，在进程池中执行）：
+- decode：解码、按 EXIF 方向摆正、转灰度
+- deskew：在缩略图上按水平投影方差搜索倾斜角，旋转纠偏（拍照录入常见的小角度倾斜）
+- resize：长边缩放到 max_side 以内，控制识别耗时
+需要安装 Pillow
+"""
+
+import io
+from typing import Any
+
+import numpy as np
+
+try:
+  from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - 可选依赖
+  Image = None
+
+# 纠偏搜索范围（度）和步长
+_MAX_SKEW = 5.0
+_SKEW_STEP = 0.5
+# 估计倾斜角时使用的缩略图宽度
+_SKEW_SAMPLE_WIDTH = 800
+
+
+def _require_pillow():
+  if Image is None:
+    raise ImportError("OCR 图片预处理需要先安装 Pillow: pip install pillow")
+
+
+def decode(data: bytes) -> Any:
+  _require_pillow()
+  image = Image.open(io.BytesIO(data))
+  image = ImageOps.exif_transpose(image)
+  return image.convert("L")
+
+
+def estimate_skew(image: Any) -> float:
+  """
+  文字行与水平方向对齐时，逐行黑像素数的方差最大
+  """
+  sample = image
+  if image.width > _SKEW_SAMPLE_WIDTH:
+    sample = image.resize((_SKEW_SAMPLE_WIDTH, max(1, image.height * _SKEW_SAMPLE_WIDTH // image.width)))
+  best_angle, best_score = 0.0, -1.0
+  for angle in np.arange(-_MAX_SKEW, _MAX_SKEW + _SKEW_STEP / 2, _SKEW_STEP):
+    rotated = np.asarray(sample.rotate(float(angle), fillcolor=255)) < 128
+    score = float(np.var(rotated.sum(axis=1)))
+    if score > best_score:
+      best_angle, best_score = float(angle), score
+  return best_angle
+
+
+def deskew(image: Any) -> Any:
+  angle = estimate_skew(image)
+  if abs(angle) < _SKEW_STEP:
+    return image
+  return image.rotate(angle, expand=True, fillcolor=255)
+
+
+def resize(image: Any, max_side: int) -> Any:
+  if max(image.size) <= max_side:
+    return image
+  image = image.copy()
+  image.thumbnail((max_side, max_side))
+  return image
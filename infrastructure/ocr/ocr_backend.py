@@ -0,0 +1,70 @@
+"""
+infrastructure.ocr.ocr_backend 的 Docstring
+OCR 后端实现：
+- TesseractOcrBackend：本地 Tesseract（需要安装 tesseract 及 chi_sim 语言包、pytesseract、Pillow）
+- FakeOcrBackend：把图片字节按 UTF-8 当作识别结果，用于测试和压测
+recognize_image 为进程池 worker 入口：预处理 + 识别都在子进程内完成，只把文本和耗时传回主进程
+"""
+
+import time
+from typing import Dict, Tuple
+
+from core.interfaces.ocr import OcrBackendInterface
+from infrastructure.ocr import image_preprocess
+
+
+class TesseractOcrBackend(OcrBackendInterface):
+  def __init__(self, lang: str = "chi_sim+eng", config: str = "--psm 6"):
+    self.lang = lang
+    self.config = config
+
+  def recognize(self, image) -> str:
+    import pytesseract
+
+    return pytesseract.image_to_string(image, lang=self.lang, config=self.config)
+
+
+class FakeOcrBackend(OcrBackendInterface):
+  preprocess = False
+
+  def recognize(self, image: bytes) -> str:
+    return image.decode("utf-8")
+
+
+def recognize_image(backend: OcrBackendInterface, data: bytes, max_side: int = 2000) -> Tuple[str, Dict[str, float]]:
+  """
+  进程池 worker：解码 → 纠偏 → 缩放 → 识别
+  :return: (识别文本, 各阶段耗时 ms)
+  """
+  timings: Dict[str, float] = {}
+
+  def timed(stage: str, fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    timings[stage] = (time.perf_counter() - started) * 1000
+    return result
+
+  image = data
+  if backend.preprocess:
+    image = timed("decode", image_preprocess.decode, data)
+    image = timed("deskew", image_preprocess.deskew, image)
+    image = timed("resize", image_preprocess.resize, image, max_side)
+  text = timed("ocr", backend.recognize, image)
+  return text, timings
+
+
+def create_ocr_backend(backend: str, lang: str = "chi_sim+eng") -> OcrBackendInterface:
+  """
+  根据配置创建 OCR 后端
+  :param backend: tesseract | fake
+  """
+  if backend == "tesseract":
+    try:
+      import pytesseract  # noqa: F401
+      import PIL  # noqa: F401
+    except ImportError as e:
+      raise ImportError("使用 tesseract OCR 需要先安装 pytesseract 和 Pillow: pip install pytesseract pillow") from e
+    return TesseractOcrBackend(lang=lang)
+  if backend == "fake":
+    return FakeOcrBackend()
+  raise ValueError(f"不支持的 OCR 后端: {backend}")
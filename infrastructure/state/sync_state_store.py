@@ -0,0 +1,75 @@
+"""
+infrastructure.state.sync_state_store 的 Docstring
+同步状态持久化：把每个数据源的增量同步水位线保存到本地 SQLite，
+进程重启后从上次提交的位置继续增量同步，而不是全量重拉
+"""
+
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from core.models.sync_state import SyncWatermark
+
+
+class SyncStateStore:
+  def __init__(self, path: str):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+    self.path = path
+    self._lock = threading.Lock()
+    self._conn = sqlite3.connect(path, check_same_thread=False)
+    self._conn.execute(
+      "CREATE TABLE IF NOT EXISTS sync_state ("
+      " source TEXT PRIMARY KEY,"
+      " updated_at TEXT,"
+      " last_id TEXT,"
+      " committed_at TEXT NOT NULL)"
+    )
+    self._conn.commit()
+
+  def load(self, source: str) -> SyncWatermark:
+    """
+    读取数据源的水位线，不存在时返回空水位线（全量同步）
+    """
+    with self._lock:
+      row = self._conn.execute(
+        "SELECT updated_at, last_id FROM sync_state WHERE source = ?", (source,)
+      ).fetchone()
+
+    if row is None:
+      return SyncWatermark()
+
+    updated_at, last_id = row
+    return SyncWatermark(
+      updated_at=datetime.fromisoformat(updated_at) if updated_at else None,
+      last_id=last_id,
+    )
+
+  def commit(self, source: str, watermark: SyncWatermark):
+    """
+    提交水位线；调用方必须保证水位线之前的数据已经写入向量库
+    """
+    with self._lock:
+      self._conn.execute(
+        "INSERT OR REPLACE INTO sync_state (source, updated_at, last_id, committed_at) VALUES (?, ?, ?, ?)",
+        (
+          source,
+          watermark.updated_at.isoformat() if watermark.updated_at else None,
+          watermark.last_id,
+          datetime.now().isoformat(),
+        )
+      )
+      self._conn.commit()
+
+  def reset(self, source: str):
+    """
+    清除水位线，下次同步全量拉取
+    """
+    with self._lock:
+      self._conn.execute("DELETE FROM sync_state WHERE source = ?", (source,))
+      self._conn.commit()
+
+  def close(self):
+    with self._lock:
+      self._conn.close()
@@ -0,0 +1 @@
+# Suggest package
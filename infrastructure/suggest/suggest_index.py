@@ -0,0 +1,251 @@
+"""
+infrastructure.suggest.suggest_index 的 Docstring
+搜索框输入提示（灰色补全）：内存前缀树，每次按键只做一次前缀查找，不调用 LLM / embedding / 向量库
+- 提示词：小区名（标题第一个词）、房源标题、标签
+- 索引 key：归一化后的原文，安装 pypinyin 时另加全拼和拼音首字母（回祥小区 -> huixiangxiaoqu / hxxq）
+- 排序：引用该词的在库房源数 + 被搜索次数（热度）
+- 每个节点缓存子树 top-k，更新时只把受影响路径上的缓存置空，查询时按需重算
+"""
+
+import heapq
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from config.logging_config import logger
+from infrastructure.cache.query_embedding_cache import normalize_query
+
+try:
+  from pypinyin import lazy_pinyin
+except ImportError:  # pragma: no cover - 可选依赖
+  lazy_pinyin = None
+
+_CJK = re.compile(r"[㐀-䶿一-鿿豈-﫿]")
+
+# 提示词类型，同一个词出现在多处时取优先级高的类型
+KIND_PRIORITY = {"community": 0, "tag": 1, "title": 2}
+
+
+def suggest_terms(payload: Dict[str, Any]) -> Dict[str, str]:
+  """
+  从房源 payload 中提取提示词
+  :return: {提示词: 类型}
+  """
+  terms: Dict[str, str] = {}
+
+  def add(text: Optional[str], kind: str):
+    text = " ".join((text or "").split())
+    if not text:
+      return
+    current = terms.get(text)
+    if current is None or KIND_PRIORITY[kind] < KIND_PRIORITY[current]:
+      terms[text] = kind
+
+  title = payload.get("title") or ""
+  add(title, "title")
+  # 标题约定以小区名开头：回祥小区 3室 精装
+  words = title.split()
+  if len(words) > 1 and _CJK.search(words[0]):
+    add(words[0], "community")
+  for tag in payload.get("tags") or []:
+    add(tag, "tag")
+  return terms
+
+
+class _Node:
+  __slots__ = ("children", "terms", "best")
+
+  def __init__(self):
+    self.children: Dict[str, "_Node"] = {}
+    # 以该节点结尾的 key 对应的提示词
+    self.terms: Set[str] = set()
+    # 子树 top-k 缓存，None 表示需要重算
+    self.best: Optional[List[str]] = None
+
+
+class _Term:
+  __slots__ = ("text", "kind", "count", "hits", "keys")
+
+  def __init__(self, text: str, kind: str, keys: List[str]):
+    self.text = text
+    self.kind = kind
+    # 引用该词的在库房源数
+    self.count = 0
+    # 被搜索次数
+    self.hits = 0
+    self.keys = keys
+
+
+class SuggestIndex:
+  """
+  用法：
+    index = SuggestIndex()
+    index.update(house_id, {"title": "回祥小区 3室 精装", "tags": ["近地铁"]})
+    index.suggest("回祥")  # [{"text": "回祥小区", "kind": "community", "score": 1}, ...]
+  """
+
+  def __init__(self, top_k: int = 10, pinyin: bool = True):
+    assert top_k > 0, "top_k 必须大于 0"
+    self.top_k = top_k
+    self.pinyin = pinyin and lazy_pinyin is not None
+    if pinyin and lazy_pinyin is None:
+      logger.info("未安装 pypinyin，输入提示不支持拼音匹配: pip install pypinyin")
+    self._root = _Node()
+    self._terms: Dict[str, _Term] = {}
+    # 房源 id -> 提示词，增量更新时用来扣减旧词
+    self._houses: Dict[Any, Dict[str, str]] = {}
+
+  def __len__(self) -> int:
+    return len(self._terms)
+
+  def _keys(self, text: str) -> List[str]:
+    normalized = normalize_query(text)
+    keys = {normalized}
+    if self.pinyin and _CJK.search(normalized):
+      syllables = [s for s in lazy_pinyin(normalized) if s.strip()]
+      keys.add("".join(syllables).replace(" ", ""))
+      keys.add("".join(s[0] for s in syllables if s[0].isalnum()))
+    return [k for k in keys if k]
+
+  def _score(self, text: str) -> Tuple[int, int, str]:
+    term = self._terms[text]
+    # 热度高的在前，同分时短词在前
+    return (term.count + term.hits, -len(text), text)
+
+  def _path(self, key: str, create: bool = False) -> List[_Node]:
+    node, path = self._root, [self._root]
+    for char in key:
+      child = node.children.get(char)
+      if child is None:
+        if not create:
+          return []
+        child = node.children[char] = _Node()
+      node = child
+      path.append(node)
+    return path
+
+  def _invalidate(self, term: _Term):
+    for key in term.keys:
+      for node in self._path(key):
+        node.best = None
+
+  def _add_term(self, text: str, kind: str):
+    term = self._terms.get(text)
+    if term is None:
+      term = self._terms[text] = _Term(text, kind, self._keys(text))
+      for key in term.keys:
+        self._path(key, create=True)[-1].terms.add(text)
+    elif KIND_PRIORITY[kind] < KIND_PRIORITY[term.kind]:
+      term.kind = kind
+    term.count += 1
+    self._invalidate(term)
+
+  def _remove_term(self, text: str):
+    term = self._terms.get(text)
+    if term is None:
+      return
+    term.count -= 1
+    self._invalidate(term)
+    if term.count > 0:
+      return
+    # 已无房源引用，搜索热度一并丢弃
+    del self._terms[text]
+    for key in term.keys:
+      path = self._path(key)
+      if not path:
+        continue
+      path[-1].terms.discard(text)
+      # 自底向上清理空节点
+      for depth in range(len(key), 0, -1):
+        node = path[depth]
+        if node.terms or node.children:
+          break
+        del path[depth - 1].children[key[depth - 1]]
+
+  def update(self, house_id: Any, payload: Dict[str, Any]):
+    """
+    新增或更新一套房源的提示词
+    """
+    new = suggest_terms(payload)
+    old = self._houses.get(house_id, {})
+    for text in old.keys() - new.keys():
+      self._remove_term(text)
+    for text, kind in new.items():
+      if text not in old:
+        self._add_term(text, kind)
+      elif KIND_PRIORITY[kind] < KIND_PRIORITY[self._terms[text].kind]:
+        self._terms[text].kind = kind
+    if new:
+      self._houses[house_id] = new
+    else:
+      self._houses.pop(house_id, None)
+
+  def remove(self, house_id: Any):
+    """
+    房源删除后扣减其提示词
+    """
+    for text in self._houses.pop(house_id, {}):
+      self._remove_term(text)
+
+  def record(self, query: str):
+    """
+    记录一次搜索，完整命中提示词时增加其热度
+    """
+    term = self._terms.get(" ".join(query.split()))
+    if term is not None:
+      term.hits += 1
+      self._invalidate(term)
+
+  def _best(self, node: _Node) -> List[str]:
+    if node.best is None:
+      candidates = set(node.terms)
+      for child in node.children.values():
+        candidates.update(self._best(child))
+      node.best = heapq.nlargest(self.top_k, candidates, key=self._score)
+    return node.best
+
+  def suggest(self, prefix: str, limit: int = 10) -> List[dict]:
+    """
+    前缀补全，按热度排序
+    """
+    key = normalize_query(prefix)
+    if not key or limit <= 0:
+      return []
+    path = self._path(key)
+    if not path:
+      return []
+    results = []
+    for text in self._best(path[-1])[:limit]:
+      term = self._terms[text]
+      results.append({"text": text, "kind": term.kind, "score": term.count + term.hits})
+    return results
+
+  def stats(self) -> dict:
+    return {"terms": len(self._terms), "houses": len(self._houses), "pinyin": self.pinyin}
+
+
+async def load_suggest_index(
+  index: SuggestIndex,
+  client: Any,
+  collection_name: str,
+  batch_size: int = 1000,
+) -> int:
+  """
+  启动时从向量库 payload 重建提示索引（增量同步只会带来水位线之后的房源）
+  :return: 载入的房源数
+  """
+  loaded = 0
+  offset = None
+  while True:
+    records, offset = await client.scroll(
+      collection_name=collection_name,
+      limit=batch_size,
+      offset=offset,
+      with_payload=["title", "tags"],
+      with_vectors=False,
+    )
+    for record in records:
+      index.update(record.id, record.payload or {})
+    loaded += len(records)
+    if offset is None:
+      return loaded
+
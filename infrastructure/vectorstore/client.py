@@ -0,0 +1,33 @@
+"""
+infrastructure.vectorstore.client 的 Docstring
+向量库客户端：按 VECTORSTORE_TYPE 创建远程 Qdrant 客户端或进程内 LocalVectorStore，
+两者对节点暴露相同的方法
+"""
+
+from typing import Optional, Union
+
+from qdrant_client import AsyncQdrantClient
+
+from infrastructure.vectorstore.local_store import LocalVectorStore
+
+# 节点里做类型校验用
+VECTOR_STORE_CLIENTS = (AsyncQdrantClient, LocalVectorStore)
+VectorStoreClient = Union[AsyncQdrantClient, LocalVectorStore]
+
+
+def create_vectorstore_client(
+  vectorstore_type: str,
+  url: Optional[str] = None,
+  path: Optional[str] = None,
+  dtype: str = "float32",
+) -> VectorStoreClient:
+  """
+  根据配置创建向量库客户端
+  :param vectorstore_type: qdrant | local
+  """
+  if vectorstore_type == "qdrant":
+    return AsyncQdrantClient(url=url)
+  if vectorstore_type == "local":
+    assert path, "本地向量库需要配置 VECTORSTORE_PATH"
+    return LocalVectorStore(path, dtype=dtype)
+  raise ValueError(f"不支持的向量库类型: {vectorstore_type}")
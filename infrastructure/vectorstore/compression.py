@@ -0,0 +1,77 @@
+"""
+infrastructure.vectorstore.compression 的 Docstring
+向量压缩配置：
+- 维度截断：text-embedding-3 系列支持 Matryoshka 截断（EMBEDDING_DIMENSIONS=256/1024），由 embedding provider 负责
+- 量化：scalar（int8，内存约为 float32 的 1/4）或 binary（1 bit，约 1/32），量化向量常驻内存
+- 原始向量可放到磁盘（on_disk），检索时先用量化向量取 limit * oversampling 个候选，再用原始向量重新打分
+"""
+
+import math
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+from qdrant_client.http import models
+
+
+class VectorCompression(BaseModel):
+  # none | scalar | binary
+  quantization: Literal["none", "scalar", "binary"] = "none"
+  # 原始向量存磁盘（开启量化时建议打开，内存里只保留量化向量）
+  on_disk: bool = False
+  # 量化向量常驻内存
+  always_ram: bool = True
+  # 检索时量化候选的放大倍数，以及是否用原始向量重新打分
+  oversampling: float = 2.0
+  rescore: bool = True
+  # HNSW 检索宽度，None 使用 Qdrant 默认值
+  hnsw_ef: Optional[int] = None
+
+  @classmethod
+  def from_settings(cls, settings) -> "VectorCompression":
+    return cls(
+      quantization=settings.VECTOR_QUANTIZATION,
+      on_disk=settings.VECTOR_ON_DISK,
+      always_ram=settings.QUANTIZATION_ALWAYS_RAM,
+      oversampling=settings.SEARCH_OVERSAMPLING,
+      rescore=settings.SEARCH_RESCORE,
+      hnsw_ef=settings.SEARCH_HNSW_EF,
+    )
+
+  def vectors_config(self, size: int) -> models.VectorParams:
+    return models.VectorParams(size=size, distance=models.Distance.COSINE, on_disk=self.on_disk or None)
+
+  def quantization_config(self) -> Optional[models.QuantizationConfig]:
+    if self.quantization == "scalar":
+      return models.ScalarQuantization(
+        scalar=models.ScalarQuantizationConfig(type=models.ScalarType.INT8, quantile=0.99, always_ram=self.always_ram)
+      )
+    if self.quantization == "binary":
+      return models.BinaryQuantization(binary=models.BinaryQuantizationConfig(always_ram=self.always_ram))
+    return None
+
+  def search_params(self) -> Optional[models.SearchParams]:
+    """
+    查询参数：开启量化时附带 oversampling / rescore
+    """
+    quantization = None
+    if self.quantization != "none":
+      quantization = models.QuantizationSearchParams(rescore=self.rescore, oversampling=self.oversampling)
+    if quantization is None and self.hnsw_ef is None:
+      return None
+    return models.SearchParams(hnsw_ef=self.hnsw_ef, quantization=quantization)
+
+  def estimate_memory(self, points: int, size: int) -> dict:
+    """
+    估算向量占用（字节，不含 HNSW 图和 payload）
+    """
+    original = points * size * 4
+    if self.quantization == "scalar":
+      quantized = points * size
+    elif self.quantization == "binary":
+      quantized = points * math.ceil(size / 8)
+    else:
+      quantized = 0
+
+    ram = (0 if self.on_disk else original) + (quantized if self.always_ram else 0)
+    disk = original + quantized
+    return {"ram_bytes": ram, "disk_bytes": disk}
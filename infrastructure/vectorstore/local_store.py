@@ -0,0 +1,691 @@
+"""
+infrastructure.vectorstore.local_store 的 Docstring
+进程内向量库（VECTORSTORE_TYPE=local）：不依赖远程 Qdrant，适合小规模部署和测试
+- 向量：NumPy float32/float16 矩阵，memmap 到 VECTORSTORE_PATH/<collection>/vectors.bin
+- payload：id -> payload 侧表，持久化在同目录的 SQLite 中，启动时整体加载到内存
+- 检索：精确检索，矩阵乘 + argpartition 取 top-k
+- 过滤：payload 字段预先展开为列数组（数值 / 布尔 / 关键字编码），用向量化比较得到候选掩码；
+  写入时只原地更新受影响的行，类型不再兼容的列才丢弃重建
+- memmap / SQLite / 列计算都在 asyncio.to_thread 中执行，不阻塞事件循环；每个 collection 一把锁串行化读写
+
+实现了各节点用到的 AsyncQdrantClient 方法子集（collection_exists / create_collection / get_collection /
+upsert / delete / count / scroll / query_points / query_batch_points / create_payload_index 等），参数和返回值沿用 qdrant_client 的模型，
+节点代码不需要区分后端。不支持稀疏向量和 prefetch 融合，混合检索会自动退化为纯 dense
+"""
+
+import asyncio
+import shutil
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import orjson
+from qdrant_client.http import models
+
+from config.logging_config import logger
+
+_INITIAL_CAPACITY = 1024
+# float16 矩阵分块转换成 float32 再做矩阵乘，控制临时内存
+_SCORE_CHUNK = 16_384
+# scroll 返回过的 next_offset -> 行号，offset 对应的点在两页之间被删除时仍能继续翻页
+_SCROLL_CURSORS = 1024
+
+_SCHEMA_TYPES = {
+  models.PayloadSchemaType.INTEGER: "number",
+  models.PayloadSchemaType.FLOAT: "number",
+  models.PayloadSchemaType.BOOL: "bool",
+  models.PayloadSchemaType.KEYWORD: "keyword",
+}
+
+
+def _get_path(payload: dict, key: str) -> Any:
+  value: Any = payload
+  for part in key.split("."):
+    if not isinstance(value, dict):
+      return None
+    value = value.get(part)
+  return value
+
+
+class _Column:
+  """
+  单个 payload 字段展开后的列
+  - number：float64，缺失为 NaN（全部缺失的列也按 number 处理）
+  - bool：int8，缺失为 -1
+  - keyword：int32 编码，缺失为 -1
+  - object：无法向量化（数组、混合类型），逐行判断
+  """
+
+  _MISSING = {"number": np.nan, "bool": -1, "keyword": -1}
+  _DTYPES = {"number": np.float64, "bool": np.int8, "keyword": np.int32}
+
+  def __init__(self, kind: str, values: Any, vocab: Optional[Dict[str, int]] = None):
+    self.kind = kind
+    self.values = values
+    self.vocab = vocab or {}
+
+  @staticmethod
+  def _kind(raw: List[Any]) -> str:
+    present = [v for v in raw if v is not None]
+    if present and all(isinstance(v, bool) for v in present):
+      return "bool"
+    if all(_is_number(v) for v in present):
+      return "number"
+    if all(isinstance(v, str) for v in present):
+      return "keyword"
+    return "object"
+
+  @classmethod
+  def build(cls, raw: List[Any]) -> "_Column":
+    column = cls(cls._kind(raw), None)
+    if column.kind == "object":
+      column.values = list(raw)
+    else:
+      column.values = np.array([column._store(v) for v in raw], dtype=cls._DTYPES[column.kind])
+    return column
+
+  def _store(self, value: Any) -> Any:
+    if value is None:
+      return self._MISSING[self.kind]
+    if self.kind == "bool":
+      return int(value)
+    if self.kind == "keyword":
+      return self.vocab.setdefault(value, len(self.vocab))
+    return value
+
+  def resize(self, n: int):
+    """
+    行数增长时补齐缺失值
+    """
+    extra = n - len(self.values)
+    if extra <= 0:
+      return
+    if self.kind == "object":
+      self.values.extend([None] * extra)
+    else:
+      self.values = np.concatenate([self.values, np.full(extra, self._MISSING[self.kind], dtype=self._DTYPES[self.kind])])
+
+  def update(self, rows: List[int], raw: List[Any]) -> bool:
+    """
+    原地更新若干行；新值与列类型不兼容时返回 False，由调用方丢弃该列
+    """
+    kind = self._kind(raw)
+    if self.kind != "object" and kind != self.kind and any(v is not None for v in raw):
+      return False
+    for row, value in zip(rows, raw):
+      self.values[row] = value if self.kind == "object" else self._store(value)
+    return True
+
+  def _encode(self, value: Any) -> Any:
+    if self.kind == "keyword":
+      return self.vocab.get(value, -2) if isinstance(value, str) else -2
+    if self.kind == "bool":
+      return int(value) if isinstance(value, bool) else -2
+    # NaN 与任何值都不相等，类型不符的值不会命中
+    return value if _is_number(value) else np.nan
+
+  def match(self, values: Sequence[Any]) -> np.ndarray:
+    if self.kind == "object":
+      wanted = set(values)
+      return np.array([_matches_any(v, wanted) for v in self.values], dtype=bool)
+    encoded = [self._encode(v) for v in values]
+    return np.isin(self.values, encoded)
+
+  def present(self) -> np.ndarray:
+    if self.kind == "number":
+      return ~np.isnan(self.values)
+    if self.kind == "object":
+      return np.array([v is not None for v in self.values], dtype=bool)
+    return self.values >= 0
+
+  def range(self, r: models.Range) -> np.ndarray:
+    if self.kind == "object":
+      # 混合类型的列只有数值行参与比较（与 Qdrant 一致，非数值不命中）
+      values = np.array([v if _is_number(v) else np.nan for v in self.values], dtype=np.float64)
+    elif self.kind == "number":
+      values = self.values
+    else:
+      return np.zeros(len(self.values), dtype=bool)
+    mask = ~np.isnan(values)
+    with np.errstate(invalid="ignore"):
+      if r.gt is not None:
+        mask &= values > r.gt
+      if r.gte is not None:
+        mask &= values >= r.gte
+      if r.lt is not None:
+        mask &= values < r.lt
+      if r.lte is not None:
+        mask &= values <= r.lte
+    return mask
+
+
+def _is_number(value: Any) -> bool:
+  return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _matches_any(value: Any, wanted: set) -> bool:
+  # 数组字段任一元素命中即可（与 Qdrant 一致）
+  if isinstance(value, list):
+    return any(_hashable(v) in wanted for v in value)
+  return _hashable(value) in wanted
+
+
+def _hashable(value: Any) -> Any:
+  return value if isinstance(value, (str, int, float, bool)) or value is None else orjson.dumps(value)
+
+
+class _LocalCollection:
+
+  def __init__(self, path: Path):
+    self.path = path
+    meta = orjson.loads((path / "meta.json").read_bytes())
+    self.size: int = meta["size"]
+    self.distance = models.Distance(meta["distance"])
+    self.dtype = np.dtype(meta["dtype"])
+    self.capacity: int = meta["capacity"]
+    self.payload_schema: Dict[str, str] = meta.get("payload_schema", {})
+
+    # 连接在线程池的不同线程中使用，由 collection 锁保证同一时刻只有一个线程访问
+    self._conn = sqlite3.connect(path / "payload.sqlite3", check_same_thread=False)
+    self._conn.execute("PRAGMA journal_mode=WAL")
+    self._conn.execute("CREATE TABLE IF NOT EXISTS points (row INTEGER PRIMARY KEY, id BLOB NOT NULL, payload BLOB NOT NULL)")
+    self._conn.commit()
+
+    self._open_vectors()
+    self.ids: List[Any] = [None] * self.capacity
+    self.payloads: List[Optional[dict]] = [None] * self.capacity
+    self.alive = np.zeros(self.capacity, dtype=bool)
+    self.rows: Dict[Any, int] = {}
+    for row, raw_id, raw_payload in self._conn.execute("SELECT row, id, payload FROM points"):
+      point_id = orjson.loads(raw_id)
+      self.ids[row] = point_id
+      self.payloads[row] = orjson.loads(raw_payload)
+      self.alive[row] = True
+      self.rows[point_id] = row
+    # 已用行数的上界，检索只扫描 [0, high_water)
+    self.high_water = max(self.rows.values()) + 1 if self.rows else 0
+    self.free = [row for row in range(self.high_water) if not self.alive[row]]
+    self._columns: Dict[str, _Column] = {}
+    self.cursors: "OrderedDict[Any, int]" = OrderedDict()
+    # 读写都在线程池中执行，同一 collection 的操作串行化
+    self.lock = threading.RLock()
+
+  @staticmethod
+  def create(path: Path, size: int, distance: models.Distance, dtype: str):
+    path.mkdir(parents=True, exist_ok=True)
+    meta = {"size": size, "distance": distance.value, "dtype": dtype, "capacity": _INITIAL_CAPACITY, "payload_schema": {}}
+    (path / "meta.json").write_bytes(orjson.dumps(meta))
+    with open(path / "vectors.bin", "wb") as f:
+      f.truncate(_INITIAL_CAPACITY * size * np.dtype(dtype).itemsize)
+
+  def _open_vectors(self):
+    self.vectors = np.memmap(self.path / "vectors.bin", dtype=self.dtype, mode="r+", shape=(self.capacity, self.size))
+
+  def _save_meta(self):
+    meta = {
+      "size": self.size,
+      "distance": self.distance.value,
+      "dtype": self.dtype.name,
+      "capacity": self.capacity,
+      "payload_schema": self.payload_schema,
+    }
+    (self.path / "meta.json").write_bytes(orjson.dumps(meta))
+
+  def _grow(self, needed: int):
+    capacity = self.capacity
+    while capacity < needed:
+      capacity *= 2
+    if capacity == self.capacity:
+      return
+    self.vectors.flush()
+    del self.vectors
+    with open(self.path / "vectors.bin", "r+b") as f:
+      f.truncate(capacity * self.size * self.dtype.itemsize)
+    extra = capacity - self.capacity
+    self.ids.extend([None] * extra)
+    self.payloads.extend([None] * extra)
+    self.alive = np.concatenate([self.alive, np.zeros(extra, dtype=bool)])
+    self.capacity = capacity
+    self._open_vectors()
+    self._save_meta()
+
+  def _prepare(self, vector: Any) -> np.ndarray:
+    if isinstance(vector, dict):
+      # 只存默认 dense 向量，命名稀疏向量忽略
+      vector = vector[""]
+    arr = np.asarray(vector, dtype=np.float32)
+    assert arr.shape == (self.size,), f"向量维度 {arr.shape} 与 collection 维度 {self.size} 不一致"
+    if self.distance == models.Distance.COSINE:
+      norm = np.linalg.norm(arr)
+      if norm > 0:
+        arr = arr / norm
+    return arr
+
+  def upsert(self, points: Iterable[models.PointStruct]):
+    points = list(points)
+    new = sum(1 for p in points if p.id not in self.rows)
+    self._grow(self.high_water + max(0, new - len(self.free)))
+
+    rows = []
+    touched: set = set()
+    for point in points:
+      row = self.rows.get(point.id)
+      if row is None:
+        row = self.free.pop() if self.free else self.high_water
+        self.high_water = max(self.high_water, row + 1)
+        self.rows[point.id] = row
+      payload = point.payload or {}
+      touched.update(self.payloads[row] or {})
+      touched.update(payload)
+      self.vectors[row] = self._prepare(point.vector)
+      self.ids[row] = point.id
+      self.payloads[row] = payload
+      self.alive[row] = True
+      rows.append((row, orjson.dumps(point.id), orjson.dumps(payload)))
+
+    self.vectors.flush()
+    self._conn.executemany("INSERT OR REPLACE INTO points (row, id, payload) VALUES (?, ?, ?)", rows)
+    self._conn.commit()
+    self._update_columns([row for row, _, _ in rows], touched)
+
+  def _update_columns(self, rows: List[int], touched: set):
+    """
+    只更新写入涉及的行：未涉及的字段补齐新行的缺失值，涉及的字段原地写入新值，类型不兼容时丢弃该列
+    """
+    for key, column in list(self._columns.items()):
+      column.resize(self.high_water)
+      if key.split(".", 1)[0] not in touched:
+        # 复用的空闲行可能残留已删除点的值
+        column.update(rows, [None] * len(rows))
+        continue
+      if not column.update(rows, [_get_path(self.payloads[row], key) for row in rows]):
+        del self._columns[key]
+
+  def delete(self, ids: Iterable[Any]):
+    removed = []
+    for point_id in ids:
+      row = self.rows.pop(point_id, None)
+      if row is None:
+        continue
+      self.alive[row] = False
+      self.ids[row] = None
+      self.payloads[row] = None
+      self.free.append(row)
+      removed.append((row,))
+    if removed:
+      # 列数组不需要失效：已删除的行由 alive 掩码排除，行被复用时在 upsert 中覆盖
+      self._conn.executemany("DELETE FROM points WHERE row = ?", removed)
+      self._conn.commit()
+
+  def column(self, key: str) -> _Column:
+    column = self._columns.get(key)
+    if column is None:
+      raw = [_get_path(p, key) if p is not None else None for p in self.payloads[:self.high_water]]
+      column = self._columns[key] = _Column.build(raw)
+    return column
+
+  # ==========================
+  # 过滤
+  # ==========================
+  def mask(self, query_filter: Optional[models.Filter]) -> np.ndarray:
+    alive = self.alive[:self.high_water]
+    if query_filter is None:
+      return alive.copy()
+    return alive & self._filter_mask(query_filter)
+
+  def _filter_mask(self, f: models.Filter) -> np.ndarray:
+    n = self.high_water
+    mask = np.ones(n, dtype=bool)
+    for cond in _as_list(f.must):
+      mask &= self._condition_mask(cond)
+    should = _as_list(f.should)
+    if should:
+      any_mask = np.zeros(n, dtype=bool)
+      for cond in should:
+        any_mask |= self._condition_mask(cond)
+      mask &= any_mask
+    for cond in _as_list(f.must_not):
+      mask &= ~self._condition_mask(cond)
+    return mask
+
+  def _condition_mask(self, cond: Any) -> np.ndarray:
+    if isinstance(cond, models.Filter):
+      return self._filter_mask(cond)
+    if isinstance(cond, models.HasIdCondition):
+      wanted = set(cond.has_id)
+      return np.array([i in wanted for i in self.ids[:self.high_water]], dtype=bool)
+    if isinstance(cond, models.IsNullCondition):
+      return np.array([_get_path(p or {}, cond.is_null.key) is None for p in self.payloads[:self.high_water]], dtype=bool)
+    if isinstance(cond, models.FieldCondition):
+      column = self.column(cond.key)
+      if cond.range is not None:
+        if not isinstance(cond.range, models.Range):
+          raise NotImplementedError("本地向量库不支持 datetime range 过滤")
+        return column.range(cond.range)
+      match = cond.match
+      if isinstance(match, models.MatchValue):
+        return column.match([match.value])
+      if isinstance(match, models.MatchAny):
+        return column.match(list(match.any))
+      if isinstance(match, models.MatchExcept):
+        return column.present() & ~column.match(list(getattr(match, "except_")))
+    raise NotImplementedError(f"本地向量库不支持的过滤条件: {cond}")
+
+  # ==========================
+  # 检索
+  # ==========================
+  def search(self, query: Any, query_filter: Optional[models.Filter], limit: int, offset: int = 0):
+    candidates = np.flatnonzero(self.mask(query_filter))
+    k = min(limit + offset, candidates.size)
+    if k <= 0:
+      return []
+
+    q = self._prepare(query)
+    scores = self._scores(candidates, q)
+    if k < candidates.size:
+      top = np.argpartition(-scores, k - 1)[:k]
+    else:
+      top = np.arange(candidates.size)
+    top = top[np.argsort(-scores[top], kind="stable")][offset:]
+    return [(int(candidates[i]), float(scores[i])) for i in top]
+
+  def _scores(self, rows: np.ndarray, q: np.ndarray) -> np.ndarray:
+    contiguous = rows.size == self.high_water
+    if self.dtype == np.float32:
+      matrix = self.vectors[:self.high_water] if contiguous else self.vectors[rows]
+      return np.asarray(matrix @ q, dtype=np.float32)
+    # float16 没有 BLAS 加速，分块转 float32
+    out = np.empty(rows.size, dtype=np.float32)
+    for start in range(0, rows.size, _SCORE_CHUNK):
+      chunk = rows[start:start + _SCORE_CHUNK]
+      block = self.vectors[chunk[0]:chunk[-1] + 1] if contiguous else self.vectors[chunk]
+      out[start:start + chunk.size] = block.astype(np.float32) @ q
+    return out
+
+  def vector(self, row: int) -> List[float]:
+    return self.vectors[row].astype(np.float32).tolist()
+
+  def close(self):
+    self.vectors.flush()
+    self._conn.close()
+
+
+def _as_list(value: Any) -> list:
+  if value is None:
+    return []
+  return value if isinstance(value, list) else [value]
+
+
+def _select_payload(payload: dict, with_payload: Union[bool, Sequence[str], models.PayloadSelector, None]) -> Optional[dict]:
+  if with_payload is None or with_payload is False:
+    return None
+  if with_payload is True:
+    return payload
+  if isinstance(with_payload, models.PayloadSelectorInclude):
+    return {k: v for k, v in payload.items() if k in with_payload.include}
+  if isinstance(with_payload, models.PayloadSelectorExclude):
+    return {k: v for k, v in payload.items() if k not in with_payload.exclude}
+  return {k: v for k, v in payload.items() if k in with_payload}
+
+
+class LocalVectorStore:
+  """
+  进程内向量库，接口与节点使用的 AsyncQdrantClient 方法保持一致
+
+  用法：
+    client = LocalVectorStore("data/processed/embeddings/local_vectorstore")
+    await client.create_collection("house_collection", vectors_config=models.VectorParams(size=256, distance=models.Distance.COSINE))
+    await client.upsert("house_collection", points=[...])
+    await client.query_points("house_collection", query=[...], query_filter=..., limit=10)
+  """
+
+  def __init__(self, path: str, dtype: str = "float32"):
+    assert dtype in ("float32", "float16"), "dtype 只支持 float32 / float16"
+    self.path = Path(path)
+    self.path.mkdir(parents=True, exist_ok=True)
+    self.dtype = dtype
+    self._collections: Dict[str, _LocalCollection] = {}
+
+  def _collection_path(self, collection_name: str) -> Path:
+    return self.path / collection_name
+
+  def _open(self, collection_name: str) -> _LocalCollection:
+    path = self._collection_path(collection_name)
+    if not (path / "meta.json").exists():
+      raise ValueError(f"collection {collection_name} 不存在")
+    return _LocalCollection(path)
+
+  async def _get(self, collection_name: str) -> _LocalCollection:
+    collection = self._collections.get(collection_name)
+    if collection is None:
+      # 首次打开需要读取 SQLite 全部 payload
+      opened = await asyncio.to_thread(self._open, collection_name)
+      collection = self._collections.setdefault(collection_name, opened)
+      if collection is not opened:
+        opened.close()
+    return collection
+
+  async def _run(self, collection_name: str, fn: Callable[[_LocalCollection], Any]) -> Any:
+    """
+    在线程池中持有 collection 锁执行 fn(collection)
+    """
+    collection = await self._get(collection_name)
+
+    def locked():
+      with collection.lock:
+        return fn(collection)
+
+    return await asyncio.to_thread(locked)
+
+  async def collection_exists(self, collection_name: str, **kwargs) -> bool:
+    return collection_name in self._collections or (self._collection_path(collection_name) / "meta.json").exists()
+
+  async def create_collection(
+    self,
+    collection_name: str,
+    vectors_config: models.VectorParams,
+    sparse_vectors_config: Optional[dict] = None,
+    quantization_config: Any = None,
+    **kwargs,
+  ) -> bool:
+    assert isinstance(vectors_config, models.VectorParams), "本地向量库只支持单个默认 dense 向量"
+    assert vectors_config.distance in (models.Distance.COSINE, models.Distance.DOT), "本地向量库只支持 Cosine / Dot 距离"
+    if await self.collection_exists(collection_name):
+      raise ValueError(f"collection {collection_name} 已存在")
+    if sparse_vectors_config:
+      logger.info(f"本地向量库不支持稀疏向量，{collection_name} 只使用 dense 检索")
+    await asyncio.to_thread(
+      _LocalCollection.create, self._collection_path(collection_name), vectors_config.size, vectors_config.distance, self.dtype,
+    )
+    return True
+
+  async def get_collection(self, collection_name: str, **kwargs) -> models.CollectionInfo:
+    collection = await self._get(collection_name)
+    points = len(collection.rows)
+    return models.CollectionInfo.model_construct(
+      status=models.CollectionStatus.GREEN,
+      points_count=points,
+      indexed_vectors_count=points,
+      config=models.CollectionConfig.model_construct(
+        params=models.CollectionParams.model_construct(
+          vectors=models.VectorParams(size=collection.size, distance=collection.distance),
+          sparse_vectors=None,
+        ),
+        quantization_config=None,
+      ),
+      payload_schema={
+        field: models.PayloadIndexInfo(data_type=models.PayloadSchemaType(schema_type), points=points)
+        for field, schema_type in collection.payload_schema.items()
+      },
+    )
+
+  async def update_collection(self, collection_name: str, **kwargs) -> bool:
+    # 量化等配置对精确检索没有意义
+    await self._get(collection_name)
+    return True
+
+  async def delete_collection(self, collection_name: str, **kwargs) -> bool:
+    collection = self._collections.pop(collection_name, None)
+    path = self._collection_path(collection_name)
+
+    def remove() -> bool:
+      if collection is not None:
+        with collection.lock:
+          collection.close()
+      if not path.exists():
+        return False
+      shutil.rmtree(path)
+      return True
+
+    return await asyncio.to_thread(remove)
+
+  async def create_payload_index(
+    self,
+    collection_name: str,
+    field_name: str,
+    field_schema: Any = None,
+    wait: bool = True,
+    **kwargs,
+  ) -> models.UpdateResult:
+    schema_type = models.PayloadSchemaType(field_schema) if field_schema is not None else models.PayloadSchemaType.KEYWORD
+    assert schema_type in _SCHEMA_TYPES, f"本地向量库不支持 {schema_type.value} 索引"
+
+    def index(collection: _LocalCollection):
+      collection.payload_schema[field_name] = schema_type.value
+      collection._save_meta()
+      # 预先展开列数组
+      collection.column(field_name)
+
+    await self._run(collection_name, index)
+    return models.UpdateResult(operation_id=0, status=models.UpdateStatus.COMPLETED)
+
+  async def upsert(self, collection_name: str, points: List[models.PointStruct], wait: bool = True, **kwargs) -> models.UpdateResult:
+    await self._run(collection_name, lambda collection: collection.upsert(points))
+    return models.UpdateResult(operation_id=0, status=models.UpdateStatus.COMPLETED)
+
+  async def delete(self, collection_name: str, points_selector: Any, wait: bool = True, **kwargs) -> models.UpdateResult:
+    def delete(collection: _LocalCollection):
+      if isinstance(points_selector, models.PointIdsList):
+        ids = points_selector.points
+      elif isinstance(points_selector, models.FilterSelector):
+        ids = [collection.ids[row] for row in np.flatnonzero(collection.mask(points_selector.filter))]
+      elif isinstance(points_selector, models.Filter):
+        ids = [collection.ids[row] for row in np.flatnonzero(collection.mask(points_selector))]
+      else:
+        ids = list(points_selector)
+      collection.delete(ids)
+
+    await self._run(collection_name, delete)
+    return models.UpdateResult(operation_id=0, status=models.UpdateStatus.COMPLETED)
+
+  async def count(self, collection_name: str, count_filter: Optional[models.Filter] = None, exact: bool = True, **kwargs) -> models.CountResult:
+    count = await self._run(collection_name, lambda collection: int(collection.mask(count_filter).sum()))
+    return models.CountResult(count=count)
+
+  async def query_points(
+    self,
+    collection_name: str,
+    query: Any = None,
+    query_filter: Optional[models.Filter] = None,
+    search_params: Optional[models.SearchParams] = None,
+    limit: int = 10,
+    offset: Optional[int] = None,
+    with_payload: Union[bool, Sequence[str], models.PayloadSelector] = True,
+    with_vectors: bool = False,
+    prefetch: Any = None,
+    using: Optional[str] = None,
+    score_threshold: Optional[float] = None,
+    **kwargs,
+  ) -> models.QueryResponse:
+    if prefetch is not None or using:
+      raise NotImplementedError("本地向量库不支持 prefetch / 命名向量检索")
+    assert query is not None, "本地向量库只支持向量检索"
+
+    def search(collection: _LocalCollection) -> List[models.ScoredPoint]:
+      return [
+        models.ScoredPoint(
+          id=collection.ids[row],
+          version=0,
+          score=score,
+          payload=_select_payload(collection.payloads[row], with_payload),
+          vector=collection.vector(row) if with_vectors else None,
+        )
+        for row, score in collection.search(query, query_filter, limit, offset or 0)
+        if score_threshold is None or score >= score_threshold
+      ]
+
+    return models.QueryResponse(points=await self._run(collection_name, search))
+
+  async def scroll(
+    self,
+    collection_name: str,
+    scroll_filter: Optional[models.Filter] = None,
+    limit: int = 10,
+    offset: Any = None,
+    with_payload: Union[bool, Sequence[str], models.PayloadSelector] = True,
+    with_vectors: bool = False,
+    **kwargs,
+  ) -> Tuple[List[models.Record], Any]:
+    def scroll(collection: _LocalCollection) -> Tuple[List[models.Record], Any]:
+      rows = np.flatnonzero(collection.mask(scroll_filter))
+      if offset is not None:
+        # offset 为上一页返回的下一个点 id，按存储行号顺序翻页；该点已被删除时使用返回它时记录的行号
+        start = collection.rows.get(offset, collection.cursors.get(offset))
+        if start is None:
+          raise ValueError(f"scroll offset {offset} 不存在")
+        rows = rows[rows >= start]
+      records = [
+        models.Record(
+          id=collection.ids[row],
+          payload=_select_payload(collection.payloads[row], with_payload),
+          vector=collection.vector(row) if with_vectors else None,
+        )
+        for row in rows[:limit]
+      ]
+      next_offset = None
+      if rows.size > limit:
+        next_offset = collection.ids[rows[limit]]
+        collection.cursors[next_offset] = int(rows[limit])
+        if len(collection.cursors) > _SCROLL_CURSORS:
+          collection.cursors.popitem(last=False)
+      return records, next_offset
+
+    return await self._run(collection_name, scroll)
+
+  async def query_batch_points(
+    self,
+    collection_name: str,
+    requests: Sequence[models.QueryRequest],
+    **kwargs,
+  ) -> List[models.QueryResponse]:
+    # 进程内检索没有网络往返，逐条执行即可
+    return [
+      await self.query_points(
+        collection_name,
+        query=request.query,
+        query_filter=request.filter,
+        search_params=request.params,
+        limit=request.limit or 10,
+        offset=request.offset,
+        with_payload=request.with_payload,
+        with_vectors=bool(request.with_vector),
+        prefetch=request.prefetch,
+        using=request.using,
+        score_threshold=request.score_threshold,
+      )
+      for request in requests
+    ]
+
+  async def close(self, **kwargs):
+    collections = list(self._collections.values())
+    self._collections.clear()
+
+    def close_all():
+      for collection in collections:
+        with collection.lock:
+          collection.close()
+
+    await asyncio.to_thread(close_all)
@@ -0,0 +1,121 @@
+"""
+infrastructure.vectorstore.payload_schema 的 Docstring
+payload 索引管理：根据 pydantic 模型字段类型推导 Qdrant payload 索引，
+启动时幂等地补齐缺失索引，并汇报各字段的索引状态。
+没有索引时，带 payload 过滤的检索需要逐条扫描 payload
+"""
+
+import types
+import typing
+from typing import Dict, Iterable, List, Type, Union
+
+from pydantic import BaseModel
+from qdrant_client.http import models
+
+from config.logging_config import logger
+from infrastructure.vectorstore.client import VECTOR_STORE_CLIENTS, VectorStoreClient
+
+# python 类型 -> Qdrant 索引类型（integer / float 索引支持 range 过滤）
+_TYPE_MAPPING = {
+  bool: models.PayloadSchemaType.BOOL,
+  int: models.PayloadSchemaType.INTEGER,
+  float: models.PayloadSchemaType.FLOAT,
+  str: models.PayloadSchemaType.KEYWORD,
+}
+
+
+def _unwrap(annotation):
+  # Optional[int] / int | None -> int，List[str] -> str（Qdrant 对数组按元素建索引）
+  origin = typing.get_origin(annotation)
+  if origin in (Union, types.UnionType):
+    args = [a for a in typing.get_args(annotation) if a is not type(None)]
+    return _unwrap(args[0]) if len(args) == 1 else None
+  if origin in (list, List):
+    return _unwrap(typing.get_args(annotation)[0])
+  return annotation
+
+
+def derive_payload_schema(model: Type[BaseModel], fields: Iterable[str]) -> Dict[str, models.PayloadSchemaType]:
+  """
+  从模型字段类型推导 payload 索引定义
+  :param model: payload 对应的 pydantic 模型
+  :param fields: 需要建索引的字段（过滤会用到的字段）
+  """
+  schema = {}
+  for name in fields:
+    field = model.model_fields.get(name)
+    assert field is not None, f"{model.__name__} 没有字段 {name}"
+    schema_type = _TYPE_MAPPING.get(_unwrap(field.annotation))
+    assert schema_type is not None, f"字段 {name} 的类型 {field.annotation} 无法建立 payload 索引"
+    schema[name] = schema_type
+  return schema
+
+
+class PayloadSchemaManager:
+  """
+  payload 索引管理器
+
+  用法：
+    manager = PayloadSchemaManager(client, "house_collection", schema)
+    await manager.ensure_indexes()
+    await manager.status()
+  """
+
+  def __init__(self, client: VectorStoreClient, collection_name: str, schema: Dict[str, models.PayloadSchemaType]):
+    assert isinstance(client, VECTOR_STORE_CLIENTS), "client 不是 AsyncQdrantClient / LocalVectorStore 类型"
+    self.client = client
+    self.collection_name = collection_name
+    self.schema = schema
+
+  async def _existing(self) -> Dict[str, models.PayloadIndexInfo]:
+    info = await self.client.get_collection(self.collection_name)
+    return info.payload_schema or {}
+
+  async def ensure_indexes(self) -> List[str]:
+    """
+    创建缺失的索引，已存在的索引不会重复创建
+    类型不一致的索引只记录告警，不自动删除重建（重建期间过滤会退化为全量扫描）
+    :return: 本次新建索引的字段
+    """
+    existing = await self._existing()
+    created = []
+    for field, schema_type in self.schema.items():
+      current = existing.get(field)
+      if current is not None:
+        if current.data_type != schema_type:
+          logger.warning(f"payload 索引类型不一致: {field} 期望 {schema_type.value}，实际 {current.data_type.value}")
+        continue
+      await self.client.create_payload_index(
+        collection_name=self.collection_name,
+        field_name=field,
+        field_schema=schema_type,
+        wait=True,
+      )
+      created.append(field)
+
+    if created:
+      logger.info(f"{self.collection_name} 新建 payload 索引: {', '.join(created)}")
+    return created
+
+  async def status(self) -> List[dict]:
+    """
+    各字段索引状态：ok / missing / type_mismatch，以及已建索引的点数
+    """
+    existing = await self._existing()
+    result = []
+    for field, schema_type in self.schema.items():
+      current = existing.get(field)
+      if current is None:
+        state = "missing"
+      elif current.data_type != schema_type:
+        state = "type_mismatch"
+      else:
+        state = "ok"
+      result.append({
+        "field": field,
+        "expected": schema_type.value,
+        "actual": current.data_type.value if current else None,
+        "points": current.points if current else None,
+        "status": state,
+      })
+    return result
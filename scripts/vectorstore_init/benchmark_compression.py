@@ -0,0 +1,203 @@
+"""
+scripts.vectorstore_init.benchmark_compression 的 Docstring
+向量压缩方案对比报告：召回率 / 延迟 / 内存
+
+对每个 维度 × 量化 组合建一个临时 collection，与全维度精确检索（exact=True）的 top-k 对比召回率，
+并统计检索延迟和向量内存估算（不含 HNSW 图和 payload），输出 Markdown 表格
+
+需要 Qdrant 服务（本地 :memory: 模式不做量化，也不走 HNSW）：
+  docker run -p 6333:6333 qdrant/qdrant
+  python -m scripts.vectorstore_init.benchmark_compression --provider openai --points 20000 \\
+      --dims 3072 1024 256 --quantization none scalar binary --output docs/vector_compression_report.md
+
+维度截断使用 truncate_embedding 离线截断全维度向量（与 text-embedding-3 的 dimensions 参数结果一致），
+只需请求一次 embedding。hashing provider 不具备 Matryoshka 特性，只适合验证流程
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from typing import Dict, List
+
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http import models
+
+from config.settings import settings
+from infrastructure.ai.embedding_provider import create_embedding_provider, truncate_embedding
+from infrastructure.vectorstore.compression import VectorCompression
+from scripts.vectorstore_init.benchmark_payload_index import random_payload
+
+DECORATIONS = ["精装", "简装", "毛坯", "豪装"]
+TAGS = ["学区房", "近地铁", "满五唯一", "南北通透", "带车位", "有电梯", "采光好", "安静"]
+
+
+def house_text(rng: random.Random, payload: dict) -> str:
+  tags = " ".join(rng.sample(TAGS, 2))
+  return (
+    f"{payload['community_id']} {payload['rooms']}室{payload['halls']}厅{payload['bathrooms']}卫 "
+    f"{payload['area']}平米 {payload['price'] / 10000:.0f}万 朝{payload['orientation']} "
+    f"{rng.choice(DECORATIONS)} {tags}"
+  )
+
+
+def query_text(rng: random.Random, communities: int) -> str:
+  return f"community-{rng.randrange(communities)} {rng.randint(1, 4)}室 {rng.choice(DECORATIONS)} {rng.choice(TAGS)}"
+
+
+async def embed_all(provider, texts: List[str], batch_size: int = 256) -> List[List[float]]:
+  vectors = []
+  for i in range(0, len(texts), batch_size):
+    vectors.extend(await provider.embed(texts[i:i + batch_size]))
+  return vectors
+
+
+async def wait_indexed(client: AsyncQdrantClient, collection: str, timeout: float = 600):
+  # 量化和 HNSW 在后台构建，状态变为 green 后再测
+  deadline = time.monotonic() + timeout
+  while time.monotonic() < deadline:
+    info = await client.get_collection(collection)
+    if info.status == models.CollectionStatus.GREEN:
+      return
+    await asyncio.sleep(1)
+  raise TimeoutError(f"{collection} 索引构建超时")
+
+
+async def build(client: AsyncQdrantClient, collection: str, vectors: List[List[float]], compression: VectorCompression):
+  await client.create_collection(
+    collection_name=collection,
+    vectors_config=compression.vectors_config(len(vectors[0])),
+    quantization_config=compression.quantization_config(),
+  )
+  for start in range(0, len(vectors), 1000):
+    await client.upsert(
+      collection_name=collection,
+      points=[
+        models.PointStruct(id=i, vector=vectors[i])
+        for i in range(start, min(start + 1000, len(vectors)))
+      ],
+      wait=True,
+    )
+  await wait_indexed(client, collection)
+
+
+async def search(client: AsyncQdrantClient, collection: str, queries: List[List[float]], k: int, params) -> tuple:
+  ids, latencies = [], []
+  for vector in queries:
+    started = time.perf_counter()
+    res = await client.query_points(collection_name=collection, query=vector, limit=k, search_params=params)
+    latencies.append((time.perf_counter() - started) * 1000)
+    ids.append({p.id for p in res.points})
+  return ids, sorted(latencies)
+
+
+def render(rows: List[Dict], args) -> str:
+  lines = [
+    "# 向量压缩对比报告",
+    "",
+    f"- provider: {args.provider}，points: {args.points}，queries: {args.queries}，recall@{args.k}",
+    f"- 召回率基准：{args.full_dim} 维、不量化的精确检索（exact=True）top-{args.k}",
+    f"- oversampling: {args.oversampling}，rescore: {not args.no_rescore}，原始向量 on_disk: {args.on_disk}",
+    "- 内存为向量估算值，不含 HNSW 图和 payload；每百万条按线性外推",
+    "",
+    f"| 维度 | 量化 | recall@{args.k} | p50 (ms) | p95 (ms) | 向量内存 (MB) | 每百万条内存 (GB) |",
+    "|---:|---|---:|---:|---:|---:|---:|",
+  ]
+  for r in rows:
+    lines.append(
+      f"| {r['dims']} | {r['quantization']} | {r['recall']:.3f} | {r['p50']:.2f} | {r['p95']:.2f} "
+      f"| {r['ram_bytes'] / 2 ** 20:.1f} | {r['ram_per_million'] / 2 ** 30:.2f} |"
+    )
+  return "\n".join(lines) + "\n"
+
+
+async def main(args):
+  rng = random.Random(args.seed)
+  provider = create_embedding_provider(
+    args.provider,
+    model=settings.EMBEDDING_MODEL,
+    dimensions=args.full_dim,
+    base_url=settings.OPENAI_BASE_URL,
+  )
+
+  texts = [house_text(rng, random_payload(rng, args.communities)) for _ in range(args.points)]
+  queries = [query_text(rng, args.communities) for _ in range(args.queries)]
+  print(f"生成 embedding: {len(texts)} 条房源，{len(queries)} 条查询")
+  corpus_full = await embed_all(provider, texts)
+  queries_full = await embed_all(provider, queries)
+
+  client = AsyncQdrantClient(url=args.url)
+  suffix = uuid.uuid4().hex[:8]
+  collections = []
+  rows = []
+  try:
+    # 基准：全维度、不量化、精确检索
+    baseline = f"bench_compression_full_{suffix}"
+    collections.append(baseline)
+    await build(client, baseline, corpus_full, VectorCompression())
+    truth, _ = await search(client, baseline, queries_full, args.k, models.SearchParams(exact=True))
+
+    for dims in args.dims:
+      corpus = [truncate_embedding(v, dims) for v in corpus_full]
+      query_vectors = [truncate_embedding(v, dims) for v in queries_full]
+      for quantization in args.quantization:
+        compression = VectorCompression(
+          quantization=quantization,
+          on_disk=args.on_disk and quantization != "none",
+          oversampling=args.oversampling,
+          rescore=not args.no_rescore,
+        )
+        collection = f"bench_compression_{dims}_{quantization}_{suffix}"
+        collections.append(collection)
+        await build(client, collection, corpus, compression)
+
+        # 预热
+        await search(client, collection, query_vectors[:10], args.k, compression.search_params())
+        found, latencies = await search(client, collection, query_vectors, args.k, compression.search_params())
+
+        recall = statistics.mean(len(f & t) / len(t) for f, t in zip(found, truth) if t)
+        memory = compression.estimate_memory(args.points, dims)
+        rows.append({
+          "dims": dims,
+          "quantization": quantization,
+          "recall": recall,
+          "p50": latencies[len(latencies) // 2],
+          "p95": latencies[int(len(latencies) * 0.95) - 1],
+          "ram_bytes": memory["ram_bytes"],
+          "ram_per_million": compression.estimate_memory(1_000_000, dims)["ram_bytes"],
+        })
+        print(f"{dims} 维 / {quantization}: recall@{args.k}={recall:.3f}")
+  finally:
+    if not args.keep:
+      for collection in collections:
+        await client.delete_collection(collection)
+    await client.close()
+
+  report = render(rows, args)
+  print("\n" + report)
+  if args.output:
+    with open(args.output, "w", encoding="utf-8") as f:
+      f.write(report)
+    print(f"报告已写入 {args.output}")
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="向量压缩 召回率 / 延迟 / 内存 对比")
+  parser.add_argument("--url", default="http://localhost:6333")
+  parser.add_argument("--provider", default="hashing", help="openai | hashing")
+  parser.add_argument("--full-dim", type=int, default=3072)
+  parser.add_argument("--dims", type=int, nargs="+", default=[3072, 1024, 256])
+  parser.add_argument("--quantization", nargs="+", default=["none", "scalar", "binary"])
+  parser.add_argument("--points", type=int, default=20_000)
+  parser.add_argument("--queries", type=int, default=200)
+  parser.add_argument("--communities", type=int, default=500)
+  parser.add_argument("--k", type=int, default=10)
+  parser.add_argument("--oversampling", type=float, default=2.0)
+  parser.add_argument("--no-rescore", action="store_true")
+  parser.add_argument("--on-disk", action="store_true", help="量化时原始向量放磁盘")
+  parser.add_argument("--seed", type=int, default=42)
+  parser.add_argument("--output", default=None, help="Markdown 报告输出路径")
+  parser.add_argument("--keep", action="store_true", help="保留测试 collection")
+  asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,140 @@
+"""
+scripts.vectorstore_init.benchmark_payload_index 的 Docstring
+对比有/无 payload 索引时带过滤条件的检索延迟
+
+需要本地 Qdrant 服务（本地文件 / :memory: 模式不支持 payload 索引）：
+  docker run -p 6333:6333 qdrant/qdrant
+  python -m scripts.vectorstore_init.benchmark_payload_index --url http://localhost:6333 --points 100000
+
+会创建两个临时 collection（相同数据，一个建索引一个不建），测试结束后删除
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from typing import List
+
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http import models
+
+from core.nodes.query_parser_node import parse_query
+from core.nodes.vectorstore_node import HOUSE_PAYLOAD_SCHEMA
+from infrastructure.vectorstore.payload_schema import PayloadSchemaManager
+
+QUERIES = [
+  "3室以上 200万以内 有电梯",
+  "两居 朝南 近地铁",
+  "80-120平米 南北通透",
+  "至少3室 150万到200万 无电梯",
+  "1室 50平左右",
+]
+
+ORIENTATIONS = ["南北", "东西", "东南", "西南", "南", "北", "东", "西"]
+
+
+def random_payload(rng: random.Random, communities: int) -> dict:
+  rooms = rng.randint(1, 5)
+  floor_from = rng.randint(1, 30)
+  return {
+    "community_id": f"community-{rng.randrange(communities)}",
+    "rooms": rooms,
+    "halls": rng.randint(1, 2),
+    "bathrooms": rng.randint(1, 2),
+    "area": round(rng.uniform(30, 60) * rooms, 1),
+    "price": round(rng.uniform(5_000, 30_000) * rooms * 40, -3),
+    "floor_from": floor_from,
+    "floor_to": floor_from,
+    "orientation": rng.choice(ORIENTATIONS),
+    "has_elevator": rng.random() < 0.6,
+    "near_metro": rng.random() < 0.3,
+  }
+
+
+def random_vector(rng: random.Random, dim: int) -> List[float]:
+  return [rng.gauss(0, 1) for _ in range(dim)]
+
+
+async def load(client: AsyncQdrantClient, collection: str, points: int, dim: int, seed: int, communities: int, batch_size: int):
+  rng = random.Random(seed)
+  await client.create_collection(
+    collection_name=collection,
+    vectors_config=models.VectorParams(size=dim, distance=models.Distance.COSINE),
+  )
+  for start in range(0, points, batch_size):
+    batch = [
+      models.PointStruct(id=str(uuid.UUID(int=i)), vector=random_vector(rng, dim), payload=random_payload(rng, communities))
+      for i in range(start, min(start + batch_size, points))
+    ]
+    await client.upsert(collection_name=collection, points=batch, wait=True)
+
+
+async def measure(client: AsyncQdrantClient, collection: str, dim: int, rounds: int, seed: int) -> dict:
+  rng = random.Random(seed)
+  filters = [parse_query(q).filter for q in QUERIES]
+  # community_id 精确匹配也是常见过滤
+  filters.append(models.Filter(must=[models.FieldCondition(key="community_id", match=models.MatchValue(value="community-1"))]))
+
+  latencies = []
+  for _ in range(rounds):
+    for query_filter in filters:
+      vector = random_vector(rng, dim)
+      started = time.perf_counter()
+      await client.query_points(collection_name=collection, query=vector, query_filter=query_filter, limit=10)
+      latencies.append((time.perf_counter() - started) * 1000)
+
+  latencies.sort()
+  return {
+    "queries": len(latencies),
+    "mean_ms": statistics.mean(latencies),
+    "p50_ms": latencies[len(latencies) // 2],
+    "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+  }
+
+
+async def main(args):
+  client = AsyncQdrantClient(url=args.url)
+  suffix = uuid.uuid4().hex[:8]
+  plain, indexed = f"bench_plain_{suffix}", f"bench_indexed_{suffix}"
+
+  try:
+    for collection in (plain, indexed):
+      started = time.perf_counter()
+      await load(client, collection, args.points, args.dim, args.seed, args.communities, args.batch_size)
+      print(f"写入 {collection}: {args.points} 条，用时 {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    await PayloadSchemaManager(client, indexed, HOUSE_PAYLOAD_SCHEMA).ensure_indexes()
+    print(f"建立 payload 索引用时 {time.perf_counter() - started:.1f}s")
+
+    # 预热
+    await measure(client, plain, args.dim, 1, args.seed)
+    await measure(client, indexed, args.dim, 1, args.seed)
+
+    results = {
+      "无索引": await measure(client, plain, args.dim, args.rounds, args.seed),
+      "有索引": await measure(client, indexed, args.dim, args.rounds, args.seed),
+    }
+    print(f"\n{'':<8}{'queries':>10}{'mean(ms)':>12}{'p50(ms)':>12}{'p95(ms)':>12}")
+    for name, r in results.items():
+      print(f"{name:<8}{r['queries']:>10}{r['mean_ms']:>12.2f}{r['p50_ms']:>12.2f}{r['p95_ms']:>12.2f}")
+  finally:
+    if not args.keep:
+      for collection in (plain, indexed):
+        await client.delete_collection(collection)
+    await client.close()
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="payload 索引过滤检索延迟对比")
+  parser.add_argument("--url", default="http://localhost:6333")
+  parser.add_argument("--points", type=int, default=50_000)
+  parser.add_argument("--dim", type=int, default=256)
+  parser.add_argument("--communities", type=int, default=500)
+  parser.add_argument("--rounds", type=int, default=20)
+  parser.add_argument("--batch-size", type=int, default=1000)
+  parser.add_argument("--seed", type=int, default=42)
+  parser.add_argument("--keep", action="store_true", help="保留测试 collection")
+  asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,157 @@
+"""
+service.house_text_extractor 的 Docstring
+房源文本规则提取（LLM 之前的快速路径）：电话、户型、面积、租价 / 售价、付款方式、朝向、装修、图片地址等
+固定格式的字段用预编译正则在本地提取；同一字段出现多个不同取值时视为有歧义，留给 LLM
+去掉已提取片段和标签词后没有剩余内容的文本直接跳过 LLM，其余只让 LLM 补全剩余字段
+"""
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from core.utils.number import parse_number
+
+_N = r"(\d+|[一二两三四五六七八九十]+)"
+_PRICE_N = r"(\d+(?:\.\d+)?)"
+
+_PHONE = re.compile(r"(?<!\d)(1[3-9]\d)[- ]?(\d{4})[- ]?(\d{4})(?!\d)")
+_ROOM = re.compile(rf"{_N}\s*(?:室|房(?=\s*{_N}\s*厅))")
+_HALL = re.compile(rf"{_N}\s*厅")
+_BATHROOM = re.compile(rf"{_N}\s*卫")
+_KITCHEN = re.compile(rf"{_N}\s*厨")
+_TERRACE = re.compile(rf"{_N}\s*个?阳台")
+_AREA = re.compile(rf"{_PRICE_N}\s*(?:平方米|平方|平米|㎡|m²|m2|平(?![层台]))")
+_LOW_PRICE = re.compile(rf"(?:底价|低价|最低价?)\s*[:：]?\s*{_PRICE_N}\s*(万|元?\s*(?:/|每)\s*月)")
+_RENT = re.compile(rf"(?:(?:月租|租金)\s*[:：]?\s*{_PRICE_N}\s*(?:元|块)?|{_PRICE_N}\s*(?:元|块)?\s*(?:/|每)\s*月)")
+# 售价：带“售价 / 总价”标签的优先；首付、税费、单价等其他金额不当作售价
+_SALE = re.compile(
+  rf"(?:(?P<label>售价|总价)|(?P<other>首付|税费|契税|单价|押金|定金|订金|租金|月供|佣金|中介费|贷款))?"
+  rf"\s*[:：]?\s*(?:约|大约)?\s*{_PRICE_N}\s*万"
+)
+_PAYMENT = re.compile(r"押[一二三四五六七八九十\d]付[一二三四五六七八九十\d]+|半年付|年付|季付|月付")
+_ORIENTATION = re.compile(r"朝(南北|东西|东南|西南|东北|西北|南|北|东|西)|(南北|东西|东南|西南|东北|西北)(?:通透|朝向|向)|(南|北|东|西)(?:朝向|向)")
+_DECORATION = re.compile(r"(精装|简装|豪装|毛坯|中装)(?:修)?")
+_RENT_WORDS = re.compile(r"出租|整租|合租|求租")
+_SALE_WORDS = re.compile(r"出售|急售|转让")
+_URGENT = re.compile(r"急售|急租|急出|急卖|着急")
+_IMAGE = re.compile(r"https?://[^\s，,；;]+?\.(jpe?g|png|gif|webp)(?:\?[^\s，,；;]*)?", re.IGNORECASE)
+
+# 去掉已提取片段后，这些标签词 / 符号不算剩余内容
+_FILLER = re.compile(
+  r"电话|手机|联系方式|联系|户型|面积|建筑面积|租金|月租|售价|总价|价格|付款方式|付款|朝向|装修|图片|"
+  r"房源|元|块|万|[\s\d:：,，。.;；、/\-+()（）【】\[\]!！~]"
+)
+# 剩余内容超过这么多字符时交给 LLM 提取小区名、备注等
+_RESIDUAL_CHARS = 1
+
+
+class FastPathResult(BaseModel):
+  # 规则提取出的字段（HouseModel 字段名 -> 值）
+  fields: Dict[str, Any] = {}
+  # 去掉已提取片段和标签词后剩下的文本
+  remainder: str = ""
+  # 有多个不同取值、留给 LLM 判断的字段
+  ambiguous: List[str] = []
+
+  @property
+  def needs_llm(self) -> bool:
+    return len(self.remainder) > _RESIDUAL_CHARS or bool(self.ambiguous)
+
+
+def _unique(values: List[Any]) -> Tuple[bool, Any]:
+  # 同一字段多个不同取值视为有歧义
+  distinct = list(dict.fromkeys(values))
+  return len(distinct) == 1, distinct[0] if distinct else None
+
+
+def extract_house_fields(text: str) -> FastPathResult:
+  """
+  规则提取房源文本中的固定格式字段
+  :param text: 经纪人粘贴的房源文本
+  :return: FastPathResult
+  """
+  fields: Dict[str, Any] = {}
+  ambiguous: List[str] = []
+  spans: List[Tuple[int, int]] = []
+
+  def take(field: str, pattern: re.Pattern, value, matches: Optional[List[re.Match]] = None):
+    if matches is None:
+      matches = [m for m in pattern.finditer(text) if not _overlaps(m.span(), spans)]
+    if not matches:
+      return
+    ok, result = _unique([value(m) for m in matches])
+    if ok and result is not None:
+      fields[field] = result
+    elif not ok:
+      ambiguous.append(field)
+    # 有歧义的片段同样从剩余文本中去掉，避免被其他规则重复匹配
+    spans.extend(m.span() for m in matches)
+
+  # 图片地址、电话先提取，避免其中的数字被价格 / 面积规则误用
+  images = [{"type": m.group(1).lower(), "url": m.group(0)} for m in _IMAGE.finditer(text)]
+  if images:
+    fields["images"] = images
+    spans.extend(m.span() for m in _IMAGE.finditer(text))
+  take("phone", _PHONE, lambda m: "".join(m.groups()))
+
+  take("room", _ROOM, lambda m: int(parse_number(m.group(1))))
+  take("hall", _HALL, lambda m: int(parse_number(m.group(1))))
+  take("bathroom", _BATHROOM, lambda m: int(parse_number(m.group(1))))
+  take("kitchen", _KITCHEN, lambda m: int(parse_number(m.group(1))))
+  take("terrace", _TERRACE, lambda m: int(parse_number(m.group(1))))
+  take("building_area", _AREA, lambda m: float(m.group(1)))
+
+  # 底价先于售价 / 租价提取，单位决定是出售还是出租底价
+  low = [m for m in _LOW_PRICE.finditer(text) if not _overlaps(m.span(), spans)]
+  if len(low) == 1:
+    m = low[0]
+    if m.group(2) == "万":
+      fields["sale_low_price"] = float(m.group(1)) * 10_000
+    else:
+      fields["rent_low_price"] = float(m.group(1))
+  elif low:
+    ambiguous.append("low_price")
+  spans.extend(m.span() for m in low)
+
+  take("rent_price", _RENT, lambda m: float(m.group(1) or m.group(2)))
+  # 其他金额不提取也不去掉，留在剩余文本里交给 LLM；有标签的售价和裸金额同时出现时只用有标签的
+  sale = [m for m in _SALE.finditer(text) if not m.group("other") and not _overlaps(m.span(), spans)]
+  take("sale_price", _SALE, lambda m: float(m.group(3)) * 10_000, [m for m in sale if m.group("label")] or sale)
+  take("payment_method", _PAYMENT, lambda m: m.group(0))
+  take("house_orientation", _ORIENTATION, lambda m: next(g for g in m.groups() if g))
+  take("house_decoration", _DECORATION, lambda m: m.group(1))
+
+  # 交易类型：明确的出租 / 出售字样优先，其次由价格类型推断
+  rent_word = _RENT_WORDS.search(text)
+  sale_word = _SALE_WORDS.search(text)
+  if rent_word and not sale_word:
+    fields["transaction_type"] = "出租"
+  elif sale_word and not rent_word:
+    fields["transaction_type"] = "出售"
+  elif not rent_word and not sale_word:
+    if "rent_price" in fields and "sale_price" not in fields:
+      fields["transaction_type"] = "出租"
+    elif "sale_price" in fields and "rent_price" not in fields:
+      fields["transaction_type"] = "出售"
+  for m in (rent_word, sale_word):
+    if m:
+      spans.append(m.span())
+
+  urgent = [m.span() for m in _URGENT.finditer(text)]
+  if urgent:
+    fields["urgent"] = True
+    spans.extend(urgent)
+
+  return FastPathResult(fields=fields, remainder=_remainder(text, spans), ambiguous=ambiguous)
+
+
+def _overlaps(span: Tuple[int, int], spans: List[Tuple[int, int]]) -> bool:
+  return any(span[0] < end and start < span[1] for start, end in spans)
+
+
+def _remainder(text: str, spans: List[Tuple[int, int]]) -> str:
+  chars = list(text)
+  for start, end in spans:
+    for i in range(start, end):
+      chars[i] = " "
+  return _FILLER.sub("", "".join(chars))
@@ -0,0 +1,294 @@
+"""
+service.house_title_generator 的 Docstring
+房源标题和标签生成：模板优先，LLM 兜底
+- 小区名、户型、面积、装修、朝向、满五唯一等字段齐全时按模板直接生成，不请求 LLM
+- 模板缺少关键字段（小区名 / 户型 / 面积）的房源才交给 LLM，多套房源合并为一次请求，批次之间并发受限
+- LLM 结果按参与生成的字段哈希缓存，字段没变的房源重复同步时不再请求
+- 可以在同步流水线的清洗阶段调用，写入向量库前标题和标签已经就绪
+"""
+
+import hashlib
+import re
+from typing import Any, Dict, List, Optional
+
+import orjson
+from langchain_core.runnables import Runnable
+from langchain_openai import ChatOpenAI
+from pydantic import BaseModel, Field
+
+from config.logging_config import logger
+from core.models.house_info import HouseModel
+from infrastructure.cache.backend import CacheBackendInterface
+
+_CJK = re.compile(r"[㐀-䶿一-鿿豈-﫿]")
+_FIVE_YEARS = re.compile(r"五|5")
+_TWO_YEARS = re.compile(r"二|两|2")
+_NEGATIVE = re.compile(r"^(否|不是|非|无|false|0|n|no)$", re.IGNORECASE)
+_METRO = re.compile(r"地铁|轨道|站")
+_ELEVATOR = re.compile(r"电梯")
+
+# 模板标题必需的字段，缺少任一项时交给 LLM
+REQUIRED_PARTS = ("community", "layout", "area")
+
+# 提示词前缀固定不变，只有末尾的房源列表随批次变化
+_PROMPT = (
+  "你是房产经纪人，为下面每套房源生成规范的房源标题和推荐标签。\n"
+  "标题格式：小区名 户型 面积 装修 朝向 卖点，用空格分隔，不超过 30 个字；"
+  "draft 为按已知字段生成的草稿，missing 为草稿缺少的部分，请根据其他字段补全，无法确定的部分直接省略，不要编造。\n"
+  "标签为 2~4 个字的卖点短语，最多 5 个，不要重复 tags 中已有的标签。\n"
+  "按 index 原样返回每套房源的结果。\n"
+  "房源列表：\n"
+)
+
+
+class TitleTags(BaseModel):
+  # 房源标题，模板和 LLM 都无法生成时为 None
+  title: Optional[str] = None
+  # 推荐标签
+  tags: List[str] = []
+  # 生成方式：template | llm | cache
+  source: str = "template"
+
+
+class _TitleTagItem(BaseModel):
+  index: int = Field(description="房源序号，与输入的 index 一致")
+  title: str = Field(description="房源标题")
+  tags: List[str] = Field(description="推荐标签")
+
+
+class _TitleTagBatch(BaseModel):
+  items: List[_TitleTagItem] = Field(description="每套房源的标题和标签")
+
+
+def _truthy(value: Optional[str]) -> bool:
+  value = (value or "").strip()
+  return bool(value) and not _NEGATIVE.match(value)
+
+
+def _number(value: float) -> str:
+  return f"{value:g}"
+
+
+def community_of(house: HouseModel) -> Optional[str]:
+  """
+  小区名：房源数据只有 community_id，沿用标题以小区名开头的约定（回祥小区 3室 精装）
+  """
+  words = (house.title or "").split()
+  if len(words) > 1 and _CJK.search(words[0]):
+    return words[0]
+  return None
+
+
+def house_facts(house: HouseModel) -> Dict[str, Any]:
+  """
+  参与标题 / 标签生成的字段，同时作为缓存 key 和 LLM 输入
+  """
+  apt = house.apartment_type
+  return {
+    "community": community_of(house),
+    "title": house.title,
+    "transaction_type": house.transaction_type,
+    "purpose": house.purpose,
+    "room": apt.room if apt else None,
+    "hall": apt.hall if apt else None,
+    "bathroom": apt.bathroom if apt else None,
+    "building_area": house.building_area,
+    "house_decoration": house.house_decoration,
+    "house_orientation": house.house_orientation,
+    "discount_year_limit": house.discount_year_limit,
+    "unique_housing": house.unique_housing,
+    "urgent": house.urgent,
+    "support": house.support,
+    "house_address": house.house_address,
+    "remark": house.remark,
+    "tags": house.tags,
+  }
+
+
+def template_parts(facts: Dict[str, Any]) -> Dict[str, str]:
+  """
+  按模板生成标题各部分：community / layout / area / decoration / orientation / tax
+  缺少数据的部分不出现在结果中
+  """
+  parts: Dict[str, str] = {}
+  if facts["community"]:
+    parts["community"] = facts["community"]
+  if facts["room"]:
+    layout = f"{facts['room']}室"
+    if facts["hall"] is not None:
+      layout += f"{facts['hall']}厅"
+    if facts["bathroom"]:
+      layout += f"{facts['bathroom']}卫"
+    parts["layout"] = layout
+  if facts["building_area"]:
+    parts["area"] = f"{_number(facts['building_area'])}㎡"
+  if facts["house_decoration"]:
+    parts["decoration"] = facts["house_decoration"]
+  orientation = facts["house_orientation"]
+  if orientation:
+    parts["orientation"] = "南北通透" if orientation in ("南北", "南北通透") else f"朝{orientation.removeprefix('朝')}"
+  # 满五唯一：满减年限 + 唯一住房，只对出售房源有意义
+  years = facts["discount_year_limit"] or ""
+  if facts["transaction_type"] != "出租" and years:
+    tax = "满五" if _FIVE_YEARS.search(years) else "满二" if _TWO_YEARS.search(years) else None
+    if tax:
+      parts["tax"] = tax + ("唯一" if _truthy(facts["unique_housing"]) else "")
+  return parts
+
+
+def template_tags(facts: Dict[str, Any], parts: Dict[str, str]) -> List[str]:
+  tags = []
+  if parts.get("orientation") == "南北通透":
+    tags.append("南北通透")
+  if "decoration" in parts:
+    tags.append(parts["decoration"])
+  if "tax" in parts:
+    tags.append(parts["tax"])
+  if _truthy(facts["urgent"]):
+    tags.append("急租" if facts["transaction_type"] == "出租" else "急售")
+  text = " ".join(filter(None, [facts["remark"], facts["support"], " ".join(facts["tags"] or [])]))
+  if _METRO.search(text):
+    tags.append("近地铁")
+  if _ELEVATOR.search(text):
+    tags.append("有电梯")
+  return tags
+
+
+def _merge_tags(*groups: Optional[List[str]]) -> List[str]:
+  return list(dict.fromkeys(t.strip() for group in groups for t in group or [] if t and t.strip()))
+
+
+class HouseTitleGenerator:
+  """
+  用法：
+    generator = HouseTitleGenerator(model, cache=cache)
+    results = await generator.generate(houses)  # List[TitleTags]，与 houses 顺序一致
+    await generator.apply(houses)                # 直接写回 house.title / house.tags
+  """
+
+  def __init__(
+    self,
+    model: Optional[ChatOpenAI] = None,
+    cache: Optional[CacheBackendInterface] = None,
+    batch_size: int = 20,
+    max_concurrency: int = 4,
+    overwrite: bool = False,
+  ):
+    assert batch_size > 0, "batch_size 必须大于 0"
+    assert max_concurrency > 0, "max_concurrency 必须大于 0"
+    self.model = model
+    self.cache = cache
+    self.batch_size = batch_size
+    self.max_concurrency = max_concurrency
+    # 已有标题的房源是否用生成的标题覆盖
+    self.overwrite = overwrite
+    # 不传 model 时只使用模板
+    self._structured: Optional[Runnable] = model.with_structured_output(_TitleTagBatch) if model is not None else None
+    self.template_hits = 0
+    self.cache_hits = 0
+    self.llm_calls = 0
+    self.llm_houses = 0
+
+  @staticmethod
+  def _cache_key(facts: Dict[str, Any]) -> str:
+    return hashlib.sha256(orjson.dumps(facts, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+  @staticmethod
+  def _draft(facts: Dict[str, Any], parts: Dict[str, str]) -> TitleTags:
+    title = " ".join(parts.values()) or facts["title"]
+    return TitleTags(title=title, tags=template_tags(facts, parts))
+
+  def _prompt(self, requests: List[Dict[str, Any]]) -> str:
+    lines = []
+    for i, request in enumerate(requests):
+      facts = {k: v for k, v in request["facts"].items() if v not in (None, "", [])}
+      item = {"index": i, **facts, "draft": request["draft"].title, "missing": request["missing"]}
+      lines.append(orjson.dumps(item).decode())
+    return _PROMPT + "\n".join(lines)
+
+  async def _llm(self, requests: List[Dict[str, Any]]) -> List[TitleTags]:
+    """
+    模板缺少数据的房源按 batch_size 合并请求，LLM 失败或漏掉的房源使用模板草稿
+    """
+    batches = [requests[i:i + self.batch_size] for i in range(0, len(requests), self.batch_size)]
+    self.llm_calls += len(batches)
+    self.llm_houses += len(requests)
+    responses = await self._structured.abatch(
+      [self._prompt(batch) for batch in batches],
+      config={"max_concurrency": self.max_concurrency},
+      return_exceptions=True,
+    )
+
+    results: List[TitleTags] = []
+    for batch, response in zip(batches, responses):
+      if isinstance(response, Exception):
+        logger.warning(f"标题生成失败，使用模板草稿: {response}")
+        results.extend(request["draft"] for request in batch)
+        continue
+      items = {item.index: item for item in response.items}
+      for i, request in enumerate(batch):
+        item = items.get(i)
+        if item is None or not item.title.strip():
+          results.append(request["draft"])
+          continue
+        tags = _merge_tags(request["draft"].tags, item.tags)
+        results.append(TitleTags(title=" ".join(item.title.split()), tags=tags, source="llm"))
+    return results
+
+  async def generate(self, houses: List[HouseModel]) -> List[TitleTags]:
+    """
+    批量生成标题和标签，结果与 houses 顺序一致
+    """
+    results: List[Optional[TitleTags]] = [None] * len(houses)
+    # 缓存 key -> 需要 LLM 的请求，同一批内字段相同的房源只请求一次
+    pending: Dict[str, Dict[str, Any]] = {}
+    waiting: Dict[str, List[int]] = {}
+    for i, house in enumerate(houses):
+      facts = house_facts(house)
+      parts = template_parts(facts)
+      draft = self._draft(facts, parts)
+      missing = [name for name in REQUIRED_PARTS if name not in parts]
+      if not missing or self._structured is None:
+        self.template_hits += 1
+        results[i] = draft
+        continue
+
+      key = self._cache_key(facts)
+      if key in pending:
+        waiting[key].append(i)
+        continue
+      cached = await self.cache.get(key) if self.cache is not None else None
+      if cached is not None:
+        self.cache_hits += 1
+        results[i] = TitleTags.model_validate({**cached, "source": "cache"})
+        continue
+      pending[key] = {"facts": facts, "draft": draft, "missing": missing}
+      waiting[key] = [i]
+
+    if pending:
+      generated = await self._llm(list(pending.values()))
+      for key, res in zip(pending, generated):
+        for i in waiting[key]:
+          results[i] = res
+        # 只缓存 LLM 结果，失败时的草稿下次同步再试
+        if self.cache is not None and res.source == "llm":
+          await self.cache.set(key, res.model_dump(mode="json"))
+    return results
+
+  async def apply(self, houses: List[HouseModel]) -> List[HouseModel]:
+    """
+    生成标题和标签并写回房源：已有标题默认保留（overwrite=True 时覆盖），标签与已有标签合并去重
+    """
+    for house, res in zip(houses, await self.generate(houses)):
+      if res.title and (self.overwrite or not house.title):
+        house.title = res.title
+      house.tags = _merge_tags(house.tags, res.tags) or house.tags
+    return houses
+
+  def stats(self) -> dict:
+    return {
+      "template_hits": self.template_hits,
+      "cache_hits": self.cache_hits,
+      "llm_calls": self.llm_calls,
+      "llm_houses": self.llm_houses,
+    }
@@ -0,0 +1,234 @@
+"""
+service.marketing_plan_service 的 Docstring
+房源营销方案生成：多个文案变体并发流式生成
+- 提示词顺序固定：通用系统指令 + 字段说明 + 文风规范 + 示例 → 变体要求 → 房源信息，超过 1024 token 的前缀在所有房源之间完全一致，可命中服务端提示词缓存
+- 朋友圈文案、海报标题、短描述在同一次请求中并发生成，token 按到达顺序推送
+- 每个变体单独统计首 token 耗时（ttft_ms）、总耗时（total_ms）和缓存命中的 token 数（cached_tokens，流式请求开启 stream_usage 才会返回）
+"""
+
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import orjson
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_openai import ChatOpenAI
+from pydantic import BaseModel
+
+from config.logging_config import logger
+from core.models.house_info import HouseModel
+
+# 通用指令、字段说明、文风规范和示例放在最前面，内容固定不变，不要在这里拼接任何房源相关的值
+# 服务端提示词缓存要求公共前缀至少 1024 token，这段前缀需要保持在这个长度以上（约 1500 个汉字加字段名，估算 1300 token 左右）
+SYSTEM_PROMPT = """你是一名资深房产营销文案策划，为经纪人撰写房源推广文案。你会收到一条变体要求和一份 JSON 格式的房源信息，请严格按变体要求输出文案。
+
+【基本原则】
+1. 只使用房源信息中给出的事实，不编造学区、地铁、价格、面积、楼层等任何信息；缺少的信息直接略过，不要写“待定”“未知”“详询”。
+2. 不使用“最”“第一”“顶级”“绝版”“唯一”（满五唯一除外）“稳赚”“必涨”“保值增值”等绝对化或承诺收益的用语，不出现违反广告法的表述。
+3. 不输出电话号码、门牌号、楼栋单元号等隐私信息，不输出房东或租客姓名，不输出内部房源编号。
+4. 价格单位：出售房源用“万”，出租房源用“元/月”；面积用“㎡”，保留整数或一位小数。
+5. 直接输出文案正文，不要输出标题说明、解释、字数统计或 Markdown 代码块，不要在开头写“好的”“以下是”。
+6. 不对学区、落户、贷款审批、税费金额做任何承诺；涉及政策的内容只描述房源本身的状态（如“满五唯一”），不计算具体税费。
+7. 不使用歧视性表述，不限定租客或买家的籍贯、性别、民族、职业。
+
+【房源字段说明】
+- title：房源标题，通常以小区名开头，可以直接引用小区名。
+- transaction_type：出售 / 出租，决定价格单位和文案侧重点。
+- purpose / house_type：房屋用途和类型，如住宅、公寓、商铺、别墅；非住宅房源不要写“学区”“居家”等住宅卖点。
+- apartment_type：户型，room 室 hall 厅 bathroom 卫，写成“3室2厅1卫”的形式。
+- building_area / use_area：建筑面积和套内面积，单位㎡；两者都有时优先写建筑面积，套内面积可作为得房率卖点。
+- house_decoration：装修情况，如精装、简装、毛坯；毛坯房源可以写“可按自己喜好装修”，不要写成缺点。
+- house_orientation：朝向，“南北”写作“南北通透”。
+- sale_price / down_payment：售价和首付，单位元，输出时换算成“万”，如 1200000 写作“120万”。
+- rent_price：月租金，单位元，写作“3000元/月”。
+- payment_method：租金付款方式，如押一付三、押一付一，出租文案中可以作为卖点。
+- discount_year_limit / unique_housing：满减年限和是否唯一住房，两者同时满足时写作“满五唯一”或“满二唯一”，只用于出售房源。
+- building_year / building_structure：建成年份和结构，可以描述为“2015年建成的次新房”“钢混结构”，不要推断房龄带来的贷款政策。
+- property_rights / property_year_limit：产权性质和年限，如商品房、70年产权，只在信息完整时提及。
+- view_method：看房方式，如随时看房、提前预约，可放在文案结尾作为行动引导。
+- urgent：是否急售 / 急租，为“是”时可以写“业主诚心出售”“急租”，不要写“跳楼价”“亏本”。
+- support：配套设施，如电梯、车位、地铁、商超、公园，按原文提炼，不要扩写成具体距离。
+- present_state：现状，如自住、空置、出租中；出租中的出售房源要说明“带租约”。
+- tags / remark：已有标签和经纪人备注，可从中提炼卖点，但备注中的联系方式、价格谈判空间等内部信息不要输出。
+
+【文风规范】
+- 语气真诚、具体，像经纪人向熟悉的客户推荐，而不是硬广；少用形容词堆砌，多用可以核实的事实。
+- 先写最打动人的卖点（户型、朝向、采光、装修、满五唯一、交通配套等），再补充其他信息。
+- 多用短句，一句话只讲一个点；数字用阿拉伯数字；同一卖点不要重复出现。
+- 适度使用 emoji 点缀社交平台文案，每段不超过 2 个；海报标题和短描述不使用 emoji 和话题标签。
+- 出售房源突出居住价值和税费优势，出租房源突出拎包入住、通勤和付款方式。
+- 信息很少时宁可写短，也不要用空泛的套话凑字数。
+- 话题标签使用房源信息中已有的小区名、户型、卖点，不要编造商圈或板块名称。
+
+【常见问题】
+- 错误：“地铁口旁，步行 3 分钟到站”。房源信息只写了“近地铁”时，只能写“近地铁”，不能补充距离和站名。
+- 错误：“学区房，孩子上学无忧”。房源信息没有学校字段时不提学区，有备注时也只复述原文，不做入学承诺。
+- 错误：“房价只会涨，买到就是赚到”。不做任何收益、升值、投资回报的判断。
+- 错误：“售价 1200000 元”。出售价格必须换算成“万”，首付同理；出租价格保留“元/月”。
+- 错误：把出租房源写成“满五唯一”“税费低”，或把出售房源写成“押一付三”。卖点要和交易类型对应。
+- 错误：照搬备注里的“可谈”“底价”“业主急用钱”等内部信息。议价空间和业主隐私一律不写。
+- 错误：同一段里把“精装”“南北通透”反复说两三遍，或在结尾堆砌“欢迎咨询”“速来”等套话。
+
+【示例】（仅示意语气和结构，示例中的房源与实际房源无关，不要照抄其中的事实）
+朋友圈文案示例：
+🏡 阳光花园 3室2厅 南北通透，89㎡ 精装，业主自住保养得很好。
+客厅朝南，下午阳光能照满整个阳台；主卧带飘窗，次卧适合做儿童房或书房。
+满五唯一，税费省心；小区有电梯和地下车位，随时可以看房。
+#阳光花园 #三室两厅 #南北通透 #满五唯一
+海报主标题示例：
+南北通透三居 满五唯一
+89㎡精装 业主自住
+阳光花园 拎包入住
+短描述示例：
+阳光花园精装3室2厅，建筑面积89㎡，南北通透采光好，满五唯一，带电梯，业主自住保养好，售价120万，随时看房。
+出租房源短描述示例：
+翠湖苑精装2室1厅，60㎡朝南，家电齐全可拎包入住，近地铁通勤方便，押一付三，租金3000元/月，提前预约看房。
+"""
+
+# 变体名 -> 变体要求，放在系统指令之后、房源信息之前
+VARIANTS: Dict[str, str] = {
+  "social_post": "任务：撰写一条朋友圈 / 小红书房源推广文案，150~250 字，分 3~4 段，结尾给出 3~5 个话题标签（#小区名 #户型 等）。",
+  "poster_headline": "任务：撰写 3 条海报主标题，每条不超过 16 个字，每条单独一行，不加序号。",
+  "short_description": "任务：撰写一段房源短描述，用于房源列表页，60~80 字，一段话。",
+}
+
+# 参与文案生成的房源字段，联系方式、内部编号、图片等不进入提示词
+MARKETING_FIELDS = {
+  "title", "purpose", "transaction_type", "apartment_type", "building_area", "use_area", "house_decoration",
+  "discount_year_limit", "tags", "sale_price", "rent_price", "down_payment", "house_type", "house_orientation",
+  "view_method", "payment_method", "building_structure", "building_year", "property_rights", "property_year_limit",
+  "degree", "unique_housing", "full_payment", "urgent", "support", "present_state", "remark",
+}
+
+_DONE = object()
+
+
+class VariantResult(BaseModel):
+  text: str = ""
+  # 首 token 耗时（ms），没有输出时为 None
+  ttft_ms: Optional[float] = None
+  total_ms: float = 0
+  # 服务端提示词缓存命中的 token 数（模型返回用量时才有）
+  cached_tokens: Optional[int] = None
+  error: Optional[str] = None
+
+
+class MarketingPlan(BaseModel):
+  variants: Dict[str, VariantResult]
+  total_ms: float
+
+
+def house_facts(house: HouseModel) -> str:
+  return orjson.dumps(house.model_dump(mode="json", include=MARKETING_FIELDS, exclude_none=True)).decode()
+
+
+def build_messages(variant: str, house: HouseModel) -> List[BaseMessage]:
+  """
+  系统指令 → 变体要求 → 房源信息，越靠前的内容在不同请求之间越稳定
+  """
+  return [
+    SystemMessage(SYSTEM_PROMPT),
+    SystemMessage(VARIANTS[variant]),
+    HumanMessage(f"房源信息：{house_facts(house)}"),
+  ]
+
+
+class MarketingPlanService:
+  """
+  用法：
+    service = MarketingPlanService(model)
+    async for event in service.stream(house):
+      ...  # {"event": "token", "variant": "social_post", "text": "..."}
+    plan = await service.generate(house)
+  """
+
+  def __init__(self, model: ChatOpenAI):
+    self.model = model
+
+  def _variants(self, variants: Optional[List[str]]) -> List[str]:
+    variants = list(dict.fromkeys(variants or VARIANTS))
+    unknown = [v for v in variants if v not in VARIANTS]
+    if unknown:
+      raise ValueError(f"不支持的文案类型: {unknown}")
+    return variants
+
+  async def _run_variant(self, variant: str, house: HouseModel, queue: asyncio.Queue):
+    started = time.perf_counter()
+    ttft_ms = None
+    cached_tokens = None
+    parts: List[str] = []
+    error = None
+    try:
+      # 自定义 base_url 时 ChatOpenAI 默认不返回流式用量，需要显式开启才能拿到 cached_tokens
+      async for chunk in self.model.astream(build_messages(variant, house), stream_usage=True):
+        usage = getattr(chunk, "usage_metadata", None)
+        if usage:
+          cached_tokens = (usage.get("input_token_details") or {}).get("cache_read", cached_tokens)
+        text = chunk.content if isinstance(chunk.content, str) else ""
+        if not text:
+          continue
+        if ttft_ms is None:
+          ttft_ms = (time.perf_counter() - started) * 1000
+        parts.append(text)
+        await queue.put({"event": "token", "variant": variant, "text": text})
+    except Exception as e:
+      error = str(e)
+      logger.warning(f"营销文案 {variant} 生成失败: {e}")
+
+    result = VariantResult(
+      text="".join(parts),
+      ttft_ms=ttft_ms,
+      total_ms=(time.perf_counter() - started) * 1000,
+      cached_tokens=cached_tokens,
+      error=error,
+    )
+    logger.info(f"营销文案 {variant}: 首 token {ttft_ms or 0:.0f}ms，总耗时 {result.total_ms:.0f}ms")
+    await queue.put({"event": "error" if error else "done", "variant": variant, **result.model_dump()})
+
+  async def stream(self, house: HouseModel, variants: Optional[List[str]] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    并发生成各变体，事件按到达顺序产出：
+    - {"event": "token", "variant", "text"}
+    - {"event": "done" | "error", "variant", "text", "ttft_ms", "total_ms", "cached_tokens", "error"}
+    - 最后一条 {"event": "end", "total_ms"}
+    调用方提前退出（客户端断开）时取消未完成的变体
+    """
+    variants = self._variants(variants)
+    started = time.perf_counter()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def run(variant: str):
+      try:
+        await self._run_variant(variant, house, queue)
+      finally:
+        queue.put_nowait(_DONE)
+
+    tasks = [asyncio.create_task(run(variant)) for variant in variants]
+    try:
+      pending = len(tasks)
+      while pending:
+        event = await queue.get()
+        if event is _DONE:
+          pending -= 1
+          continue
+        yield event
+      yield {"event": "end", "total_ms": (time.perf_counter() - started) * 1000}
+    finally:
+      for task in tasks:
+        task.cancel()
+      await asyncio.gather(*tasks, return_exceptions=True)
+
+  async def generate(self, house: HouseModel, variants: Optional[List[str]] = None) -> MarketingPlan:
+    """
+    非流式：等待全部变体生成完毕
+    """
+    variants = self._variants(variants)
+    results: Dict[str, VariantResult] = {}
+    total_ms = 0.0
+    async for event in self.stream(house, variants):
+      if event["event"] in ("done", "error"):
+        results[event["variant"]] = VariantResult.model_validate(event)
+      elif event["event"] == "end":
+        total_ms = event["total_ms"]
+    # 按请求的变体顺序返回，而不是完成顺序
+    return MarketingPlan(variants={v: results[v] for v in variants}, total_ms=total_ms)
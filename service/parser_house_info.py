@@ -1,8 +1,15 @@
 
-from datetime import datetime
-from typing import List, Optional
+import hashlib
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+import orjson
+from langchain_core.runnables import Runnable, RunnableLambda
 from langchain_openai import ChatOpenAI
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, create_model
+
+from config.logging_config import logger
+from infrastructure.cache.backend import CacheBackendInterface
+from service.house_text_extractor import FastPathResult, extract_house_fields
 
 class ImageInfo(BaseModel):
     type: str = Field(description="图片类型")
@@ -21,14 +28,14 @@ class HouseModel(BaseModel):
     building_area: Optional[float] = Field(description="建筑面积")
     # 装修
     house_decoration: Optional[str] = Field(description="装修")
-    # 售价
-    sale_price: Optional[float] = Field(description="售价")
-    # 租价
-    rent_price: Optional[float] = Field(description="租价")
-    # 出租低价
-    rent_low_price: Optional[float] = Field(description="出租低价")
-    # 出售低价
-    sale_low_price: Optional[float] = Field(description="出售低价")
+    # 售价（元）
+    sale_price: Optional[float] = Field(description="售价，单位：元（120万 记为 1200000）")
+    # 租价（元/月）
+    rent_price: Optional[float] = Field(description="租价，单位：元/月")
+    # 出租低价（元/月）
+    rent_low_price: Optional[float] = Field(description="出租低价，单位：元/月")
+    # 出售低价（元）
+    sale_low_price: Optional[float] = Field(description="出售低价，单位：元（120万 记为 1200000）")
     # 朝向
     house_orientation: Optional[str]  = Field(description="朝向 (东南，南，西南，西，西北，北，东北，东)")
     # 看房方式
@@ -60,16 +67,160 @@ class HouseModel(BaseModel):
     # 图片
     images: Optional[list[ImageInfo]] = Field(description="图片")
 
+# 金额单位与规则快速路径一致：售价 / 出售低价为元，租价 / 出租低价为元/月
+_UNIT_HINT = "金额统一以元为单位输出：售价 120万 输出 1200000，租金 3000元/月 输出 3000"
+
+# 按剩余字段集合缓存的结构化输出 runnable 上限，超出后淘汰最久未用的
+_STRUCTURED_CACHE_SIZE = 64
+
+
 class ParserHouseInfoService:
-  def __init__(self, model: ChatOpenAI):
+  """
+  房源文本解析服务（全局单例）
+  - 先用规则快速提取电话、户型、面积、价格等固定格式字段，没有剩余内容的文本不再请求 LLM
+  - 其余文本只让 LLM 提取剩余字段，提示词带上已提取的值；按剩余字段集合构建的结构化输出 runnable 复用
+  - 使用 ainvoke / abatch，不阻塞事件循环；批量解析时按 max_concurrency 限制并发请求数
+  - 结果按归一化文本的哈希缓存，重复粘贴的房源不再请求 LLM
+  """
+
+  def __init__(
+    self,
+    model: ChatOpenAI,
+    cache: Optional[CacheBackendInterface] = None,
+    max_concurrency: int = 8,
+    fast_path: bool = True,
+  ):
+    assert max_concurrency > 0, "max_concurrency 必须大于 0"
     self.model = model
+    self.cache = cache
+    self.max_concurrency = max_concurrency
+    self.fast_path = fast_path
+    # 剩余字段集合 -> 结构化输出 runnable，LRU 限制数量，长时间运行的进程内不会无限增长
+    self._structured = lru_cache(maxsize=_STRUCTURED_CACHE_SIZE)(self._build_structured)
+    self._structured(tuple(HouseModel.model_fields))
+    # 批量解析时不同文本的剩余字段不同，统一经由一个 runnable 分发，abatch 的并发上限对全部请求生效
+    self._router = RunnableLambda(self._invoke)
+    self.calls = 0
+    self.cache_hits = 0
+    self.fast_path_hits = 0
+
+  def _build_structured(self, fields: Tuple[str, ...]) -> Runnable:
+    schema = HouseModel if len(fields) == len(HouseModel.model_fields) else create_model(
+      "HouseModel",
+      **{name: (HouseModel.model_fields[name].annotation, HouseModel.model_fields[name]) for name in fields},
+    )
+    return self.model.with_structured_output(schema)
+
+  @staticmethod
+  def _cache_key(text: str) -> str:
+    # 只合并空白，不转小写：大小写不同的单位、英文小区名是不同的文本
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+  @staticmethod
+  def _prompt(text: str, prefilled: Dict[str, Any]) -> str:
+    prompt = f"从文本中提取信息：{text}\n{_UNIT_HINT}"
+    if prefilled:
+      prompt += f"\n以下字段已提取，无需输出：{orjson.dumps(prefilled).decode()}"
+    return prompt
+
+  async def _invoke(self, request: Dict[str, Any]) -> HouseModel:
+    """
+    request: {"text": 原文, "fast": FastPathResult}
+    """
+    fast: FastPathResult = request["fast"]
+    fields = tuple(name for name in HouseModel.model_fields if name not in fast.fields)
+    res = await self._structured(fields).ainvoke(self._prompt(request["text"], fast.fields))
+    # 规则提取的值优先
+    values = {name: getattr(res, name, None) for name in fields}
+    return HouseModel.model_validate({**values, **fast.fields})
+
+  def _extract(self, text: str) -> FastPathResult:
+    return extract_house_fields(text) if self.fast_path else FastPathResult()
+
+  def _local(self, fast: FastPathResult) -> Optional[HouseModel]:
+    # 没有剩余内容的文本直接由规则结果组成
+    if not self.fast_path or fast.needs_llm:
+      return None
+    self.fast_path_hits += 1
+    return self._from_fields(fast.fields)
+
+  @staticmethod
+  def _from_fields(fields: Dict[str, Any]) -> HouseModel:
+    return HouseModel.model_validate({**{name: None for name in HouseModel.model_fields}, **fields})
+
+  async def _cached(self, key: str) -> Optional[HouseModel]:
+    if self.cache is None:
+      return None
+    value = await self.cache.get(key)
+    if value is None:
+      return None
+    self.cache_hits += 1
+    return HouseModel.model_validate(value)
+
+  async def _store(self, key: str, res: HouseModel):
+    if self.cache is not None:
+      await self.cache.set(key, res.model_dump(mode="json"))
 
   async def parse_house_info(self, text: str) -> HouseModel:
     """
     解析房源信息
     """
-    structured_model = self.model.with_structured_output(HouseModel)
-    res =  structured_model.invoke(f"从文本中提取信息：{text}")
+    key = self._cache_key(text)
+    cached = await self._cached(key)
+    if cached is not None:
+      return cached
+
+    fast = self._extract(text)
+    res = self._local(fast)
+    if res is None:
+      self.calls += 1
+      res = await self._invoke({"text": text, "fast": fast})
 
     assert isinstance(res, HouseModel)
+    await self._store(key, res)
     return res
+
+  async def parse_house_infos(self, texts: List[str]) -> List[HouseModel]:
+    """
+    批量解析房源信息，结果与 texts 顺序一致
+    缓存未命中、规则无法完整提取的文本去重后用 abatch 并发请求（最多 max_concurrency 个同时进行）
+    单条 LLM 请求失败不影响其他文本，该条只返回规则提取的字段且不写缓存
+    """
+    keys = [self._cache_key(text) for text in texts]
+    results: Dict[str, HouseModel] = {}
+    pending: Dict[str, Dict[str, Any]] = {}
+    for key, text in zip(keys, texts):
+      if key in results or key in pending:
+        continue
+      cached = await self._cached(key)
+      if cached is not None:
+        results[key] = cached
+        continue
+      fast = self._extract(text)
+      local = self._local(fast)
+      if local is not None:
+        results[key] = local
+        await self._store(key, local)
+      else:
+        pending[key] = {"text": text, "fast": fast}
+
+    if pending:
+      self.calls += len(pending)
+      parsed = await self._router.abatch(
+        list(pending.values()),
+        config={"max_concurrency": self.max_concurrency},
+        return_exceptions=True,
+      )
+      for (key, request), res in zip(pending.items(), parsed):
+        if isinstance(res, Exception):
+          logger.warning(f"房源文本解析失败，只使用规则提取结果: {res}")
+          results[key] = self._from_fields(request["fast"].fields)
+          continue
+        assert isinstance(res, HouseModel)
+        results[key] = res
+        await self._store(key, res)
+
+    return [results[key] for key in keys]
+
+  def stats(self) -> dict:
+    return {"calls": self.calls, "cache_hits": self.cache_hits, "fast_path_hits": self.fast_path_hits}
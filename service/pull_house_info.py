@@ -1,33 +1,89 @@
 
+import asyncio
+import math
+from collections import deque
 from datetime import datetime
-from typing import Optional
+from typing import AsyncIterator, List, Optional
 
 from core.interfaces.house_info import HouseInfoInterface
-from core.models.house_info import HouseInfoModel
+from core.models.house_info import HouseInfoModel, HouseModel
 from core.models.response_body import ResponseBody
 from config.logging_config import logger
+from config.settings import settings
 import httpx
 
-http_client = httpx.AsyncClient(timeout=10)
+# 共享的长连接池，所有分页请求复用 keep-alive 连接
+http_client = httpx.AsyncClient(
+  timeout=10,
+  limits=httpx.Limits(
+    max_connections=settings.HOUSE_API_MAX_CONNECTIONS,
+    max_keepalive_connections=settings.HOUSE_API_MAX_CONNECTIONS,
+  ),
+)
 
 class PullHouseInfoService(HouseInfoInterface):
+   def __init__(
+    self,
+    client: httpx.AsyncClient = http_client,
+    url: str = settings.HOUSE_API_URL,
+    concurrency: int = settings.HOUSE_API_CONCURRENCY,
+   ):
+    assert concurrency > 0, "concurrency 必须大于 0"
+    self.client = client
+    self.url = url
+    # 同时在途的分页请求上限
+    self.concurrency = concurrency
+
    async def fetch_house_data(self, last_updated: Optional[datetime], page: int, page_size: int) -> ResponseBody[HouseInfoModel]:
     """
     拉取房源数据
     :param self: 说明
     :return: 房源数据
     """
-    
-    resp = await http_client.post("http://114.55.227.206:3000/api/domus/query/house/list", data={
-      "page": 4,
-      "page_size": 100,
+
+    resp = await self.client.post(self.url, data={
+      "page": page,
+      "page_size": page_size,
       "not_exclude_deleted": True,
-      "updated_at": last_updated
+      "updated_at": last_updated.isoformat() if last_updated else None
     })
 
     if resp.status_code != 200:
-      logger.error("拉取房源数据失败", resp.text)
+      logger.error(f"拉取房源数据失败: {resp.text}")
       raise Exception(resp.text)
-    
-    return resp.json()
-    
\ No newline at end of file
+
+    return ResponseBody[HouseInfoModel].model_validate(resp.json())
+
+   async def iter_pages(self, last_updated: Optional[datetime], page_size: int) -> AsyncIterator[List[HouseModel]]:
+    """
+    并发预取分页：先取第 1 页拿到 total，再以 concurrency 为窗口预取后续页，按页码顺序产出
+    """
+    first = await self.fetch_house_data(last_updated, 1, page_size)
+    houses = first.data.list if first.data else []
+    yield houses
+    if len(houses) < page_size:
+      return
+
+    total_pages = math.ceil(first.data.total / page_size) if first.data.total else 1
+    pending: deque = deque()
+    next_page = 2
+
+    try:
+      while next_page <= total_pages or pending:
+        # 保持窗口内最多 concurrency 个在途请求，已取回未消费的页也计入窗口，内存有界
+        while next_page <= total_pages and len(pending) < self.concurrency:
+          pending.append(asyncio.create_task(self.fetch_house_data(last_updated, next_page, page_size)))
+          next_page += 1
+
+        response = await pending.popleft()
+        houses = response.data.list if response.data else []
+        yield houses
+
+        # total 是第 1 页时的快照，提前出现的短页说明数据已取完
+        if len(houses) < page_size:
+          break
+    finally:
+      for task in pending:
+        task.cancel()
+      await asyncio.gather(*pending, return_exceptions=True)
+
@@ -0,0 +1,388 @@
+"""
+完整同步流程：拉取 → 清洗 → 向量化 → 写入 → 提交水位线
+使用本地 hashing embedding 和内存模式 Qdrant
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock
+
+import pytest
+from langchain_core.runnables import RunnableConfig
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http import models
+
+from core.chains.search_chain import SYNC_SOURCE, HouseQuery, query_house, query_house_batch, run_sync_once
+from core.interfaces.house_info import HouseInfoInterface
+from core.models.house_info import ApartmentType, HouseInfoModel, HouseModel
+from core.models.response_body import ResponseBody
+from core.nodes.filter_node import house_filter_node
+from core.nodes.lexical_encoder import LexicalEncoder
+from core.nodes.rerank_node import RerankNode, RerankResult, RerankScore
+from core.nodes.vectorstore_node import HOUSE_COLLECTION
+from infrastructure.ai.embedding_provider import HashingEmbeddingProvider
+from infrastructure.cache.backend import MemoryCacheBackend
+from infrastructure.cache.search_result_cache import IndexGeneration, SearchResultCache
+from infrastructure.state.sync_state_store import SyncStateStore
+from infrastructure.suggest.suggest_index import SuggestIndex
+from infrastructure.vectorstore.local_store import LocalVectorStore
+from service.house_title_generator import HouseTitleGenerator
+
+
+def make_houses(n: int) -> list[HouseModel]:
+  base = datetime(2025, 11, 1)
+  return [
+    HouseModel(
+      id=str(uuid.UUID(int=i + 1)),
+      title=f"回祥小区 {i % 4 + 1}室 精装",
+      apartment_type=ApartmentType(room=i % 4 + 1),
+      building_area=60 + i,
+      sale_price=100 + i,
+      updated_at=base + timedelta(minutes=i),
+    )
+    for i in range(n)
+  ]
+
+
+class FakeHouseAPI(HouseInfoInterface):
+  def __init__(self, houses: list[HouseModel]):
+    self.houses = houses
+
+  async def fetch_house_data(self, last_updated, page, page_size):
+    rows = [h for h in self.houses if last_updated is None or h.updated_at >= last_updated]
+    total = len(rows)
+    rows = rows[(page - 1) * page_size:page * page_size]
+    return ResponseBody(code=200, msg="success", data=HouseInfoModel(list=rows, total=total))
+
+
+@pytest.mark.asyncio
+class TestSyncPipeline:
+
+  @pytest.fixture
+  def config(self, tmp_path):
+    return RunnableConfig({
+      "configurable": {
+        "embedding": HashingEmbeddingProvider(dimensions=64),
+        "qdrant": AsyncQdrantClient(location=":memory:"),
+        "sync_state": SyncStateStore(str(tmp_path / "sync_state.sqlite3")),
+      },
+      "max_concurrency": 2
+    })
+
+  async def test_sync_then_resume_incrementally(self, config):
+    houses = make_houses(30)
+    api = FakeHouseAPI(houses)
+    qdrant = config["configurable"]["qdrant"]
+
+    stats = await run_sync_once(api, config)
+
+    assert stats["stages"]["upsert"]["processed"] == 30
+    assert (await qdrant.count(HOUSE_COLLECTION)).count == 30
+    watermark = config["configurable"]["sync_state"].load(SYNC_SOURCE)
+    assert watermark.last_id == houses[-1].id
+
+    # 再次同步没有新数据
+    stats = await run_sync_once(api, config)
+    assert stats["produced"] == 0
+
+    res = await query_house(input="回祥小区 2室 精装", config=config)
+    assert len(res.points) > 0
+    # 结构化条件在检索时过滤
+    assert all(p.payload["rooms"] == 2 for p in res.points)
+
+  async def test_deleted_houses_are_removed_not_embedded(self, config):
+    houses = make_houses(10)
+    api = FakeHouseAPI(houses)
+    qdrant = config["configurable"]["qdrant"]
+    await run_sync_once(api, config)
+
+    # 上游软删除 3 套房源（updated_at 同时更新）
+    later = houses[-1].updated_at + timedelta(hours=1)
+    for i, house in enumerate(houses[:3]):
+      house.deleted_at = later
+      house.updated_at = later + timedelta(seconds=i)
+    houses.sort(key=lambda h: (h.updated_at, h.id))
+
+    stats = await run_sync_once(api, config)
+
+    assert stats["writer"] == {"upserted": 0, "deleted": 3, "batches": 1}
+    assert stats["stages"]["embed"]["processed"] == 0
+    assert (await qdrant.count(HOUSE_COLLECTION)).count == 7
+
+  async def test_sync_updates_suggest_index(self, config):
+    index = SuggestIndex(pinyin=False)
+    config["configurable"]["suggest_index"] = index
+    houses = make_houses(8)
+    api = FakeHouseAPI(houses)
+
+    await run_sync_once(api, config)
+    assert index.suggest("回祥")[0] == {"text": "回祥小区", "kind": "community", "score": 8}
+
+    later = houses[-1].updated_at + timedelta(hours=1)
+    houses[0].deleted_at = later
+    houses[0].updated_at = later
+    houses.sort(key=lambda h: (h.updated_at, h.id))
+    await run_sync_once(api, config)
+    assert index.suggest("回祥")[0]["score"] == 7
+
+  async def test_sync_generates_titles_before_indexing(self, config):
+    generator = HouseTitleGenerator(overwrite=True)
+    config["configurable"]["title_generator"] = generator
+    houses = make_houses(4)
+    houses[0].discount_year_limit = "满五"
+    houses[0].unique_housing = "是"
+
+    await run_sync_once(api=FakeHouseAPI(houses), config=config)
+
+    qdrant = config["configurable"]["qdrant"]
+    [point] = await qdrant.retrieve(HOUSE_COLLECTION, ids=[houses[0].id], with_payload=True)
+    assert point.payload["title"] == "回祥小区 1室 60㎡ 满五唯一"
+    assert point.payload["tags"] == ["满五唯一"]
+    assert generator.stats()["template_hits"] == 4
+
+  async def test_search_cache_invalidated_by_sync(self, config):
+    generation = IndexGeneration()
+    cache = SearchResultCache(MemoryCacheBackend(), generation)
+    config["configurable"]["index_generation"] = generation
+    config["configurable"]["search_result_cache"] = cache
+    houses = make_houses(5)
+    api = FakeHouseAPI(houses)
+
+    await run_sync_once(api, config)
+    first = await query_house(input="回祥小区", config=config)
+    again = await query_house(input="回祥小区", config=config)
+    assert cache.stats()["hits"] == 1
+    assert [p.id for p in again.points] == [p.id for p in first.points]
+
+    houses.append(make_houses(6)[-1])
+    generation_before = generation.value
+    await run_sync_once(api, config)
+    assert generation.value > generation_before
+
+    after = await query_house(input="回祥小区", config=config)
+    assert cache.stats()["hits"] == 1
+    assert len(after.points) == 6
+
+
+  async def test_query_reranked_and_fallback_not_cached(self, config):
+    class ReverseModel:
+      # 把向量检索顺序完全倒过来，第二次调用超时
+      def __init__(self):
+        self.calls = 0
+
+      def with_structured_output(self, schema):
+        return self
+
+      async def ainvoke(self, prompt):
+        self.calls += 1
+        if self.calls > 1:
+          await asyncio.sleep(1)
+        n = prompt.count("\n[") + 1
+        return RerankResult(scores=[RerankScore(index=i, score=i) for i in range(n)])
+
+    await run_sync_once(FakeHouseAPI(make_houses(30)), config)
+    plain = await query_house(input="回祥小区", config=config)
+    model = ReverseModel()
+    cache = SearchResultCache(MemoryCacheBackend(), IndexGeneration())
+    config["configurable"]["reranker"] = RerankNode(model, top_n=20, timeout=0.05)
+    config["configurable"]["search_result_cache"] = cache
+
+    reranked = await query_house(input="回祥小区", config=config)
+    assert len(reranked.points) == 10
+    # 20 个候选倒序后取前 10
+    assert reranked.points[0].id not in [p.id for p in plain.points]
+
+    await cache.backend.clear()
+    fallback = await query_house(input="回祥小区", config=config)
+    assert [p.id for p in fallback.points] == [p.id for p in plain.points]
+    assert len(cache.backend) == 0
+
+  async def test_query_top_k_offset_fields(self, config):
+    await run_sync_once(FakeHouseAPI(make_houses(30)), config)
+    full = await query_house(input="回祥小区", config=config, top_k=20)
+    assert len(full.points) == 20
+    assert full.points[0].vector is None
+
+    page = await query_house(input="回祥小区", config=config, top_k=5, offset=5, fields=["title", "price"])
+    assert [p.id for p in page.points] == [p.id for p in full.points[5:10]]
+    assert all(set(p.payload) == {"title", "price"} for p in page.points)
+
+    bare = await query_house(input="回祥小区", config=config, top_k=3, fields=[])
+    assert [p.id for p in bare.points] == [p.id for p in full.points[:3]]
+    assert all(not p.payload for p in bare.points)
+
+  async def test_reranked_query_projects_fields_after_rerank(self, config):
+    class ReverseModel:
+      def with_structured_output(self, schema):
+        return self
+
+      async def ainvoke(self, prompt):
+        # 摘要里要能拿到户型和面积，即使请求只要 title
+        assert "室" in prompt and "平" in prompt
+        n = prompt.count("\n[") + 1
+        return RerankResult(scores=[RerankScore(index=i, score=i) for i in range(n)])
+
+    await run_sync_once(FakeHouseAPI(make_houses(30)), config)
+    plain = await query_house(input="回祥小区", config=config, top_k=20)
+    config["configurable"]["reranker"] = RerankNode(ReverseModel(), top_n=20)
+
+    page = await query_house(input="回祥小区", config=config, top_k=5, offset=2, fields=["title"])
+    assert [p.id for p in page.points] == [p.id for p in plain.points[::-1][2:7]]
+    assert all(set(p.payload) == {"title"} for p in page.points)
+
+  async def test_query_batch_matches_single_queries(self, config):
+    await run_sync_once(FakeHouseAPI(make_houses(30)), config)
+    provider = config["configurable"]["embedding"]
+    qdrant = config["configurable"]["qdrant"]
+    queries = [
+      HouseQuery(input="回祥小区 2室", top_k=3),
+      HouseQuery(input="精装", top_k=5, offset=2, fields=["title"]),
+      HouseQuery(input="回祥小区 4室 精装"),
+    ]
+    expected = [
+      await query_house(input=q.input, config=config, top_k=q.top_k, offset=q.offset, fields=q.fields)
+      for q in queries
+    ]
+    provider.embed = AsyncMock(wraps=provider.embed)
+    qdrant.query_batch_points = AsyncMock(wraps=qdrant.query_batch_points)
+
+    results = await query_house_batch(queries, config)
+
+    # 一次 embedding 请求 + 一次批量检索请求，结果顺序与查询一致
+    provider.embed.assert_awaited_once()
+    qdrant.query_batch_points.assert_awaited_once()
+    assert [[p.id for p in r.points] for r in results] == [[p.id for p in r.points] for r in expected]
+    assert all(p.payload["rooms"] == 2 for p in results[0].points)
+    assert all(set(p.payload) == {"title"} for p in results[1].points)
+
+  async def test_query_batch_uses_result_cache(self, config):
+    cache = SearchResultCache(MemoryCacheBackend(), IndexGeneration())
+    config["configurable"]["search_result_cache"] = cache
+    await run_sync_once(FakeHouseAPI(make_houses(10)), config)
+    first = await query_house(input="回祥小区", config=config)
+
+    results = await query_house_batch([HouseQuery(input="回祥小区"), HouseQuery(input="精装")], config)
+
+    assert cache.stats()["hits"] == 1
+    assert [p.id for p in results[0].points] == [p.id for p in first.points]
+    assert len(results[1].points) > 0
+
+
+COMMUNITIES = ["回祥小区", "东方花园", "金色家园", "阳光新城", "翠湖天地", "锦绣华庭", "碧水湾", "滨江一号"]
+
+
+def make_community_houses() -> list[HouseModel]:
+  base = datetime(2025, 11, 1)
+  houses = []
+  for i in range(40):
+    community = COMMUNITIES[i % len(COMMUNITIES)]
+    houses.append(HouseModel(
+      id=str(uuid.UUID(int=i + 1)),
+      title=f"{community} {i % 3 + 2}室 南北通透 精装修 拎包入住",
+      house_address=f"{i % 9 + 1}号楼{i % 4 + 1}单元{100 + i}",
+      tags=["满五唯一", "近地铁"] if i % 2 else ["学区房"],
+      remark=f"业主电话 139{i:08d}",
+      apartment_type=ApartmentType(room=i % 3 + 2),
+      updated_at=base + timedelta(minutes=i),
+    ))
+  return houses
+
+
+@pytest.mark.asyncio
+class TestHybridSearch:
+
+  @pytest.fixture
+  def config(self, tmp_path):
+    return RunnableConfig({
+      "configurable": {
+        "embedding": HashingEmbeddingProvider(dimensions=64),
+        "lexical_encoder": LexicalEncoder(),
+        "qdrant": AsyncQdrantClient(location=":memory:"),
+        "sync_state": SyncStateStore(str(tmp_path / "sync_state.sqlite3")),
+      },
+      "max_concurrency": 2
+    })
+
+  async def test_exact_tokens_ranked_first(self, config):
+    houses = make_community_houses()
+    await run_sync_once(FakeHouseAPI(houses), config)
+
+    # 电话片段
+    res = await query_house(input="13900000017", config=config)
+    assert res.points[0].id == houses[17].id
+
+    # 小区名 + 楼号
+    res = await query_house(input="碧水湾 6号楼", config=config)
+    assert res.points[0].id == houses[14].id
+    assert res.points[0].payload["title"].startswith("碧水湾")
+
+  async def test_batch_query_hybrid(self, config):
+    houses = make_community_houses()
+    await run_sync_once(FakeHouseAPI(houses), config)
+
+    results = await query_house_batch([HouseQuery(input="13900000017"), HouseQuery(input="碧水湾 6号楼")], config)
+
+    assert results[0].points[0].id == houses[17].id
+    assert results[1].points[0].id == houses[14].id
+
+  async def test_rrf_fusion(self, config):
+    houses = make_community_houses()
+    await run_sync_once(FakeHouseAPI(houses), config)
+    query = "13900000017"
+    query_vector = await config["configurable"]["embedding"].embed_query(query)
+    sparse_vector = config["configurable"]["lexical_encoder"].encode_query(query)
+
+    res = await house_filter_node(query_vector, config, limit=5, sparse_vector=sparse_vector, fusion=models.Fusion.RRF)
+
+    assert houses[17].id in [p.id for p in res.points]
+
+  async def test_dense_only_collection_fallback(self, config):
+    qdrant = config["configurable"]["qdrant"]
+    # 没有 lexical 稀疏向量的旧 collection
+    await qdrant.create_collection(
+      HOUSE_COLLECTION,
+      vectors_config=models.VectorParams(size=64, distance=models.Distance.COSINE),
+    )
+    houses = make_community_houses()
+
+    await run_sync_once(FakeHouseAPI(houses), config)
+    res = await query_house(input="回祥小区", config=config)
+
+    assert (await qdrant.count(HOUSE_COLLECTION)).count == 40
+    assert len(res.points) == 10
+
+
+@pytest.mark.asyncio
+class TestLocalVectorStoreBackend:
+
+  async def test_sync_and_query(self, tmp_path):
+    config = RunnableConfig({
+      "configurable": {
+        "embedding": HashingEmbeddingProvider(dimensions=64),
+        "lexical_encoder": LexicalEncoder(),
+        "qdrant": LocalVectorStore(str(tmp_path / "vectors")),
+        "sync_state": SyncStateStore(str(tmp_path / "sync_state.sqlite3")),
+      },
+      "max_concurrency": 2
+    })
+    houses = make_houses(30)
+    api = FakeHouseAPI(houses)
+    await run_sync_once(api, config)
+
+    # 软删除 2 套
+    later = houses[-1].updated_at + timedelta(hours=1)
+    for i, house in enumerate(houses[:2]):
+      house.deleted_at = later
+      house.updated_at = later + timedelta(seconds=i)
+    houses.sort(key=lambda h: (h.updated_at, h.id))
+    await run_sync_once(api, config)
+
+    store = config["configurable"]["qdrant"]
+    assert (await store.count(HOUSE_COLLECTION)).count == 28
+    info = await store.get_collection(HOUSE_COLLECTION)
+    assert set(info.payload_schema) >= {"rooms", "price", "community_id"}
+
+    res = await query_house(input="回祥小区 2室 精装", config=config)
+    assert len(res.points) > 0
+    assert all(p.payload["rooms"] == 2 for p in res.points)
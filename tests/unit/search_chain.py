@@ -7,14 +7,15 @@ core.nodes.ingestion_node 的 Docstring
 import asyncio
 from unittest.mock import AsyncMock
 from langchain_core.runnables import RunnableConfig
-from openai import OpenAI
-from core.chains.search_chain import query_house, start_workflows
+from openai import AsyncOpenAI
+from core.chains.search_chain import query_house, run_sync_once
 from pathlib import Path
 from core.models.response_body import ResponseBody
 from core.models.house_info import HouseInfoModel
 import pytest
 import json
 from qdrant_client import AsyncQdrantClient
+from infrastructure.ai.embedding_provider import OpenAIEmbeddingProvider
 
 
 @pytest.mark.asyncio
@@ -44,25 +45,25 @@ class TestSearchChainNode:
         return mock_api
 
   async def test_fetch_house_data(self, house_api_mock):
-    openai_client = OpenAI(base_url='https://api.openai-proxy.org/v1')
+    embedding_provider = OpenAIEmbeddingProvider(AsyncOpenAI(base_url='https://api.openai-proxy.org/v1'))
     qdrant = AsyncQdrantClient(url="http://localhost:6333")
     
     print("开始测试数据拉取")
     config = RunnableConfig({
       "configurable": {
-        "openai": openai_client,
+        "embedding": embedding_provider,
         "qdrant": qdrant
       },
       "max_concurrency": 2
     })
-    await start_workflows(api=house_api_mock, config=config)
+    await run_sync_once(api=house_api_mock, config=config)
 
   async def test_query_house(self, house_api_mock):
-    openai_client = OpenAI(base_url='https://api.openai-proxy.org/v1')
+    embedding_provider = OpenAIEmbeddingProvider(AsyncOpenAI(base_url='https://api.openai-proxy.org/v1'))
     qdrant = AsyncQdrantClient(url="http://localhost:6333")
     config = RunnableConfig({
         "configurable": {
-         "openai": openai_client,
+         "embedding": embedding_provider,
          "qdrant": qdrant
       }
     })
@@ -0,0 +1,67 @@
+"""
+core.nodes.embedding_batch 的 Docstring
+embedding 批处理：按条数和 token 预算打包多输入请求
+"""
+
+import pytest
+from langchain_core.runnables import RunnableConfig
+
+from core.models.house_info import ApartmentType, HouseModel
+from core.nodes.embedding_batch import estimate_tokens, pack_batches
+from core.nodes.preprocessing_node import PreprocessingNode
+from infrastructure.ai.embedding_provider import HashingEmbeddingProvider
+
+
+def test_estimate_tokens():
+  assert estimate_tokens("") == 0
+  assert estimate_tokens("回祥小区") == 4
+  assert estimate_tokens("abcd") == 1
+  assert estimate_tokens("3室") == 2
+
+
+def test_pack_batches_by_items():
+  batches = pack_batches(["a"] * 7, max_items=3)
+  assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_pack_batches_by_tokens():
+  texts = ["回祥小区", "三室两厅", "精装"]
+  batches = pack_batches(texts, max_items=10, max_tokens=8)
+  assert batches == [[0, 1], [2]]
+
+
+def test_pack_batches_oversized_text_alone():
+  texts = ["短", "长" * 50, "短"]
+  batches = pack_batches(texts, max_items=10, max_tokens=10)
+  assert batches == [[0], [1], [2]]
+
+
+class RecordingProvider(HashingEmbeddingProvider):
+  """记录每次请求的输入条数"""
+
+  def __init__(self):
+    super().__init__(dimensions=16)
+    self.calls: list[int] = []
+
+  async def embed(self, texts):
+    self.calls.append(len(texts))
+    return await super().embed(texts)
+
+
+@pytest.mark.asyncio
+async def test_abatch_maps_vectors_in_order():
+  provider = RecordingProvider()
+  houses = [
+    HouseModel(id=f"house_{i}", title="回祥" * (i + 1), apartment_type=ApartmentType(room=i))
+    for i in range(5)
+  ]
+  node = PreprocessingNode(batch_size=2)
+  config = RunnableConfig({"configurable": {"embedding": provider}, "max_concurrency": 2})
+
+  points = await node.abatch(houses, config)
+
+  assert provider.calls == [2, 2, 1]
+  assert [p.id for p in points] == [h.id for h in houses]
+  for house, point in zip(houses, points):
+    assert point.vector == await provider.embed_query(node.clean(house).embedding_text)
+    assert point.payload["rooms"] == house.apartment_type.room
@@ -0,0 +1,69 @@
+"""
+infrastructure.cache.embedding_cache 的 Docstring
+Embedding 持久化缓存：模型名 + 文本哈希 -> 向量
+"""
+
+import pytest
+
+from infrastructure.ai.embedding_provider import HashingEmbeddingProvider
+from infrastructure.cache.embedding_cache import CachedEmbeddingProvider, EmbeddingCache
+
+
+class CountingProvider(HashingEmbeddingProvider):
+  def __init__(self):
+    super().__init__(dimensions=8)
+    self.embedded: list[str] = []
+
+  async def embed(self, texts):
+    self.embedded.extend(texts)
+    return await super().embed(texts)
+
+
+def test_cache_roundtrip_and_counters(tmp_path):
+  cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"))
+
+  assert cache.get_many("m", ["a", "b"]) == [None, None]
+  cache.put_many("m", ["a"], [[0.5, 0.25]])
+
+  assert cache.get_many("m", ["a", "b"]) == [[0.5, 0.25], None]
+  # 模型不同不命中
+  assert cache.get_many("other", ["a"]) == [None]
+
+  stats = cache.stats()
+  assert stats["hits"] == 1
+  assert stats["misses"] == 4
+  assert stats["size"] == 1
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+  cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+
+  cache.put_many("m", ["a"], [[1.0]])
+  cache.put_many("m", ["b"], [[2.0]])
+  # 访问 a，使 b 成为最旧的条目
+  cache.get_many("m", ["a"])
+  cache.put_many("m", ["c"], [[3.0]])
+
+  assert cache.size() == 2
+  assert cache.get_many("m", ["a", "b", "c"]) == [[1.0], None, [3.0]]
+
+
+def test_cache_persists_across_instances(tmp_path):
+  path = str(tmp_path / "cache.sqlite3")
+  EmbeddingCache(path).put_many("m", ["a"], [[1.0]])
+
+  assert EmbeddingCache(path).get_many("m", ["a"]) == [[1.0]]
+
+
+@pytest.mark.asyncio
+async def test_cached_provider_only_embeds_misses(tmp_path):
+  provider = CountingProvider()
+  cached = CachedEmbeddingProvider(provider, EmbeddingCache(str(tmp_path / "cache.sqlite3")))
+
+  first = await cached.embed(["回祥", "学区房", "回祥"])
+  second = await cached.embed(["学区房", "地铁"])
+
+  assert provider.embedded == ["回祥", "学区房", "地铁"]
+  assert first[0] == first[2]
+  assert second[0] == pytest.approx(first[1], abs=1e-6)
+  assert cached.cache.stats()["hits"] == 1
@@ -2,4 +2,98 @@
 core.nodes.embedding_node 的 Docstring
 文本/数据向量化节点，将清洗后的数据生成 embeddings
 （基于预训练模型或自定义模型），以便后续相似度计算和检索
-"""
\ No newline at end of file
+"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from langchain_core.runnables import RunnableConfig
+from openai import AsyncOpenAI
+
+from core.nodes.embedding_node import embedding_batch_node, embedding_node
+from infrastructure.ai.embedding_provider import HashingEmbeddingProvider, OpenAIEmbeddingProvider, truncate_embedding
+from infrastructure.cache.backend import MemoryCacheBackend
+from infrastructure.cache.query_embedding_cache import QueryEmbeddingCache
+
+
+def cosine(a, b):
+  return sum(x * y for x, y in zip(a, b))
+
+
+@pytest.mark.asyncio
+class TestEmbeddingNode:
+
+  async def test_hashing_provider_is_deterministic(self):
+    provider = HashingEmbeddingProvider(dimensions=64)
+
+    a, b = await provider.embed(["回祥小区 3室", "回祥小区 3室"])
+
+    assert len(a) == 64
+    assert a == b
+    assert abs(cosine(a, a) - 1.0) < 1e-9
+
+  async def test_hashing_provider_similarity(self):
+    provider = HashingEmbeddingProvider(dimensions=256)
+
+    query, near, far = await provider.embed(["回祥小区 两室", "回祥小区 两室一厅 精装", "学区房 近地铁"])
+
+    assert cosine(query, near) > cosine(query, far)
+
+  async def test_embedding_node_uses_provider(self):
+    provider = HashingEmbeddingProvider(dimensions=32)
+    config = RunnableConfig({"configurable": {"embedding": provider}})
+
+    vector = await embedding_node("学区房", config)
+
+    assert vector == await provider.embed_query("学区房")
+
+  async def test_embedding_batch_node_single_request(self):
+    provider = HashingEmbeddingProvider(dimensions=32)
+    provider.embed = AsyncMock(wraps=provider.embed)
+    cache = QueryEmbeddingCache(MemoryCacheBackend(), model=provider.cache_key)
+    config = RunnableConfig({"configurable": {"embedding": provider, "query_embedding_cache": cache}})
+    await embedding_node("学区房", config)
+    provider.embed.reset_mock()
+
+    vectors = await embedding_batch_node(["近地铁", "学区房", " 近地铁 ", "回祥小区"], config)
+
+    # 缓存命中的不再请求，重复查询去重，其余一次请求
+    provider.embed.assert_awaited_once_with(["近地铁", "回祥小区"])
+    assert vectors[0] == vectors[2] == await provider.embed_query("近地铁")
+    assert vectors[1] == await provider.embed_query("学区房")
+    assert vectors[3] == await provider.embed_query("回祥小区")
+
+  async def test_openai_provider_maps_by_index(self):
+    client = MagicMock(spec=AsyncOpenAI)
+    client.embeddings = MagicMock()
+    client.embeddings.create = AsyncMock(return_value=MagicMock(data=[
+      MagicMock(index=1, embedding=[0.2]),
+      MagicMock(index=0, embedding=[0.1]),
+    ]))
+    provider = OpenAIEmbeddingProvider(client, model="text-embedding-3-large")
+
+    vectors = await provider.embed(["a", "b"])
+
+    assert vectors == [[0.1], [0.2]]
+    client.embeddings.create.assert_awaited_once_with(model="text-embedding-3-large", input=["a", "b"], dimensions=3072)
+
+  async def test_openai_provider_dimensions_only_for_v3_models(self):
+    client = MagicMock(spec=AsyncOpenAI)
+    client.embeddings = MagicMock()
+    client.embeddings.create = AsyncMock(return_value=MagicMock(data=[MagicMock(index=0, embedding=[0.1])]))
+
+    await OpenAIEmbeddingProvider(client, model="text-embedding-3-small", dimensions=256).embed(["a"])
+    client.embeddings.create.assert_awaited_with(model="text-embedding-3-small", input=["a"], dimensions=256)
+
+    await OpenAIEmbeddingProvider(client, model="text-embedding-ada-002", dimensions=1536).embed(["a"])
+    client.embeddings.create.assert_awaited_with(model="text-embedding-ada-002", input=["a"])
+
+
+def test_cache_key_includes_dimensions():
+  assert HashingEmbeddingProvider(dimensions=32).cache_key != HashingEmbeddingProvider(dimensions=64).cache_key
+
+
+def test_truncate_embedding():
+  vector = truncate_embedding([3.0, 4.0, 12.0], 2)
+
+  assert vector == pytest.approx([0.6, 0.8])
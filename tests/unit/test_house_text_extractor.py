@@ -0,0 +1,79 @@
+"""
+service.house_text_extractor 的 Docstring
+房源文本规则提取
+"""
+import pytest
+
+from service.house_text_extractor import extract_house_fields
+
+
+def test_rent_listing_fully_extracted():
+  res = extract_house_fields("出租 3室1厅2卫 130平方 1500/月 押一付三 朝南 精装 电话 138-0000-1234 图片 https://a.com/x/1.jpg")
+
+  assert res.fields == {
+    "images": [{"type": "jpg", "url": "https://a.com/x/1.jpg"}],
+    "phone": "13800001234",
+    "room": 3,
+    "hall": 1,
+    "bathroom": 2,
+    "building_area": 130.0,
+    "rent_price": 1500.0,
+    "payment_method": "押一付三",
+    "house_orientation": "南",
+    "house_decoration": "精装",
+    "transaction_type": "出租",
+  }
+  assert not res.needs_llm
+
+
+def test_sale_listing_with_residual_text():
+  res = extract_house_fields("回祥小区 急售 两室一厅 89.5平米 售价120万 底价115万 南北通透 毛坯 13900000017 业主诚心")
+
+  assert res.fields["room"] == 2 and res.fields["hall"] == 1
+  assert res.fields["sale_price"] == 1_200_000
+  assert res.fields["sale_low_price"] == 1_150_000
+  assert res.fields["house_orientation"] == "南北"
+  assert res.fields["transaction_type"] == "出售"
+  assert res.fields["urgent"] is True
+  assert res.remainder == "回祥小区业主诚心"
+  assert res.needs_llm
+
+
+@pytest.mark.parametrize("text, field, value", [
+  ("整租 2房1厅 月租3000 季付", "rent_price", 3000.0),
+  ("整租 2房1厅 月租3000 季付", "room", 2),
+  ("100㎡ 平层", "building_area", 100.0),
+  ("低价 2800元/月 租金3000", "rent_low_price", 2800.0),
+])
+def test_patterns(text, field, value):
+  assert extract_house_fields(text).fields[field] == value
+
+
+def test_ambiguous_values_left_to_llm():
+  res = extract_house_fields("3室 或 4室")
+
+  assert "room" not in res.fields
+  assert res.ambiguous == ["room"]
+  assert res.needs_llm
+
+
+@pytest.mark.parametrize("text", [
+  "回祥小区 两室 首付30万 满五唯一",
+  "出售 3室 税费2万",
+  "回祥小区 3室 100平 单价1.2万",
+])
+def test_other_amounts_not_taken_as_sale_price(text):
+  res = extract_house_fields(text)
+
+  assert "sale_price" not in res.fields
+  # 首付 / 税费 / 单价 留给 LLM
+  assert res.needs_llm
+
+
+def test_labeled_sale_price_preferred():
+  assert extract_house_fields("售价120万 首付36万").fields["sale_price"] == 1_200_000
+  res = extract_house_fields("出售 3室 总价120万 100万")
+  assert res.fields["sale_price"] == 1_200_000
+  assert "sale_price" not in res.ambiguous
+  # 没有标签时裸金额仍按售价处理
+  assert extract_house_fields("出售 3室 120万 首付36万").fields["sale_price"] == 1_200_000
@@ -0,0 +1,124 @@
+"""
+service.house_title_generator 的 Docstring
+标题和标签生成：模板优先、LLM 批量兜底、按字段哈希缓存
+"""
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from core.models.house_info import ApartmentType, HouseModel
+from infrastructure.cache.backend import MemoryCacheBackend
+from service.house_title_generator import HouseTitleGenerator, _TitleTagBatch, _TitleTagItem
+
+
+def make_house(**kwargs) -> HouseModel:
+  fields = {
+    "title": "回祥小区 3室 精装",
+    "apartment_type": ApartmentType(room=3, hall=2, bathroom=1),
+    "building_area": 89.0,
+    "house_decoration": "精装",
+    "house_orientation": "南北",
+    "transaction_type": "出售",
+    "discount_year_limit": "满五年",
+    "unique_housing": "是",
+  }
+  fields.update(kwargs)
+  return HouseModel(**fields)
+
+
+class FakeModel:
+  """
+  按提示词中的房源行数返回结果，记录每次请求包含的房源数
+  """
+
+  def __init__(self, fail: bool = False):
+    self.fail = fail
+    self.batches = []
+
+  def with_structured_output(self, schema):
+    assert schema is _TitleTagBatch
+
+    def generate(prompt: str) -> _TitleTagBatch:
+      if self.fail:
+        raise RuntimeError("llm down")
+      lines = prompt.split("房源列表：\n")[1].split("\n")
+      self.batches.append(len(lines))
+      return _TitleTagBatch(items=[
+        _TitleTagItem(index=i, title=f"东方花园 两居 {i}", tags=["精装", "学区房"])
+        for i in range(len(lines))
+      ])
+
+    return RunnableLambda(generate)
+
+
+@pytest.mark.asyncio
+class TestHouseTitleGenerator:
+
+  async def test_template_without_llm(self):
+    model = FakeModel()
+    generator = HouseTitleGenerator(model)
+
+    [res] = await generator.generate([make_house()])
+
+    assert res.title == "回祥小区 3室2厅1卫 89㎡ 精装 南北通透 满五唯一"
+    assert res.tags == ["南北通透", "精装", "满五唯一"]
+    assert res.source == "template"
+    assert model.batches == []
+    assert generator.stats()["template_hits"] == 1
+
+  async def test_rent_has_no_tax_part(self):
+    house = make_house(transaction_type="出租", house_orientation="南", unique_housing=None, remark="近地铁 有电梯")
+
+    [res] = await HouseTitleGenerator().generate([house])
+
+    assert res.title == "回祥小区 3室2厅1卫 89㎡ 精装 朝南"
+    assert res.tags == ["精装", "近地铁", "有电梯"]
+
+  async def test_missing_fields_batched_into_few_llm_calls(self):
+    model = FakeModel()
+    generator = HouseTitleGenerator(model, batch_size=4)
+    houses = [make_house(title=None, remark=f"东方花园 {i}号楼") for i in range(10)]
+
+    results = await generator.generate(houses + [make_house()])
+
+    assert model.batches == [4, 4, 2]
+    assert [r.source for r in results] == ["llm"] * 10 + ["template"]
+    assert results[0].title == "东方花园 两居 0"
+    # 模板标签在前，LLM 标签去重追加
+    assert results[0].tags == ["南北通透", "精装", "满五唯一", "学区房"]
+    assert generator.stats()["llm_houses"] == 10
+
+  async def test_llm_results_cached_by_fields(self):
+    model = FakeModel()
+    generator = HouseTitleGenerator(model, cache=MemoryCacheBackend())
+    houses = [make_house(title=None, remark="东方花园"), make_house(title=None, remark="东方花园")]
+
+    first = await generator.generate(houses)
+    again = await generator.generate([make_house(title=None, remark="东方花园")])
+
+    # 同一批内字段相同的房源只请求一次，之后命中缓存
+    assert model.batches == [1]
+    assert first[0] == first[1]
+    assert again[0].source == "cache"
+    assert again[0].title == first[0].title
+    assert generator.stats()["cache_hits"] == 1
+
+  async def test_llm_failure_falls_back_to_draft(self):
+    generator = HouseTitleGenerator(FakeModel(fail=True), cache=MemoryCacheBackend())
+
+    [res] = await generator.generate([make_house(title=None)])
+
+    assert res.source == "template"
+    assert res.title == "3室2厅1卫 89㎡ 精装 南北通透 满五唯一"
+
+  async def test_apply_keeps_existing_title_and_merges_tags(self):
+    house = make_house(tags=["近学校"])
+    untitled = make_house(title=None, apartment_type=None)
+
+    await HouseTitleGenerator().apply([house, untitled])
+
+    assert house.title == "回祥小区 3室 精装"
+    assert house.tags == ["近学校", "南北通透", "精装", "满五唯一"]
+    assert untitled.title == "89㎡ 精装 南北通透 满五唯一"
+
+    await HouseTitleGenerator(overwrite=True).apply([house])
+    assert house.title == "回祥小区 3室2厅1卫 89㎡ 精装 南北通透 满五唯一"
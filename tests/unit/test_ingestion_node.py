@@ -4,14 +4,17 @@ core.nodes.ingestion_node 的 Docstring
 
 """
 
+from datetime import datetime, timedelta
 from unittest.mock import AsyncMock
 import pytest
 
 from core.nodes.ingestion_node import Ingestion
 import json
 from pathlib import Path
+from core.interfaces.house_info import HouseInfoInterface
 from core.models.response_body import ResponseBody
-from core.models.house_info import HouseInfoModel
+from core.models.house_info import HouseInfoModel, HouseModel
+from core.models.sync_state import SyncWatermark
 
 @pytest.mark.asyncio
 class TestIngestionNode:
@@ -63,4 +66,57 @@ class TestIngestionNode:
     result = await ingestion_node.run()
 
     assert result.houses == mock_response.return_value.data.list
-    assert result.last_updated == ingestion_node.last_updated
\ No newline at end of file
+    assert result.last_updated == ingestion_node.last_updated
+
+
+class FakeHouseAPI(HouseInfoInterface):
+  """模拟接口：updated_at >= last_updated，按 (updated_at, id) 排序分页"""
+
+  def __init__(self, houses):
+    self.houses = houses
+    self.calls = []
+
+  async def fetch_house_data(self, last_updated, page, page_size):
+    self.calls.append((last_updated, page))
+    rows = [h for h in self.houses if last_updated is None or h.updated_at >= last_updated]
+    rows = rows[(page - 1) * page_size:page * page_size]
+    return ResponseBody(code=200, msg="success", data=HouseInfoModel(list=rows, total=len(rows)))
+
+
+@pytest.mark.asyncio
+class TestIngestionWatermark:
+
+  @pytest.fixture
+  def houses(self):
+    base = datetime(2025, 11, 1)
+    return [HouseModel(id=f"h{i}", updated_at=base + timedelta(minutes=i // 2)) for i in range(6)]
+
+  @pytest.fixture
+  def paged_api(self, houses):
+    return FakeHouseAPI(houses)
+
+  async def test_full_sync_advances_watermark(self, paged_api, houses):
+    ingestion = Ingestion(house_api=paged_api, page_size=4)
+
+    result = await ingestion.fetch_house_data()
+
+    assert result == houses
+    # 分页期间查询条件不变
+    assert paged_api.calls == [(None, 1), (None, 2)]
+    assert ingestion.next_watermark == SyncWatermark(updated_at=houses[-1].updated_at, last_id="h5")
+
+  async def test_incremental_sync_skips_synced(self, paged_api, houses):
+    watermark = SyncWatermark(updated_at=houses[2].updated_at, last_id="h2")
+    ingestion = Ingestion(house_api=paged_api, watermark=watermark, page_size=4)
+
+    result = await ingestion.fetch_house_data()
+
+    assert [h.id for h in result] == ["h3", "h4", "h5"]
+    assert ingestion.next_watermark.last_id == "h5"
+
+  async def test_nothing_new_keeps_watermark(self, paged_api, houses):
+    watermark = SyncWatermark(updated_at=houses[-1].updated_at, last_id="h5")
+    ingestion = Ingestion(house_api=paged_api, watermark=watermark)
+
+    assert await ingestion.fetch_house_data() == []
+    assert ingestion.next_watermark == watermark
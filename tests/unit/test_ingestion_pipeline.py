@@ -0,0 +1,83 @@
+"""
+core.chains.ingestion_pipeline 的 Docstring
+流式分阶段同步流水线：有界队列 + 各阶段独立 worker
+"""
+
+import asyncio
+
+import pytest
+
+from core.chains.ingestion_pipeline import Stage, StagedPipeline
+
+
+async def numbers(n: int):
+  for i in range(n):
+    yield i
+
+
+@pytest.mark.asyncio
+class TestStagedPipeline:
+
+  async def test_all_items_flow_through(self):
+    seen = []
+
+    async def double(batch):
+      return [i * 2 for i in batch]
+
+    async def sink(batch):
+      seen.extend(batch)
+      return []
+
+    pipeline = StagedPipeline(numbers(50), [
+      Stage("double", double, workers=3, queue_size=4),
+      Stage("sink", sink, workers=2, queue_size=4, batch_size=8),
+    ])
+    stats = await pipeline.run()
+
+    assert sorted(seen) == [i * 2 for i in range(50)]
+    assert stats["produced"] == 50
+    assert stats["stages"]["double"]["processed"] == 50
+    assert stats["stages"]["sink"]["processed"] == 50
+
+  async def test_backpressure_bounds_queue_depth(self):
+    peak = 0
+    pipeline = None
+
+    async def slow_sink(batch):
+      nonlocal peak
+      peak = max(peak, pipeline.stages[0].queue.qsize())
+      await asyncio.sleep(0.001)
+      return []
+
+    pipeline = StagedPipeline(numbers(100), [Stage("sink", slow_sink, queue_size=5)])
+    await pipeline.run()
+
+    # 生产者不会超过队列容量（+1 为结束标记）
+    assert peak <= 5
+
+  async def test_batches_respect_batch_size(self):
+    sizes = []
+
+    async def record(batch):
+      sizes.append(len(batch))
+      await asyncio.sleep(0)
+      return []
+
+    async def burst():
+      for i in range(20):
+        yield i
+
+    pipeline = StagedPipeline(burst(), [Stage("record", record, queue_size=100, batch_size=6)])
+    await pipeline.run()
+
+    assert sum(sizes) == 20
+    assert max(sizes) <= 6
+
+  async def test_stage_error_propagates(self):
+    async def boom(batch):
+      raise RuntimeError("embedding 失败")
+
+    pipeline = StagedPipeline(numbers(10), [Stage("boom", boom, queue_size=2)])
+
+    with pytest.raises(RuntimeError):
+      await pipeline.run()
@@ -0,0 +1,65 @@
+"""
+core.nodes.lexical_encoder 的 Docstring
+稀疏词法向量切词与权重
+"""
+import pytest
+
+from core.nodes.lexical_encoder import LexicalEncoder, tokenize
+
+
+def test_tokenize_cjk_bigrams():
+  assert tokenize("回祥小区") == ["回祥", "祥小", "小区"]
+  assert tokenize("东 西") == ["东", "西"]
+
+
+def test_tokenize_alnum_and_digit_shingles():
+  tokens = tokenize("６号楼 Room 138001")
+
+  assert "号楼" in tokens
+  assert "6" in tokens
+  assert "room" in tokens
+  assert tokens[-3:] == ["1380", "3800", "8001"]
+  assert "138001" in tokens
+
+
+def test_encode_is_deterministic_and_sorted():
+  encoder = LexicalEncoder()
+
+  a = encoder.encode("回祥小区 2室 精装")
+  b = encoder.encode("回祥小区 2室 精装")
+
+  assert a == b
+  assert a.indices == sorted(a.indices)
+  assert len(a.indices) == len(a.values)
+
+
+def test_encode_tf_saturation():
+  encoder = LexicalEncoder(k1=1.2, b=0.0)
+
+  once = encoder.encode("回祥")
+  twice = encoder.encode("回祥 回祥")
+
+  assert once.values[0] == pytest.approx(1.0)
+  # 词频饱和：出现两次的权重小于 2 倍
+  assert once.values[0] < twice.values[0] < 2 * once.values[0]
+
+
+def test_encode_length_normalization():
+  encoder = LexicalEncoder(avg_len=4)
+
+  short = encoder.encode("回祥")
+  long = encoder.encode("回祥 " + "东方花园金色家园阳光新城")
+
+  index = short.indices[0]
+  assert long.values[long.indices.index(index)] < short.values[0]
+
+
+def test_encode_query_unit_weights():
+  query = LexicalEncoder().encode_query("回祥 回祥 小区")
+
+  assert query.values == [1.0] * len(query.indices)
+  assert len(query.indices) == 2
+
+
+def test_empty_text():
+  assert LexicalEncoder().encode_query("，。").indices == []
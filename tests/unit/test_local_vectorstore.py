@@ -0,0 +1,226 @@
+"""
+infrastructure.vectorstore.local_store 的 Docstring
+进程内向量库：结果与内存模式 Qdrant 对齐
+"""
+import random
+
+import pytest
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http import models
+
+from infrastructure.vectorstore.local_store import LocalVectorStore
+
+DIM = 16
+
+
+def make_points(n: int, seed: int = 0) -> list[models.PointStruct]:
+  rng = random.Random(seed)
+  return [
+    models.PointStruct(
+      id=i,
+      vector=[rng.gauss(0, 1) for _ in range(DIM)],
+      payload={
+        "rooms": i % 4 + 1,
+        "price": 1_000_000 + i * 10_000,
+        "orientation": ["南北", "东西", "南"][i % 3],
+        "has_elevator": i % 2 == 0,
+        "tags": ["学区房"] if i % 5 == 0 else ["近地铁"],
+        "floor_range": {"door_number_from": i % 30},
+      } if i % 7 else {"rooms": None},
+    )
+    for i in range(n)
+  ]
+
+
+FILTERS = [
+  None,
+  models.Filter(must=[models.FieldCondition(key="rooms", match=models.MatchValue(value=2))]),
+  models.Filter(must=[
+    models.FieldCondition(key="rooms", range=models.Range(gte=2, lte=3)),
+    models.FieldCondition(key="price", range=models.Range(lt=1_300_000)),
+  ]),
+  models.Filter(must=[models.FieldCondition(key="orientation", match=models.MatchAny(any=["南北", "南"]))]),
+  models.Filter(must=[models.FieldCondition(key="has_elevator", match=models.MatchValue(value=True))]),
+  models.Filter(must_not=[models.FieldCondition(key="has_elevator", match=models.MatchValue(value=True))]),
+  models.Filter(should=[
+    models.FieldCondition(key="tags", match=models.MatchValue(value="学区房")),
+    models.FieldCondition(key="rooms", match=models.MatchValue(value=4)),
+  ]),
+  models.Filter(must=[models.FieldCondition(key="floor_range.door_number_from", range=models.Range(gt=20))]),
+  models.Filter(must=[models.FieldCondition(key="orientation", match=models.MatchExcept(**{"except": ["南"]}))]),
+]
+
+
+async def load(client, points, collection="c"):
+  await client.create_collection(collection, vectors_config=models.VectorParams(size=DIM, distance=models.Distance.COSINE))
+  await client.upsert(collection, points=points)
+
+
+@pytest.mark.asyncio
+class TestLocalVectorStore:
+
+  @pytest.mark.parametrize("query_filter", FILTERS)
+  async def test_matches_qdrant(self, tmp_path, query_filter):
+    points = make_points(300)
+    local = LocalVectorStore(str(tmp_path))
+    qdrant = AsyncQdrantClient(location=":memory:")
+    await load(local, points)
+    await load(qdrant, points)
+    query = make_points(1, seed=99)[0].vector
+
+    expected = await qdrant.query_points("c", query=query, query_filter=query_filter, limit=10)
+    actual = await local.query_points("c", query=query, query_filter=query_filter, limit=10)
+
+    assert [p.id for p in actual.points] == [p.id for p in expected.points]
+    assert [p.score for p in actual.points] == pytest.approx([p.score for p in expected.points], abs=1e-5)
+    assert (await local.count("c", count_filter=query_filter)).count == (await qdrant.count("c", count_filter=query_filter)).count
+
+  async def test_upsert_delete_and_persist(self, tmp_path):
+    local = LocalVectorStore(str(tmp_path))
+    # 超过初始容量，触发 memmap 扩容
+    points = make_points(2500)
+    await load(local, points)
+    await local.delete("c", points_selector=models.PointIdsList(points=[0, 1, 2]))
+    # 覆盖写入
+    updated = points[10].model_copy(update={"payload": {"rooms": 9}})
+    await local.upsert("c", points=[updated])
+    await local.close()
+
+    reopened = LocalVectorStore(str(tmp_path))
+    assert await reopened.collection_exists("c")
+    assert (await reopened.count("c")).count == 2497
+
+    res = await reopened.query_points("c", query=points[10].vector, limit=1)
+    assert res.points[0].id == 10
+    assert res.points[0].payload == {"rooms": 9}
+    assert res.points[0].score == pytest.approx(1.0, abs=1e-5)
+
+    # 删除空出来的行会被复用
+    await reopened.upsert("c", points=make_points(3, seed=5)[:1])
+    assert (await reopened.count("c")).count == 2498
+
+  async def test_float16(self, tmp_path):
+    points = make_points(200)
+    local = LocalVectorStore(str(tmp_path), dtype="float16")
+    await load(local, points)
+
+    res = await local.query_points("c", query=points[42].vector, limit=3)
+
+    assert res.points[0].id == 42
+    assert res.points[0].score == pytest.approx(1.0, abs=1e-2)
+
+  async def test_payload_selector_and_offset(self, tmp_path):
+    points = make_points(50)
+    local = LocalVectorStore(str(tmp_path))
+    await load(local, points)
+
+    full = await local.query_points("c", query=points[3].vector, limit=6)
+    page = await local.query_points("c", query=points[3].vector, limit=3, offset=3, with_payload=["rooms"], with_vectors=True)
+
+    assert [p.id for p in page.points] == [p.id for p in full.points[3:]]
+    assert all(set(p.payload) <= {"rooms"} for p in page.points)
+    assert len(page.points[0].vector) == DIM
+
+  async def test_query_batch_points(self, tmp_path):
+    points = make_points(100)
+    local = LocalVectorStore(str(tmp_path))
+    await load(local, points)
+    requests = [
+      models.QueryRequest(query=points[1].vector, filter=FILTERS[1], limit=3, with_payload=True),
+      models.QueryRequest(query=points[2].vector, limit=2, offset=1, with_payload=["rooms"]),
+    ]
+
+    results = await local.query_batch_points("c", requests=requests)
+
+    first = await local.query_points("c", query=points[1].vector, query_filter=FILTERS[1], limit=3)
+    second = await local.query_points("c", query=points[2].vector, limit=2, offset=1, with_payload=["rooms"])
+    assert [p.id for p in results[0].points] == [p.id for p in first.points]
+    assert [p.id for p in results[1].points] == [p.id for p in second.points]
+    assert all(set(p.payload) <= {"rooms"} for p in results[1].points)
+
+  async def test_scroll(self, tmp_path):
+    points = make_points(25)
+    local = LocalVectorStore(str(tmp_path))
+    await load(local, points)
+    await local.delete("c", points_selector=models.PointIdsList(points=[3]))
+
+    seen, offset = [], None
+    while True:
+      records, offset = await local.scroll("c", limit=10, offset=offset, with_payload=["rooms"])
+      seen.extend(records)
+      if offset is None:
+        break
+
+    assert [r.id for r in seen] == [i for i in range(25) if i != 3]
+    assert all(set(r.payload) <= {"rooms"} for r in seen)
+
+  async def test_scroll_offset_deleted_between_pages(self, tmp_path):
+    local = LocalVectorStore(str(tmp_path))
+    await load(local, make_points(25))
+
+    records, offset = await local.scroll("c", limit=10)
+    await local.delete("c", points_selector=models.PointIdsList(points=[offset]))
+    rest, _ = await local.scroll("c", limit=100, offset=offset)
+
+    assert [r.id for r in records + rest] == [i for i in range(25) if i != 10]
+    with pytest.raises(ValueError):
+      await local.scroll("c", limit=10, offset=999)
+
+  async def test_range_on_missing_and_mixed_fields(self, tmp_path):
+    points = make_points(6)
+    for i, point in enumerate(points):
+      point.payload = {"empty": None, "mixed": [1, "二", None, 4.5, True, 6][i]}
+    local = LocalVectorStore(str(tmp_path))
+    await load(local, points)
+
+    def in_range(key, r):
+      return models.Filter(must=[models.FieldCondition(key=key, range=r)])
+
+    assert (await local.count("c", count_filter=in_range("empty", models.Range(gte=0)))).count == 0
+    assert (await local.count("c", count_filter=in_range("missing", models.Range(gte=0)))).count == 0
+    res = await local.query_points("c", query=points[0].vector, query_filter=in_range("mixed", models.Range(gte=2)), limit=10)
+    assert sorted(p.id for p in res.points) == [3, 5]
+
+  async def test_filters_follow_incremental_writes(self, tmp_path):
+    local = LocalVectorStore(str(tmp_path))
+    remote = AsyncQdrantClient(location=":memory:")
+    points = make_points(40)
+    for client in (local, remote):
+      await load(client, points)
+    # 先展开列，之后的写入只更新受影响的行
+    for query_filter in FILTERS:
+      await local.count("c", count_filter=query_filter)
+
+    rng = random.Random(1)
+    updated = [
+      models.PointStruct(id=i, vector=p.vector, payload={**(p.payload or {}), "rooms": rng.choice([1, 2, 3, 4, None]), "price": "面议"})
+      for i, p in enumerate(points[:10])
+    ]
+    # 复用被删除的行，新 payload 不含 orientation 等字段
+    fresh = [models.PointStruct(id=100 + i, vector=p.vector, payload={"rooms": 2}) for i, p in enumerate(points[10:15])]
+    for client in (local, remote):
+      await client.delete("c", points_selector=models.PointIdsList(points=list(range(30, 40))))
+      await client.upsert("c", points=updated)
+      await client.upsert("c", points=fresh)
+
+    for query_filter in FILTERS:
+      expected = await remote.count("c", count_filter=query_filter)
+      assert (await local.count("c", count_filter=query_filter)).count == expected.count, query_filter
+
+  async def test_payload_index_reported(self, tmp_path):
+    local = LocalVectorStore(str(tmp_path))
+    await load(local, make_points(10))
+
+    await local.create_payload_index("c", "rooms", field_schema=models.PayloadSchemaType.INTEGER)
+    info = await local.get_collection("c")
+
+    assert info.payload_schema["rooms"].data_type == models.PayloadSchemaType.INTEGER
+    assert info.config.params.vectors.size == DIM
+    assert info.config.params.sparse_vectors is None
+
+  async def test_delete_collection(self, tmp_path):
+    local = LocalVectorStore(str(tmp_path))
+    await load(local, make_points(10))
+
+    assert await local.delete_collection("c")
+    assert not await local.collection_exists("c")
@@ -0,0 +1,130 @@
+"""
+service.marketing_plan_service 的 Docstring
+营销方案：提示词前缀稳定、变体并发流式生成、首 token / 总耗时统计
+"""
+import asyncio
+import re
+
+import pytest
+from langchain_core.messages import AIMessageChunk
+
+from core.models.house_info import ApartmentType, HouseModel
+from service.marketing_plan_service import SYSTEM_PROMPT, VARIANTS, MarketingPlanService, build_messages
+
+
+def make_house(title: str = "回祥小区 3室 精装") -> HouseModel:
+  return HouseModel(
+    id="1",
+    title=title,
+    apartment_type=ApartmentType(room=3, hall=2),
+    building_area=89,
+    sale_price=120,
+    remark="业主自住",
+  )
+
+
+class FakeStreamingModel:
+  """
+  每个变体输出 3 个 token，token 之间间隔 delay 秒；记录 token 到达顺序
+  和 ChatOpenAI 一样，只有 stream_usage=True 时最后才返回用量
+  """
+
+  def __init__(self, delay: float = 0.01, fail: str = ""):
+    self.delay = delay
+    self.fail = fail
+    self.running = 0
+    self.peak = 0
+    self.cancelled = 0
+
+  async def astream(self, messages, stream_usage: bool = False):
+    variant = next(k for k, v in VARIANTS.items() if v == messages[1].content)
+    self.running += 1
+    self.peak = max(self.peak, self.running)
+    try:
+      for i in range(3):
+        await asyncio.sleep(self.delay)
+        if variant == self.fail:
+          raise RuntimeError("llm down")
+        yield AIMessageChunk(content=f"{variant}-{i} ")
+      if stream_usage:
+        yield AIMessageChunk(content="", usage_metadata={
+          "input_tokens": 1200, "output_tokens": 3, "total_tokens": 1203,
+          "input_token_details": {"cache_read": 1024},
+        })
+    except asyncio.CancelledError:
+      self.cancelled += 1
+      raise
+    finally:
+      self.running -= 1
+
+
+def test_prompt_prefix_stable_across_houses():
+  a = build_messages("social_post", make_house("回祥小区 3室 精装"))
+  b = build_messages("social_post", make_house("东方花园 2室 简装"))
+
+  assert a[0].content == b[0].content == SYSTEM_PROMPT
+  assert a[1].content == b[1].content
+  # 房源信息放在最后，联系方式等字段不进入提示词
+  assert "回祥小区" in a[-1].content and "东方花园" in b[-1].content
+  assert '"id"' not in a[-1].content
+
+
+def test_prompt_prefix_long_enough_to_cache():
+  # 服务端提示词缓存要求前缀至少 1024 token，按汉字数和总字符数保守估计
+  assert len(re.findall(r"[一-鿿]", SYSTEM_PROMPT)) >= 1200
+  assert len(SYSTEM_PROMPT) >= 2048
+
+
+@pytest.mark.asyncio
+class TestMarketingPlanService:
+
+  async def test_variants_streamed_concurrently(self):
+    model = FakeStreamingModel()
+    service = MarketingPlanService(model)
+
+    events = [event async for event in service.stream(make_house())]
+
+    assert model.peak == len(VARIANTS)
+    tokens = [e["variant"] for e in events if e["event"] == "token"]
+    # 并发生成时各变体的 token 交错到达
+    assert tokens[:3] != [tokens[0]] * 3
+    done = {e["variant"]: e for e in events if e["event"] == "done"}
+    assert set(done) == set(VARIANTS)
+    for event in done.values():
+      assert 0 < event["ttft_ms"] <= event["total_ms"]
+      assert event["cached_tokens"] == 1024
+    assert events[-1]["event"] == "end"
+
+  async def test_generate_collects_text_in_requested_order(self):
+    service = MarketingPlanService(FakeStreamingModel())
+
+    plan = await service.generate(make_house(), ["short_description", "poster_headline"])
+
+    assert list(plan.variants) == ["short_description", "poster_headline"]
+    assert plan.variants["poster_headline"].text == "poster_headline-0 poster_headline-1 poster_headline-2 "
+    assert plan.total_ms >= max(v.total_ms for v in plan.variants.values())
+
+  async def test_failed_variant_reported_without_stopping_others(self):
+    service = MarketingPlanService(FakeStreamingModel(fail="poster_headline"))
+
+    plan = await service.generate(make_house())
+
+    assert plan.variants["poster_headline"].error == "llm down"
+    assert plan.variants["poster_headline"].ttft_ms is None
+    assert plan.variants["social_post"].error is None
+    assert plan.variants["social_post"].text
+
+  async def test_early_close_cancels_variants(self):
+    model = FakeStreamingModel(delay=0.05)
+    stream = MarketingPlanService(model).stream(make_house())
+
+    first = await anext(stream)
+    await stream.aclose()
+
+    assert first["event"] == "token"
+    assert model.running == 0
+    assert model.cancelled == len(VARIANTS)
+
+  async def test_unknown_variant_rejected(self):
+    with pytest.raises(ValueError):
+      await MarketingPlanService(FakeStreamingModel()).generate(make_house(), ["flyer"])
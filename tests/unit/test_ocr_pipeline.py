@@ -0,0 +1,100 @@
+"""
+core.chains.ocr_pipeline 的 Docstring
+拍照录入流水线：进程池识别、批量解析、各阶段耗时
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from core.chains.ocr_pipeline import OcrPipeline
+from infrastructure.ocr.ocr_backend import FakeOcrBackend, create_ocr_backend, recognize_image
+from service.parser_house_info import ParserHouseInfoService
+
+
+class NoLlmModel:
+  """
+  规则快速路径能完整提取的文本不应调用 LLM
+  """
+
+  def with_structured_output(self, schema):
+    def parse(prompt: str):
+      raise AssertionError(f"不应调用 LLM: {prompt}")
+
+    return RunnableLambda(parse)
+
+
+TEXTS = [
+  "3室2厅 89平 精装 朝南 售价120万",
+  "2室1厅 60平 简装 朝北 月租3000元",
+  "1室1厅 45平 毛坯 朝东 售价80万",
+]
+
+
+def test_recognize_image_fake_backend_skips_preprocess():
+  text, timings = recognize_image(FakeOcrBackend(), "回祥小区 3室".encode("utf-8"))
+
+  assert text == "回祥小区 3室"
+  assert list(timings) == ["ocr"]
+
+
+def test_create_ocr_backend():
+  assert isinstance(create_ocr_backend("fake"), FakeOcrBackend)
+  with pytest.raises(ValueError):
+    create_ocr_backend("unknown")
+
+
+def test_preprocess_deskew_and_resize():
+  Image = pytest.importorskip("PIL.Image")
+  from infrastructure.ocr import image_preprocess
+
+  image = Image.new("L", (3000, 1000), color=255)
+  resized = image_preprocess.resize(image, 1500)
+  assert max(resized.size) == 1500
+  # 空白图片没有可纠正的倾斜
+  assert image_preprocess.estimate_skew(resized) == 0
+
+
+@pytest.mark.asyncio
+class TestOcrPipeline:
+
+  async def test_run_in_process_pool_keeps_order(self):
+    executor = ProcessPoolExecutor(max_workers=2)
+    pipeline = OcrPipeline(FakeOcrBackend(), ParserHouseInfoService(NoLlmModel()), executor=executor)
+    try:
+      results = await pipeline.run([t.encode("utf-8") for t in TEXTS])
+    finally:
+      pipeline.close()
+      executor.shutdown()
+
+    assert [r.text for r in results] == TEXTS
+    assert [r.house.room for r in results] == [3, 2, 1]
+    assert results[0].house.sale_price == 1_200_000
+    assert results[1].house.rent_price == 3000
+    for r in results:
+      assert {"ocr", "parse", "total"} <= set(r.timings)
+      assert r.timings["total"] >= r.timings["parse"]
+
+  async def test_close_shuts_down_owned_executor(self):
+    pipeline = OcrPipeline(FakeOcrBackend(), ParserHouseInfoService(NoLlmModel()), max_workers=1)
+    results = await pipeline.run([TEXTS[0].encode("utf-8")])
+    assert results[0].house.building_area == 89
+
+    pipeline.close()
+    assert pipeline._executor is None
+
+  async def test_bad_image_fails_only_its_item(self):
+    executor = ProcessPoolExecutor(max_workers=2)
+    pipeline = OcrPipeline(FakeOcrBackend(), ParserHouseInfoService(NoLlmModel()), executor=executor)
+    try:
+      # 非 UTF-8 字节在 FakeOcrBackend 中解码失败，相当于无法识别的图片
+      results = await pipeline.run([TEXTS[0].encode("utf-8"), b"\xff\xfe", TEXTS[2].encode("utf-8")])
+    finally:
+      pipeline.close()
+      executor.shutdown()
+
+    assert [r.error is None for r in results] == [True, False, True]
+    assert results[1].house is None and results[1].text == ""
+    assert "utf-8" in results[1].error
+    assert [r.house.room for r in (results[0], results[2])] == [3, 1]
+    assert results[2].house.sale_price == 800_000
@@ -0,0 +1,201 @@
+"""
+service.parser_house_info 的 Docstring
+房源文本解析服务：runnable 只构建一次、异步调用、批量并发上限、结果缓存
+"""
+import asyncio
+import re
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from infrastructure.cache.backend import MemoryCacheBackend
+from service.parser_house_info import HouseModel, ParserHouseInfoService
+
+
+def make_house(text: str) -> HouseModel:
+  fields = {name: None for name in HouseModel.model_fields}
+  fields["remark"] = text
+  return HouseModel(**fields)
+
+
+class FakeModel:
+  """
+  with_structured_output 返回真实的 RunnableLambda，abatch 的并发控制走 langchain 自身逻辑
+  """
+
+  def __init__(self, delay: float = 0.01):
+    self.delay = delay
+    self.structured_calls = 0
+    self.prompts = []
+    self.running = 0
+    self.peak = 0
+
+  def with_structured_output(self, schema):
+    self.structured_calls += 1
+
+    async def parse(prompt: str) -> HouseModel:
+      self.prompts.append(prompt)
+      self.running += 1
+      self.peak = max(self.peak, self.running)
+      await asyncio.sleep(self.delay)
+      self.running -= 1
+      return make_house(prompt.removeprefix("从文本中提取信息：").split("\n")[0])
+
+    return RunnableLambda(parse)
+
+
+@pytest.mark.asyncio
+class TestParserHouseInfoService:
+
+  async def test_structured_model_built_once(self):
+    model = FakeModel()
+    service = ParserHouseInfoService(model, fast_path=False)
+
+    a = await service.parse_house_info("回祥小区 3室")
+    b = await service.parse_house_info("东方花园 2室")
+
+    assert model.structured_calls == 1
+    assert (a.remark, b.remark) == ("回祥小区 3室", "东方花园 2室")
+
+  async def test_cache_by_normalized_text(self):
+    model = FakeModel()
+    service = ParserHouseInfoService(model, cache=MemoryCacheBackend())
+
+    first = await service.parse_house_info("回祥小区 3室")
+    again = await service.parse_house_info("  回祥小区   3室 ")
+
+    assert again == first
+    assert len(model.prompts) == 1
+    assert service.stats() == {"calls": 1, "cache_hits": 1, "fast_path_hits": 0}
+
+  async def test_batch_bounded_concurrency_and_order(self):
+    model = FakeModel(delay=0.02)
+    service = ParserHouseInfoService(model, cache=MemoryCacheBackend(), max_concurrency=3)
+    await service.parse_house_info("小区 0 业主自住")
+    texts = [f"小区 {i} 业主自住" for i in range(10)] + ["小区 1 业主自住"]
+
+    results = await service.parse_house_infos(texts)
+
+    assert [r.remark for r in results] == texts
+    # 命中缓存 1 条、重复 1 条，其余 9 条最多 3 个同时请求
+    assert len(model.prompts) == 10
+    assert model.peak == 3
+
+  async def test_batch_runs_concurrently(self):
+    model = FakeModel(delay=0.05)
+    service = ParserHouseInfoService(model, max_concurrency=8)
+
+    started = asyncio.get_running_loop().time()
+    await service.parse_house_infos([f"小区 {i} 业主自住" for i in range(8)])
+
+    assert asyncio.get_running_loop().time() - started < 0.05 * 4
+
+  async def test_fast_path_skips_llm(self):
+    model = FakeModel()
+    service = ParserHouseInfoService(model, cache=MemoryCacheBackend())
+    text = "出租 3室1厅2卫 130平方 1500/月 押一付三 朝南 精装 电话 13800001234"
+
+    res = await service.parse_house_info(text)
+    batch = await service.parse_house_infos([text + " 图片 https://a.com/1.jpg"])
+
+    assert model.prompts == []
+    assert (res.room, res.hall, res.bathroom) == (3, 1, 2)
+    assert (res.building_area, res.rent_price, res.payment_method) == (130, 1500, "押一付三")
+    assert (res.house_orientation, res.phone, res.transaction_type) == ("南", "13800001234", "出租")
+    assert res.community_name is None
+    assert batch[0].images[0].url == "https://a.com/1.jpg"
+    assert service.stats()["fast_path_hits"] == 2
+
+  async def test_residual_fields_go_to_llm(self):
+    class ResidualModel(FakeModel):
+      def with_structured_output(self, schema):
+        self.schema = schema
+
+        async def parse(prompt: str):
+          self.prompts.append(prompt)
+          # LLM 返回的户型与规则不一致时，以规则为准
+          values = {name: None for name in schema.model_fields}
+          values["community_name"] = "回祥小区"
+          return schema(**values)
+
+        return RunnableLambda(parse)
+
+    model = ResidualModel()
+    service = ParserHouseInfoService(model)
+
+    res = await service.parse_house_info("回祥小区 两室一厅 89平 售价120万")
+
+    assert set(model.schema.model_fields).isdisjoint({"room", "hall", "building_area", "sale_price"})
+    assert '"room":2' in model.prompts[0]
+    assert (res.community_name, res.room, res.sale_price, res.transaction_type) == ("回祥小区", 2, 1_200_000, "出售")
+
+  async def test_cache_key_keeps_case(self):
+    model = FakeModel()
+    service = ParserHouseInfoService(model, cache=MemoryCacheBackend(), fast_path=False)
+
+    await service.parse_house_info("Vanke Park 3室")
+    await service.parse_house_info("VANKE PARK 3室")
+
+    assert len(model.prompts) == 2
+
+  async def test_structured_models_bounded(self):
+    service = ParserHouseInfoService(FakeModel())
+    fields = list(HouseModel.model_fields)
+    # 去掉任意两个字段得到的不同剩余字段集合
+    residuals = [
+      tuple(f for k, f in enumerate(fields) if k not in (i, j))
+      for i in range(len(fields)) for j in range(i + 1, len(fields))
+    ][:100]
+
+    for residual in residuals:
+      service._structured(residual)
+
+    info = service._structured.cache_info()
+    assert info.currsize == info.maxsize < len(residuals)
+
+  async def test_batch_item_failure_isolated(self):
+    class FlakyModel(FakeModel):
+      def with_structured_output(self, schema):
+        parse = super().with_structured_output(schema)
+
+        async def flaky(prompt: str):
+          if "坏" in prompt:
+            raise RuntimeError("llm down")
+          return await parse.ainvoke(prompt)
+
+        return RunnableLambda(flaky)
+
+    service = ParserHouseInfoService(FlakyModel(), cache=MemoryCacheBackend())
+    texts = ["小区 1 业主自住", "坏小区 3室 业主自住", "小区 2 业主自住"]
+
+    results = await service.parse_house_infos(texts)
+
+    assert [r.remark for r in results] == ["小区 1 业主自住", None, "小区 2 业主自住"]
+    # 失败的一条保留规则提取的字段，且不写缓存
+    assert results[1].room == 3
+    assert await service._cached(service._cache_key(texts[1])) is None
+
+  async def test_sale_price_unit_same_on_both_paths(self):
+    class UnitModel(FakeModel):
+      """
+      按 schema 描述和提示词中声明的单位换算金额，模拟遵循指令的 LLM
+      """
+
+      def with_structured_output(self, schema):
+        async def parse(prompt: str):
+          self.prompts.append(prompt)
+          values = {name: None for name in schema.model_fields}
+          values["community_name"] = "回祥小区"
+          if "sale_price" in schema.model_fields:
+            in_yuan = "单位：元" in schema.model_fields["sale_price"].description and "以元为单位" in prompt
+            wan = float(re.search(r"(\d+)万", prompt).group(1))
+            values["sale_price"] = wan * 10_000 if in_yuan else wan
+          return schema(**values)
+
+        return RunnableLambda(parse)
+
+    text = "回祥小区 两室一厅 89平 售价120万"
+    fast = await ParserHouseInfoService(UnitModel()).parse_house_info(text)
+    llm = await ParserHouseInfoService(UnitModel(), fast_path=False).parse_house_info(text)
+
+    assert fast.sale_price == llm.sale_price == 1_200_000
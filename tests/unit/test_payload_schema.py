@@ -0,0 +1,108 @@
+"""
+infrastructure.vectorstore.payload_schema 的 Docstring
+payload 索引推导与幂等创建
+"""
+from typing import List, Optional
+
+import pytest
+from pydantic import BaseModel
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http import models
+
+from core.nodes.vectorstore_node import HOUSE_COLLECTION, HOUSE_PAYLOAD_SCHEMA, ensure_house_collection
+from infrastructure.vectorstore.payload_schema import PayloadSchemaManager, derive_payload_schema
+
+
+class IndexRecordingClient(AsyncQdrantClient):
+  """
+  本地模式不支持 payload 索引，这里记录 create_payload_index 调用并在 get_collection 中回显
+  """
+
+  def __init__(self):
+    super().__init__(location=":memory:")
+    self.indexes: dict[str, models.PayloadSchemaType] = {}
+    self.create_calls: List[str] = []
+
+  async def create_payload_index(self, collection_name, field_name, field_schema=None, **kwargs):
+    self.create_calls.append(field_name)
+    self.indexes[field_name] = field_schema
+    return models.UpdateResult(operation_id=0, status=models.UpdateStatus.COMPLETED)
+
+  async def get_collection(self, collection_name, **kwargs):
+    info = await super().get_collection(collection_name, **kwargs)
+    info.payload_schema = {
+      field: models.PayloadIndexInfo(data_type=schema_type, points=0)
+      for field, schema_type in self.indexes.items()
+    }
+    return info
+
+
+class Sample(BaseModel):
+  count: Optional[int] = None
+  score: float | None = None
+  flag: bool = False
+  name: Optional[str] = None
+  tags: Optional[List[str]] = None
+  nested: Optional[dict] = None
+
+
+def test_derive_payload_schema():
+  schema = derive_payload_schema(Sample, ["count", "score", "flag", "name", "tags"])
+
+  assert schema == {
+    "count": models.PayloadSchemaType.INTEGER,
+    "score": models.PayloadSchemaType.FLOAT,
+    "flag": models.PayloadSchemaType.BOOL,
+    "name": models.PayloadSchemaType.KEYWORD,
+    "tags": models.PayloadSchemaType.KEYWORD,
+  }
+
+
+def test_derive_rejects_unknown_fields():
+  with pytest.raises(AssertionError):
+    derive_payload_schema(Sample, ["missing"])
+  with pytest.raises(AssertionError):
+    derive_payload_schema(Sample, ["nested"])
+
+
+def test_house_schema():
+  assert HOUSE_PAYLOAD_SCHEMA["rooms"] == models.PayloadSchemaType.INTEGER
+  assert HOUSE_PAYLOAD_SCHEMA["price"] == models.PayloadSchemaType.FLOAT
+  assert HOUSE_PAYLOAD_SCHEMA["orientation"] == models.PayloadSchemaType.KEYWORD
+  assert HOUSE_PAYLOAD_SCHEMA["has_elevator"] == models.PayloadSchemaType.BOOL
+  assert HOUSE_PAYLOAD_SCHEMA["community_id"] == models.PayloadSchemaType.KEYWORD
+
+
+@pytest.mark.asyncio
+class TestPayloadSchemaManager:
+
+  async def test_ensure_indexes_is_idempotent(self):
+    client = IndexRecordingClient()
+    await client.create_collection("c", vectors_config=models.VectorParams(size=2, distance=models.Distance.COSINE))
+    manager = PayloadSchemaManager(client, "c", {"rooms": models.PayloadSchemaType.INTEGER, "name": models.PayloadSchemaType.KEYWORD})
+
+    assert [s["status"] for s in await manager.status()] == ["missing", "missing"]
+    assert await manager.ensure_indexes() == ["rooms", "name"]
+    assert await manager.ensure_indexes() == []
+    assert client.create_calls == ["rooms", "name"]
+    assert [s["status"] for s in await manager.status()] == ["ok", "ok"]
+
+  async def test_type_mismatch_is_reported_not_recreated(self):
+    client = IndexRecordingClient()
+    await client.create_collection("c", vectors_config=models.VectorParams(size=2, distance=models.Distance.COSINE))
+    client.indexes["rooms"] = models.PayloadSchemaType.KEYWORD
+    manager = PayloadSchemaManager(client, "c", {"rooms": models.PayloadSchemaType.INTEGER})
+
+    assert await manager.ensure_indexes() == []
+    status = (await manager.status())[0]
+    assert status["status"] == "type_mismatch"
+    assert status["actual"] == "keyword"
+
+  async def test_collection_created_with_house_indexes(self):
+    client = IndexRecordingClient()
+
+    await ensure_house_collection(client, vector_size=2)
+    await ensure_house_collection(client, vector_size=2)
+
+    assert sorted(client.create_calls) == sorted(HOUSE_PAYLOAD_SCHEMA)
+    assert await client.collection_exists(HOUSE_COLLECTION)
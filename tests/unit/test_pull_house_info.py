@@ -0,0 +1,111 @@
+"""
+service.pull_house_info 的 Docstring
+房源接口分页：并发预取、按页码顺序产出
+"""
+
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from service.pull_house_info import PullHouseInfoService
+
+URL = "http://house-api.local/api/domus/query/house/list"
+
+
+class MockHouseServer:
+  """本地模拟房源接口，记录并发数"""
+
+  def __init__(self, total: int, delay: float = 0.01, null_pages: tuple = ()):
+    self.total = total
+    self.delay = delay
+    # 这些页返回 data: null
+    self.null_pages = null_pages
+    self.in_flight = 0
+    self.peak = 0
+    self.pages: list[int] = []
+
+  async def handler(self, request: httpx.Request) -> httpx.Response:
+    form = {k: v[0] for k, v in parse_qs(request.content.decode()).items()}
+    page, page_size = int(form["page"]), int(form["page_size"])
+    self.pages.append(page)
+
+    self.in_flight += 1
+    self.peak = max(self.peak, self.in_flight)
+    # 后面的页先返回，验证产出顺序
+    await asyncio.sleep(self.delay * (10 - page % 10))
+    self.in_flight -= 1
+
+    ids = range((page - 1) * page_size, min(page * page_size, self.total))
+    body = {"code": 200, "msg": "success", "data": {"list": [{"id": str(i)} for i in ids], "total": self.total}}
+    if page in self.null_pages:
+      body["data"] = None
+    return httpx.Response(200, content=json.dumps(body))
+
+
+@pytest.mark.asyncio
+class TestPullHouseInfoService:
+
+  async def test_fetch_uses_page_arguments(self):
+    server = MockHouseServer(total=25)
+    client = httpx.AsyncClient(transport=httpx.MockTransport(server.handler))
+    service = PullHouseInfoService(client=client, url=URL)
+
+    response = await service.fetch_house_data(None, 3, 10)
+
+    assert server.pages == [3]
+    assert [h.id for h in response.data.list] == [str(i) for i in range(20, 25)]
+    assert response.data.total == 25
+
+  async def test_iter_pages_concurrent_in_order(self):
+    server = MockHouseServer(total=95)
+    client = httpx.AsyncClient(transport=httpx.MockTransport(server.handler))
+    service = PullHouseInfoService(client=client, url=URL, concurrency=3)
+
+    ids = []
+    async for houses in service.iter_pages(None, 10):
+      ids.extend(h.id for h in houses)
+
+    assert ids == [str(i) for i in range(95)]
+    assert sorted(server.pages) == list(range(1, 11))
+    assert 1 < server.peak <= 3
+
+  async def test_iter_pages_single_page(self):
+    server = MockHouseServer(total=4)
+    client = httpx.AsyncClient(transport=httpx.MockTransport(server.handler))
+    service = PullHouseInfoService(client=client, url=URL)
+
+    pages = [houses async for houses in service.iter_pages(None, 10)]
+
+    assert len(pages) == 1
+    assert server.pages == [1]
+
+  async def test_iter_pages_empty_data(self):
+    server = MockHouseServer(total=95, null_pages=(1,))
+    client = httpx.AsyncClient(transport=httpx.MockTransport(server.handler))
+    service = PullHouseInfoService(client=client, url=URL)
+
+    pages = [houses async for houses in service.iter_pages(None, 10)]
+
+    assert pages == [[]]
+    assert server.pages == [1]
+
+  async def test_iter_pages_prefetched_empty_data_stops(self):
+    server = MockHouseServer(total=95, null_pages=(3,))
+    client = httpx.AsyncClient(transport=httpx.MockTransport(server.handler))
+    service = PullHouseInfoService(client=client, url=URL, concurrency=2)
+
+    ids = []
+    async for houses in service.iter_pages(None, 10):
+      ids.extend(h.id for h in houses)
+
+    assert ids == [str(i) for i in range(20)]
+
+  async def test_error_status_raises(self):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(500, text="boom")))
+    service = PullHouseInfoService(client=client, url=URL)
+
+    with pytest.raises(Exception):
+      await service.fetch_house_data(None, 1, 10)
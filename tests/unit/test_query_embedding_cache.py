@@ -0,0 +1,84 @@
+"""
+infrastructure.cache.query_embedding_cache 的 Docstring
+查询向量缓存：归一化 + LRU/TTL
+"""
+
+import asyncio
+
+import pytest
+from langchain_core.runnables import RunnableConfig
+
+from core.nodes.embedding_node import embedding_batch_node, embedding_node
+from infrastructure.ai.embedding_provider import HashingEmbeddingProvider
+from infrastructure.cache.backend import MemoryCacheBackend, create_cache_backend
+from infrastructure.cache.query_embedding_cache import QueryEmbeddingCache, normalize_query
+
+
+class CountingProvider(HashingEmbeddingProvider):
+  def __init__(self):
+    super().__init__(dimensions=8)
+    self.embedded: list[str] = []
+
+  async def embed(self, texts):
+    self.embedded.extend(texts)
+    return await super().embed(texts)
+
+
+def test_normalize_query():
+  assert normalize_query("  回祥　２室  ") == "回祥 2室"
+  assert normalize_query("ＡＢＣ\t学区房") == "abc 学区房"
+
+
+@pytest.mark.asyncio
+class TestMemoryCacheBackend:
+
+  async def test_lru_eviction(self):
+    backend = MemoryCacheBackend(max_size=2)
+    await backend.set("a", 1)
+    await backend.set("b", 2)
+    await backend.get("a")
+    await backend.set("c", 3)
+
+    assert await backend.get("a") == 1
+    assert await backend.get("b") is None
+    assert await backend.get("c") == 3
+
+  async def test_ttl_expiry(self):
+    backend = MemoryCacheBackend(ttl=0.01)
+    await backend.set("a", 1)
+    assert await backend.get("a") == 1
+
+    await asyncio.sleep(0.02)
+    assert await backend.get("a") is None
+    assert len(backend) == 0
+
+  async def test_unknown_backend(self):
+    with pytest.raises(ValueError):
+      create_cache_backend("memcached", namespace="x")
+
+
+@pytest.mark.asyncio
+class TestEmbeddingNodeCache:
+
+  async def test_normalized_queries_share_cache(self):
+    provider = CountingProvider()
+    cache = QueryEmbeddingCache(MemoryCacheBackend(), model=provider.model)
+    config = RunnableConfig({"configurable": {"embedding": provider, "query_embedding_cache": cache}})
+
+    first = await embedding_node("回祥 ２室", config)
+    second = await embedding_node("  回祥   2室 ", config)
+
+    assert first == second
+    # 归一化结果只作为缓存 key，送去 embedding 的是原始查询
+    assert provider.embedded == ["回祥 ２室"]
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+  async def test_cache_does_not_change_vectors(self):
+    provider = CountingProvider()
+    cache = QueryEmbeddingCache(MemoryCacheBackend(), model=provider.model)
+    cached = RunnableConfig({"configurable": {"embedding": provider, "query_embedding_cache": cache}})
+    uncached = RunnableConfig({"configurable": {"embedding": provider}})
+
+    for query in ["回祥 ２室", "ABC 学区房"]:
+      assert await embedding_node(query, cached) == await embedding_node(query, uncached)
+      assert (await embedding_batch_node([query], cached))[0] == (await embedding_batch_node([query], uncached))[0]
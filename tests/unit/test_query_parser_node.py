@@ -0,0 +1,87 @@
+"""
+core.nodes.query_parser_node 的 Docstring
+自然语言查询 -> Qdrant payload Filter
+"""
+
+import pytest
+from qdrant_client.http import models
+
+from core.nodes.query_parser_node import parse_query
+
+
+def conditions_by_key(parsed):
+  return {c.key: c for c in parsed.filter.must}
+
+
+@pytest.mark.parametrize("text, expected", [
+  ("3室以上 100平 200万以内", {
+    "rooms": {"gte": 3},
+    "area": {"gte": 90.0, "lte": 110.0},
+    "price": {"lte": 2000000.0},
+  }),
+  ("两居 朝南 近地铁 有电梯", {
+    "rooms": {"eq": 2},
+    "has_elevator": True,
+    "near_metro": True,
+    "orientation": ["南北", "东南", "西南", "南"],
+  }),
+  ("学区房 80-120平米 南北通透", {
+    "area": {"gte": 80.0, "lte": 120.0},
+    "orientation": ["南北"],
+  }),
+  ("至少3室 150万到200万 无电梯", {
+    "rooms": {"gte": 3},
+    "price": {"gte": 1500000.0, "lte": 2000000.0},
+    "has_elevator": False,
+  }),
+  ("1500/月 2室", {
+    "rooms": {"eq": 2},
+    "price": {"gte": 1350.0, "lte": 1650.0},
+  }),
+])
+def test_parse_conditions(text, expected):
+  assert parse_query(text).conditions == expected
+
+
+def test_semantic_remainder():
+  parsed = parse_query("回祥 3室以上 精装 有电梯")
+
+  assert parsed.semantic_text == "回祥 精装"
+
+
+def test_only_structured_keeps_original_for_embedding():
+  parsed = parse_query("3室 100平")
+
+  assert parsed.semantic_text == "3室 100平"
+  assert parsed.filter is not None
+
+
+def test_no_conditions():
+  parsed = parse_query("东方花园 学区房")
+
+  assert parsed.filter is None
+  assert parsed.semantic_text == "东方花园 学区房"
+
+
+def test_filter_shapes():
+  parsed = parse_query("2-3室 200万以内 近地铁")
+  fields = conditions_by_key(parsed)
+
+  assert fields["rooms"].range == models.Range(gte=2, lte=3)
+  assert fields["price"].range == models.Range(lte=2000000.0)
+  assert fields["near_metro"].match == models.MatchValue(value=True)
+
+
+def test_chinese_numerals():
+  assert parse_query("三房").conditions == {"rooms": {"eq": 3}}
+  assert parse_query("十二万以内").conditions == {"price": {"lte": 120000.0}}
+
+
+def test_down_payment_not_price_filter():
+  parsed = parse_query("首付30万 两室")
+
+  assert parsed.conditions == {"rooms": {"eq": 2}}
+  assert "首付30万" in parsed.semantic_text
+  # 首付之外的总价照常解析
+  assert parse_query("首付30万 总价200万以内").conditions == {"price": {"lte": 2000000.0}}
+  assert parse_query("单价2万 月供5000元 100平").conditions == {"area": {"gte": 90.0, "lte": 110.0}}
@@ -0,0 +1,114 @@
+"""
+core.nodes.rerank_node 的 Docstring
+LLM 重排序：一次调用、超时降级、缓存
+"""
+import asyncio
+
+import pytest
+from qdrant_client.http import models
+
+from core.nodes.rerank_node import RerankNode, RerankResult, RerankScore, summarize
+from infrastructure.cache.backend import MemoryCacheBackend
+
+
+class FakeStructuredModel:
+  def __init__(self, scores=None, delay: float = 0, error: Exception = None):
+    self.scores = scores
+    self.delay = delay
+    self.error = error
+    self.prompts = []
+
+  async def ainvoke(self, prompt):
+    self.prompts.append(prompt)
+    await asyncio.sleep(self.delay)
+    if self.error:
+      raise self.error
+    return RerankResult(scores=[RerankScore(index=i, score=s) for i, s in self.scores.items()])
+
+
+class FakeChatModel:
+  def __init__(self, structured: FakeStructuredModel):
+    self.structured = structured
+
+  def with_structured_output(self, schema):
+    assert schema is RerankResult
+    return self.structured
+
+
+def make_points(n: int) -> list[models.ScoredPoint]:
+  return [
+    models.ScoredPoint(id=i, version=0, score=1 - i / 100, payload={"title": f"房源{i}", "rooms": 2, "area": 88.5, "tags": ["学区房"]})
+    for i in range(n)
+  ]
+
+
+def test_summarize():
+  point = make_points(1)[0]
+
+  assert summarize(point) == "房源0 | 2室 | 88.5平 | 学区房"
+  assert len(summarize(point, max_chars=5)) == 5
+
+
+@pytest.mark.asyncio
+class TestRerankNode:
+
+  async def test_one_call_reorders_top_n(self):
+    structured = FakeStructuredModel({0: 1, 1: 9, 2: 5})
+    reranker = RerankNode(FakeChatModel(structured), top_n=3)
+
+    points, reranked = await reranker.rerank("回祥 2室", make_points(5))
+
+    assert reranked
+    assert [p.id for p in points] == [1, 2, 0, 3, 4]
+    assert len(structured.prompts) == 1
+    assert "[2] 房源2" in structured.prompts[0]
+    assert "房源3" not in structured.prompts[0]
+
+  async def test_unscored_candidates_keep_vector_order(self):
+    reranker = RerankNode(FakeChatModel(FakeStructuredModel({3: 8, 99: 10})), top_n=5)
+
+    points, _ = await reranker.rerank("q", make_points(5))
+
+    assert [p.id for p in points] == [3, 0, 1, 2, 4]
+
+  async def test_timeout_falls_back_to_vector_order(self):
+    reranker = RerankNode(FakeChatModel(FakeStructuredModel({0: 1, 1: 9}, delay=0.2)), top_n=3, timeout=0.01)
+    original = make_points(3)
+
+    points, reranked = await reranker.rerank("q", original)
+
+    assert not reranked
+    assert points == original
+    assert reranker.stats()["timeouts"] == 1
+    assert reranker.stats()["p95_ms"] < 200
+
+  async def test_error_falls_back(self):
+    reranker = RerankNode(FakeChatModel(FakeStructuredModel(error=RuntimeError("boom"))))
+
+    points, reranked = await reranker.rerank("q", make_points(3))
+
+    assert not reranked
+    assert [p.id for p in points] == [0, 1, 2]
+    assert reranker.stats()["errors"] == 1
+
+  async def test_cache_by_query_and_candidates(self):
+    structured = FakeStructuredModel({0: 1, 1: 9})
+    reranker = RerankNode(FakeChatModel(structured), top_n=2, cache=MemoryCacheBackend())
+
+    first, _ = await reranker.rerank("回祥  2室", make_points(2))
+    second, _ = await reranker.rerank("回祥 2室", make_points(2))
+    # 候选集合变化后重新打分
+    await reranker.rerank("回祥 2室", make_points(3)[1:])
+
+    assert [p.id for p in second] == [p.id for p in first] == [1, 0]
+    assert len(structured.prompts) == 2
+    assert reranker.stats()["cache_hits"] == 1
+
+  async def test_single_candidate_skips_call(self):
+    structured = FakeStructuredModel({})
+    reranker = RerankNode(FakeChatModel(structured))
+
+    points, reranked = await reranker.rerank("q", make_points(1))
+
+    assert reranked
+    assert structured.prompts == []
@@ -0,0 +1,33 @@
+"""
+infrastructure.cache.search_result_cache 的 Docstring
+检索结果缓存：按索引代数失效
+"""
+
+import pytest
+
+from infrastructure.cache.backend import MemoryCacheBackend
+from infrastructure.cache.search_result_cache import IndexGeneration, SearchResultCache
+
+
+@pytest.mark.asyncio
+class TestSearchResultCache:
+
+  async def test_key_normalizes_query(self):
+    cache = SearchResultCache(MemoryCacheBackend(), IndexGeneration())
+
+    assert cache.make_key("回祥　２室", limit=10) == cache.make_key(" 回祥 2室 ", limit=10)
+    assert cache.make_key("回祥 2室", limit=10) != cache.make_key("回祥 2室", limit=20)
+    assert cache.make_key("回祥", filters={"rooms": 2}) != cache.make_key("回祥", filters={"rooms": 3})
+
+  async def test_generation_bump_invalidates(self):
+    generation = IndexGeneration()
+    cache = SearchResultCache(MemoryCacheBackend(), generation)
+
+    key = cache.make_key("学区房")
+    await cache.set(key, {"points": []})
+    assert await cache.get(cache.make_key("学区房")) == {"points": []}
+
+    generation.bump()
+    assert await cache.get(cache.make_key("学区房")) is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
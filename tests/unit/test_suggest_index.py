@@ -0,0 +1,126 @@
+"""
+infrastructure.suggest.suggest_index 的 Docstring
+输入提示前缀树：增量更新、热度排序、从向量库重建
+"""
+import time
+
+import pytest
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http import models
+
+from infrastructure.suggest import suggest_index as module
+from infrastructure.suggest.suggest_index import SuggestIndex, load_suggest_index, suggest_terms
+
+
+def texts(results):
+  return [r["text"] for r in results]
+
+
+def test_suggest_terms():
+  terms = suggest_terms({"title": "回祥小区  3室 精装", "tags": ["近地铁", "回祥小区"]})
+
+  assert terms == {"回祥小区 3室 精装": "title", "回祥小区": "community", "近地铁": "tag"}
+  assert suggest_terms({"title": None, "tags": None}) == {}
+
+
+def test_prefix_ranked_by_popularity():
+  index = SuggestIndex(pinyin=False)
+  index.update("1", {"title": "回祥小区 3室 精装", "tags": ["近地铁"]})
+  index.update("2", {"title": "回祥小区 2室 简装", "tags": ["近地铁"]})
+  index.update("3", {"title": "回龙观 1室", "tags": ["学区房"]})
+
+  assert texts(index.suggest("回"))[:2] == ["回祥小区", "回龙观"]
+  assert texts(index.suggest("回祥"))[0] == "回祥小区"
+  assert index.suggest("回祥")[0] == {"text": "回祥小区", "kind": "community", "score": 2}
+  assert texts(index.suggest("近")) == ["近地铁"]
+  assert index.suggest("不存在") == []
+  assert index.suggest("  ") == []
+  assert len(index.suggest("回", limit=1)) == 1
+
+  # 搜索热度
+  for _ in range(3):
+    index.record("回龙观")
+  assert texts(index.suggest("回"))[0] == "回龙观"
+
+
+def test_incremental_update_and_remove():
+  index = SuggestIndex(pinyin=False)
+  index.update("1", {"title": "回祥小区 3室", "tags": ["近地铁"]})
+  index.update("2", {"title": "回祥小区 2室", "tags": ["近地铁"]})
+  assert index.suggest("近")[0]["score"] == 2
+
+  # 标签变化：旧词扣减，新词加入
+  index.update("1", {"title": "回祥小区 3室", "tags": ["学区房"]})
+  assert index.suggest("近")[0]["score"] == 1
+  assert texts(index.suggest("学")) == ["学区房"]
+
+  index.remove("2")
+  assert index.suggest("近") == []
+  assert texts(index.suggest("回祥")) == ["回祥小区", "回祥小区 3室"]
+  index.remove("1")
+  assert len(index) == 0
+  assert index._root.children == {}
+
+
+def test_top_k_cache_is_invalidated():
+  index = SuggestIndex(top_k=2, pinyin=False)
+  for i in range(5):
+    index.update(str(i), {"title": f"小区{i}"})
+  assert len(index.suggest("小区")) == 2
+
+  for i in range(3):
+    index.update(f"x{i}", {"title": "小区4"})
+  assert texts(index.suggest("小"))[0] == "小区4"
+
+
+def test_lookup_is_fast():
+  index = SuggestIndex(pinyin=False)
+  for i in range(20_000):
+    index.update(str(i), {"title": f"小区{i % 2000} {i % 4 + 1}室", "tags": [f"标签{i % 50}"]})
+  index.suggest("小")
+
+  started = time.perf_counter()
+  for _ in range(1000):
+    index.suggest("小区1")
+  assert (time.perf_counter() - started) / 1000 < 1e-3
+
+
+@pytest.mark.skipif(module.lazy_pinyin is None, reason="未安装 pypinyin")
+def test_pinyin_keys():
+  index = SuggestIndex()
+  index.update("1", {"title": "回祥小区 3室"})
+  index.update("2", {"title": "东方花园 2室"})
+
+  assert index.stats()["pinyin"] is True
+  # 全拼和拼音首字母的任意前缀都能命中
+  assert texts(index.suggest("huixiangxiaoqu")) == ["回祥小区", "回祥小区 3室"]
+  assert texts(index.suggest("huixiang"))[0] == "回祥小区"
+  assert texts(index.suggest("hxxq")) == ["回祥小区", "回祥小区 3室"]
+  assert texts(index.suggest("hx"))[0] == "回祥小区"
+  assert texts(index.suggest("dfhy")) == ["东方花园", "东方花园 2室"]
+  assert texts(index.suggest("df")) == ["东方花园", "东方花园 2室"]
+
+
+def test_pinyin_disabled_without_package(monkeypatch):
+  monkeypatch.setattr(module, "lazy_pinyin", None)
+  index = SuggestIndex(pinyin=True)
+
+  assert index.stats()["pinyin"] is False
+
+
+@pytest.mark.asyncio
+class TestLoadSuggestIndex:
+
+  async def test_load_from_vectorstore(self):
+    client = AsyncQdrantClient(location=":memory:")
+    await client.create_collection("c", vectors_config=models.VectorParams(size=2, distance=models.Distance.COSINE))
+    await client.upsert("c", points=[
+      models.PointStruct(id=i, vector=[1.0, 0.5], payload={"title": f"回祥小区 {i}室", "tags": ["近地铁"], "price": i})
+      for i in range(25)
+    ])
+    index = SuggestIndex(pinyin=False)
+
+    loaded = await load_suggest_index(index, client, "c", batch_size=10)
+
+    assert loaded == 25
+    assert index.suggest("回祥")[0] == {"text": "回祥小区", "kind": "community", "score": 25}
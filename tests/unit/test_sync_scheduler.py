@@ -0,0 +1,104 @@
+"""
+app.sync_scheduler 的 Docstring
+单飞同步调度：不重叠、手动触发、运行历史、干净退出
+"""
+
+import asyncio
+
+import pytest
+
+from app.sync_scheduler import SyncScheduler
+
+
+class FakeSync:
+  def __init__(self, duration: float = 0.0, fail: bool = False):
+    self.duration = duration
+    self.fail = fail
+    self.calls = 0
+    self.in_flight = 0
+    self.peak = 0
+
+  async def __call__(self):
+    self.calls += 1
+    self.in_flight += 1
+    self.peak = max(self.peak, self.in_flight)
+    try:
+      await asyncio.sleep(self.duration)
+      if self.fail:
+        raise RuntimeError("拉取失败")
+      return {"produced": 3, "writer": {"upserted": 2, "deleted": 1}}
+    finally:
+      self.in_flight -= 1
+
+
+@pytest.mark.asyncio
+class TestSyncScheduler:
+
+  async def test_runs_never_overlap(self):
+    sync = FakeSync(duration=0.02)
+    scheduler = SyncScheduler(sync, interval=0.001)
+
+    scheduler.start()
+    for _ in range(10):
+      scheduler.trigger()
+      await asyncio.sleep(0.005)
+    await scheduler.stop()
+
+    assert sync.peak == 1
+    assert sync.calls >= 2
+
+  async def test_manual_trigger_and_history(self):
+    sync = FakeSync()
+    scheduler = SyncScheduler(sync, interval=60)
+
+    scheduler.start()
+    await asyncio.sleep(0.01)
+    scheduler.trigger()
+    await asyncio.sleep(0.01)
+    await scheduler.stop()
+
+    history = scheduler.history()
+    assert [run.trigger for run in history] == ["manual", "interval"]
+    assert all(run.status == "ok" for run in history)
+    assert history[0].fetched == 3
+    assert history[0].upserted == 2
+    assert history[0].deleted == 1
+    assert history[0].duration is not None
+
+  async def test_triggers_during_run_coalesce(self):
+    sync = FakeSync(duration=0.05)
+    scheduler = SyncScheduler(sync, interval=60)
+
+    scheduler.start()
+    await asyncio.sleep(0.01)
+    assert scheduler.trigger() is True
+    assert scheduler.trigger() is True
+    await asyncio.sleep(0.15)
+    await scheduler.stop()
+
+    assert sync.calls == 2
+
+  async def test_error_recorded_and_loop_continues(self):
+    sync = FakeSync(fail=True)
+    scheduler = SyncScheduler(sync, interval=0.01)
+
+    scheduler.start()
+    await asyncio.sleep(0.05)
+    await scheduler.stop()
+
+    history = scheduler.history()
+    assert len(history) >= 2
+    assert history[-1].status == "error"
+    assert history[-1].error == "拉取失败"
+
+  async def test_stop_cancels_running_sync(self):
+    sync = FakeSync(duration=10)
+    scheduler = SyncScheduler(sync, interval=60)
+
+    scheduler.start()
+    await asyncio.sleep(0.01)
+    assert scheduler.running
+    await asyncio.wait_for(scheduler.stop(), timeout=1)
+
+    assert not scheduler.running
+    assert scheduler.history()[0].status == "cancelled"
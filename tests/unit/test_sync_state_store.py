@@ -0,0 +1,61 @@
+"""
+infrastructure.state.sync_state_store 的 Docstring
+同步水位线持久化
+"""
+
+from datetime import datetime
+
+from core.models.house_info import HouseModel
+from core.models.sync_state import SyncWatermark
+from infrastructure.state.sync_state_store import SyncStateStore
+
+
+def test_load_empty_watermark(tmp_path):
+  store = SyncStateStore(str(tmp_path / "sync_state.sqlite3"))
+
+  assert store.load("houses") == SyncWatermark()
+
+
+def test_commit_survives_restart(tmp_path):
+  path = str(tmp_path / "sync_state.sqlite3")
+  watermark = SyncWatermark(updated_at=datetime(2025, 11, 1, 8, 30), last_id="h2")
+
+  SyncStateStore(path).commit("houses", watermark)
+
+  assert SyncStateStore(path).load("houses") == watermark
+  assert SyncStateStore(path).load("other") == SyncWatermark()
+
+
+def test_reset(tmp_path):
+  store = SyncStateStore(str(tmp_path / "sync_state.sqlite3"))
+  store.commit("houses", SyncWatermark(updated_at=datetime(2025, 11, 1), last_id="h1"))
+
+  store.reset("houses")
+
+  assert store.load("houses") == SyncWatermark()
+
+
+def test_watermark_tie_break_by_id():
+  t = datetime(2025, 11, 1)
+  watermark = SyncWatermark(updated_at=t, last_id="h2")
+
+  assert watermark.is_synced(HouseModel(id="h1", updated_at=t))
+  assert watermark.is_synced(HouseModel(id="h2", updated_at=t))
+  assert not watermark.is_synced(HouseModel(id="h3", updated_at=t))
+  assert watermark.is_synced(HouseModel(id="h9", updated_at=datetime(2025, 10, 1)))
+  assert not watermark.is_synced(HouseModel(id="h0", updated_at=datetime(2025, 12, 1)))
+  assert not watermark.is_synced(HouseModel(id="h0"))
+
+  advanced = watermark.advance(HouseModel(id="h3", updated_at=t))
+  assert advanced == SyncWatermark(updated_at=t, last_id="h3")
+  assert advanced.advance(HouseModel(id="h1", updated_at=t)) == advanced
+
+
+def test_watermark_tie_break_compares_numeric_ids_as_numbers():
+  t = datetime(2025, 11, 1)
+  watermark = SyncWatermark(updated_at=t, last_id="9")
+
+  assert not watermark.is_synced(HouseModel(id="10", updated_at=t))
+  assert watermark.is_synced(HouseModel(id="8", updated_at=t))
+  assert SyncWatermark(updated_at=t, last_id="h10").is_synced(HouseModel(id="h9", updated_at=t))
+  assert watermark.advance(HouseModel(id="10", updated_at=t)).last_id == "10"
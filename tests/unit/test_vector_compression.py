@@ -0,0 +1,84 @@
+"""
+infrastructure.vectorstore.compression 的 Docstring
+量化配置、检索参数与内存估算
+"""
+import pytest
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http import models
+
+from core.nodes.vectorstore_node import ensure_house_collection
+from infrastructure.vectorstore.compression import VectorCompression
+
+
+class CreateRecordingClient(AsyncQdrantClient):
+  def __init__(self):
+    super().__init__(location=":memory:")
+    self.created: dict = {}
+
+  async def create_collection(self, collection_name, **kwargs):
+    self.created = kwargs
+    return await super().create_collection(collection_name, **kwargs)
+
+
+def test_no_compression_defaults():
+  compression = VectorCompression()
+
+  assert compression.quantization_config() is None
+  assert compression.search_params() is None
+  assert compression.vectors_config(3072).on_disk is None
+
+
+def test_scalar_quantization():
+  compression = VectorCompression(quantization="scalar", on_disk=True, oversampling=3.0)
+
+  config = compression.quantization_config()
+  assert isinstance(config, models.ScalarQuantization)
+  assert config.scalar.type == models.ScalarType.INT8
+  assert config.scalar.always_ram is True
+  assert compression.vectors_config(1024).on_disk is True
+
+  params = compression.search_params()
+  assert params.quantization.rescore is True
+  assert params.quantization.oversampling == 3.0
+
+
+def test_binary_quantization():
+  config = VectorCompression(quantization="binary").quantization_config()
+
+  assert isinstance(config, models.BinaryQuantization)
+
+
+def test_invalid_quantization():
+  with pytest.raises(ValueError):
+    VectorCompression(quantization="pq")
+
+
+def test_estimate_memory():
+  full = VectorCompression().estimate_memory(1_000_000, 3072)
+  scalar = VectorCompression(quantization="scalar", on_disk=True).estimate_memory(1_000_000, 3072)
+  binary = VectorCompression(quantization="binary", on_disk=True).estimate_memory(1_000_000, 1024)
+
+  assert full == {"ram_bytes": 1_000_000 * 3072 * 4, "disk_bytes": 1_000_000 * 3072 * 4}
+  assert scalar["ram_bytes"] == 1_000_000 * 3072
+  assert binary["ram_bytes"] == 1_000_000 * 128
+
+
+@pytest.mark.asyncio
+class TestEnsureCollectionCompression:
+
+  async def test_create_with_quantization(self):
+    client = CreateRecordingClient()
+    compression = VectorCompression(quantization="scalar", on_disk=True)
+
+    await ensure_house_collection(client, 256, collection_name="c", compression=compression)
+
+    assert client.created["vectors_config"].size == 256
+    assert client.created["vectors_config"].on_disk is True
+    assert client.created["quantization_config"] == compression.quantization_config()
+
+  async def test_dimension_mismatch(self):
+    client = AsyncQdrantClient(location=":memory:")
+    await client.create_collection("c", vectors_config=models.VectorParams(size=3072, distance=models.Distance.COSINE))
+
+    with pytest.raises(ValueError):
+      await ensure_house_collection(client, 256, collection_name="c")
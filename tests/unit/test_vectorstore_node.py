@@ -2,4 +2,140 @@
 core.nodes.vectorstore_node 的 Docstring
 向量库管理节点，负责将 embeddings 写入或更新向量数据库
 （如 FAISS、Pinecone、Weaviate 等），并提供检索接口
-"""
\ No newline at end of file
+"""
+import asyncio
+
+import pytest
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http.models import PointStruct
+
+from core.nodes.vectorstore_node import HOUSE_COLLECTION, QdrantBulkWriter
+
+
+def make_points(n: int, start: int = 0) -> list[PointStruct]:
+  return [PointStruct(id=i, vector=[1.0, float(i)], payload={"rooms": i % 4}) for i in range(start, start + n)]
+
+
+class CountingClient(AsyncQdrantClient):
+  """记录 upsert / delete / collection_exists 调用"""
+
+  def __init__(self):
+    super().__init__(location=":memory:")
+    self.upsert_calls: list[tuple[int, bool]] = []
+    self.delete_calls: list[tuple[int, bool]] = []
+    self.exists_calls = 0
+
+  async def collection_exists(self, collection_name, **kwargs):
+    self.exists_calls += 1
+    return await super().collection_exists(collection_name, **kwargs)
+
+  async def upsert(self, collection_name, points, wait=True, **kwargs):
+    self.upsert_calls.append((len(points), wait))
+    return await super().upsert(collection_name, points=points, wait=wait, **kwargs)
+
+  async def delete(self, collection_name, points_selector, wait=True, **kwargs):
+    self.delete_calls.append((len(points_selector.points), wait))
+    return await super().delete(collection_name, points_selector=points_selector, wait=wait, **kwargs)
+
+
+@pytest.mark.asyncio
+class TestQdrantBulkWriter:
+
+  async def test_flush_by_size_and_confirm_on_close(self):
+    client = CountingClient()
+
+    async with QdrantBulkWriter(client, batch_size=4, flush_interval=0) as writer:
+      for point in make_points(10):
+        await writer.add(point)
+
+    assert client.exists_calls == 1
+    assert client.upsert_calls == [(4, False), (4, False), (2, True)]
+    # 剩余数据以 wait=True 写入时不需要额外屏障
+    assert client.delete_calls == []
+    assert writer.upserted == 10
+    assert (await client.count(HOUSE_COLLECTION)).count == 10
+
+  async def test_flush_by_time(self):
+    client = CountingClient()
+
+    async with QdrantBulkWriter(client, batch_size=100, flush_interval=0.05) as writer:
+      for point in make_points(3):
+        await writer.add(point)
+      await asyncio.sleep(0.2)
+      assert client.upsert_calls == [(3, False)]
+
+    # 缓冲为空时以空的 wait=True 删除作为确认屏障，不重发数据
+    assert client.upsert_calls == [(3, False)]
+    assert client.delete_calls == [(0, True)]
+    assert writer.stats() == {"upserted": 3, "deleted": 0, "batches": 1}
+
+  async def test_bounded_in_flight(self):
+    client = CountingClient()
+    in_flight = 0
+    peak = 0
+    original = client.upsert
+
+    async def slow_upsert(collection_name, points, wait=True, **kwargs):
+      nonlocal in_flight, peak
+      in_flight += 1
+      peak = max(peak, in_flight)
+      await asyncio.sleep(0.01)
+      in_flight -= 1
+      return await original(collection_name, points=points, wait=wait, **kwargs)
+
+    client.upsert = slow_upsert
+
+    async with QdrantBulkWriter(client, batch_size=1, flush_interval=0, max_in_flight=2) as writer:
+      for point in make_points(8):
+        await writer.add(point)
+
+    assert peak <= 2
+    assert (await client.count(HOUSE_COLLECTION)).count == 8
+
+  async def test_batched_delete(self):
+    client = CountingClient()
+    async with QdrantBulkWriter(client, batch_size=4, flush_interval=0) as writer:
+      for point in make_points(6):
+        await writer.add(point)
+
+    deleted_batches = []
+    original_delete = client.delete
+
+    async def delete(collection_name, points_selector, wait=True, **kwargs):
+      deleted_batches.append((len(points_selector.points), wait))
+      return await original_delete(collection_name, points_selector=points_selector, wait=wait, **kwargs)
+
+    client.delete = delete
+
+    async with QdrantBulkWriter(client, batch_size=3, flush_interval=0) as writer:
+      for i in range(5):
+        await writer.delete(i)
+
+    assert deleted_batches == [(3, False), (2, True)]
+    assert writer.deleted == 5
+    assert (await client.count(HOUSE_COLLECTION)).count == 1
+
+  async def test_upsert_and_delete_confirmed_in_order(self):
+    client = CountingClient()
+    async with QdrantBulkWriter(client, batch_size=4, flush_interval=0) as writer:
+      for point in make_points(4):
+        await writer.add(point)
+    client.upsert_calls, client.delete_calls = [], []
+
+    async with QdrantBulkWriter(client, batch_size=10, flush_interval=0) as writer:
+      for point in make_points(2, start=4):
+        await writer.add(point)
+      await writer.delete(0)
+
+    # 剩余的 upsert 和删除都以 wait=True 依次写入
+    assert client.upsert_calls == [(2, True)]
+    assert client.delete_calls == [(1, True)]
+    assert (await client.count(HOUSE_COLLECTION)).count == 5
+
+  async def test_delete_without_collection(self):
+    client = CountingClient()
+
+    async with QdrantBulkWriter(client, flush_interval=0) as writer:
+      await writer.delete(1)
+
+    assert writer.deleted == 0